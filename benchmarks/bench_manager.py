@@ -0,0 +1,242 @@
+"""Benchmarks of DevContainerManager hot paths against a fake Docker daemon.
+
+The daemon is ``fake_docker.FakeDockerClient`` (in-process, ``--latency``
+seconds per API round trip) and ``docker compose`` is a stub script that
+sleeps ``--compose-latency`` seconds, so no Docker installation is needed and
+the numbers reflect devdock's own overhead plus the round trips it makes.
+
+    python benchmarks/bench_manager.py [--repeat N] [--latency S] [-k SUBSTRING]
+                                       [--save FILE] [--compare FILE]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import results
+from fake_docker import FakeDockerClient, install_compose_stub
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from devdock.compose import ComposeCache  # noqa: E402
+from devdock.config import ConfigManager  # noqa: E402
+from devdock.manager import DevContainerManager  # noqa: E402
+
+BULK_SIZE = 200
+
+
+def synthetic_compose(services, fan_in=3, seed=0):
+    """A compose document whose services each depend on up to ``fan_in``
+    earlier ones, so the graph is a large random DAG."""
+    rng = random.Random(seed)
+    data = {"services": {}}
+    for i in range(services):
+        service = {
+            "image": "python:3.11",
+            "environment": {"INDEX": str(i)},
+            "volumes": [f"./src/{i}:/src"],
+        }
+        if i:
+            deps = rng.sample(range(i), min(i, fan_in))
+            service["depends_on"] = [f"svc{d}" for d in sorted(deps)]
+        data["services"][f"svc{i}"] = service
+    return data
+
+
+class Bench:
+    def __init__(self, workdir, latency):
+        self.workdir = workdir
+        self.latency = latency
+
+    def manager(self, latency=None, containers=0):
+        client = FakeDockerClient(self.latency if latency is None else latency)
+        for i in range(containers):
+            client.daemon.add(f"dev-{i}", labels={"team": f"t{i % 10}"})
+        manager = DevContainerManager(client=client)
+        manager.config_manager = ConfigManager(
+            base_dir=tempfile.mkdtemp(dir=self.workdir)
+        )
+        return manager
+
+    def compose_file(self, services):
+        path = os.path.join(self.workdir, f"compose-{services}.yml")
+        if not os.path.exists(path):
+            self.manager().write_compose_file(path, synthetic_compose(services))
+        return path
+
+    # Each case sets up its state and returns the callable that is timed.
+
+    def case_get_container_10k(self):
+        manager = self.manager(latency=0, containers=10_000)
+        names = [f"dev-{i}" for i in random.Random(1).sample(range(10_000), 1000)]
+
+        def run():
+            # One list call builds the index, then every lookup is exact.
+            manager.container_index.refresh()
+            for name in names:
+                manager.get_container(name)
+
+        return run
+
+    def case_select_glob_10k(self):
+        manager = self.manager(latency=0, containers=10_000)
+
+        def run():
+            manager.container_index.invalidate()
+            manager.select_containers(pattern="dev-1*", labels=["team=t1"])
+
+        return run
+
+    def case_dependencies_2k_cold(self):
+        path = self.compose_file(2000)
+        manager = self.manager()
+        targets = [f"svc{i}" for i in range(1990, 2000)]
+
+        def run():
+            manager.compose_cache = ComposeCache()
+            manager.get_service_dependencies(path, targets)
+
+        return run
+
+    def case_dependencies_2k_warm(self):
+        path = self.compose_file(2000)
+        manager = self.manager()
+        targets = [f"svc{i}" for i in range(1990, 2000)]
+        manager.get_service_dependencies(path, targets)
+
+        def run():
+            for target in targets:
+                manager.get_service_dependencies(path, [target])
+
+        return run
+
+    def case_compose_read_1k_cold(self):
+        path = self.compose_file(1000)
+        manager = self.manager()
+
+        def run():
+            manager.compose_cache = ComposeCache()
+            manager.read_compose_file(path)
+
+        return run
+
+    def case_compose_write_1k(self):
+        data = synthetic_compose(1000)
+        path = os.path.join(self.workdir, "write.yml")
+        manager = self.manager()
+        counter = [0]
+
+        def run():
+            # A changed value each round so the write is never skipped.
+            counter[0] += 1
+            data["services"]["svc0"]["environment"]["ROUND"] = str(counter[0])
+            manager.write_compose_file(path, data)
+
+        return run
+
+    def _configs(self, backend, count=1000):
+        config_manager = ConfigManager(
+            base_dir=tempfile.mkdtemp(dir=self.workdir), backend=backend
+        )
+        for i in range(count):
+            config_manager.create_config(
+                f"dev-{i}",
+                {
+                    "type": "container",
+                    "name": f"dev-{i}",
+                    "image": f"python:3.{i % 4 + 9}",
+                    "volumes": [],
+                },
+            )
+        return config_manager
+
+    def case_find_configs_1k_sqlite(self):
+        config_manager = self._configs("sqlite")
+        return lambda: config_manager.find_configs(image="python:3.11")
+
+    def case_find_configs_1k_yaml(self):
+        config_manager = self._configs("yaml")
+        return lambda: config_manager.find_configs(image="python:3.11")
+
+    def case_bulk_create(self):
+        specs = [
+            {"name": f"bulk-{i}", "image": "python:3.11"} for i in range(BULK_SIZE)
+        ]
+
+        def run():
+            # A fresh daemon each round so the names are free again.
+            self.manager().create_dev_containers(specs)
+
+        return run
+
+    def case_bulk_stop(self):
+        manager = self.manager(containers=BULK_SIZE)
+
+        def run():
+            containers, _ = manager.select_containers(pattern="dev-*")
+            manager.stop_containers(containers)
+
+        return run
+
+    def case_compose_up_stub(self):
+        path = self.compose_file(50)
+        manager = self.manager()
+        return lambda: manager.start_compose_services(path, ["svc49"])
+
+
+CASES = {
+    "get_container x1000 (10k containers)": Bench.case_get_container_10k,
+    "select_containers glob+label (10k)": Bench.case_select_glob_10k,
+    "get_service_dependencies (2k services, cold)": Bench.case_dependencies_2k_cold,
+    "get_service_dependencies x10 (2k, warm)": Bench.case_dependencies_2k_warm,
+    "read_compose_file (1k services, cold)": Bench.case_compose_read_1k_cold,
+    "write_compose_file (1k services)": Bench.case_compose_write_1k,
+    "find_configs (1k configs, sqlite)": Bench.case_find_configs_1k_sqlite,
+    "find_configs (1k configs, yaml)": Bench.case_find_configs_1k_yaml,
+    f"create_dev_containers x{BULK_SIZE}": Bench.case_bulk_create,
+    f"stop_containers x{BULK_SIZE}": Bench.case_bulk_stop,
+    "start_compose_services (stub compose)": Bench.case_compose_up_stub,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.002,
+        help="Seconds per fake daemon round trip (default: 0.002)",
+    )
+    parser.add_argument(
+        "--compose-latency",
+        type=float,
+        default=0.05,
+        help="Seconds the stub docker compose takes (default: 0.05)",
+    )
+    parser.add_argument("-k", dest="keyword", help="Only run cases containing this")
+    results.add_arguments(parser)
+    args = parser.parse_args()
+
+    rows = []
+    with tempfile.TemporaryDirectory() as workdir:
+        install_compose_stub(workdir, args.compose_latency)
+        bench = Bench(workdir, args.latency)
+        for label, case in CASES.items():
+            if args.keyword and args.keyword not in label:
+                continue
+            run = case(bench)
+            samples = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                run()
+                samples.append((time.perf_counter() - start) * 1000)
+            rows.append((label, samples))
+    results.report(rows, args)
+
+
+if __name__ == "__main__":
+    main()
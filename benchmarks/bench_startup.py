@@ -0,0 +1,70 @@
+"""Wall-clock startup benchmark for the ``devdock`` CLI.
+
+Each case is run in a fresh interpreter with ``HOME`` pointed at a scratch
+directory, so the numbers include interpreter start, imports and config I/O
+but never a Docker daemon round trip.
+
+    python benchmarks/bench_startup.py [--repeat N] [--save FILE] [--compare FILE]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import results
+
+CASES = {
+    "--help": ["--help"],
+    "rmdev --help": ["rmdev", "--help"],
+    "workon <missing config>": ["workon", "missing"],
+    "rmdev <missing config>": ["rmdev", "missing"],
+}
+
+BASELINE = ["-c", "pass"]
+
+
+def time_command(argv, env, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(
+            argv,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=False,
+        )
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    results.add_arguments(parser)
+    args = parser.parse_args()
+
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as home:
+        env = dict(os.environ, HOME=home)
+        env["PYTHONPATH"] = os.pathsep.join(
+            filter(None, [repo_root, env.get("PYTHONPATH")])
+        )
+        rows = [
+            (
+                "python -c pass",
+                time_command([sys.executable] + BASELINE, env, args.repeat),
+            )
+        ]
+        for label, cli_args in CASES.items():
+            argv = [sys.executable, "-m", "devdock.cli"] + cli_args
+            rows.append((f"devdock {label}", time_command(argv, env, args.repeat)))
+
+    results.report(rows, args)
+
+
+if __name__ == "__main__":
+    main()
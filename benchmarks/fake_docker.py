@@ -0,0 +1,213 @@
+"""In-process stand-in for the parts of the Docker SDK devdock uses.
+
+Every daemon round trip sleeps for ``latency`` seconds (sleeping releases the
+GIL, like waiting on a socket does), so concurrency in the manager shows up
+in the numbers the same way it would against a real daemon. State is kept in
+memory and shared by all models of one client.
+
+``install_compose_stub`` puts a ``docker`` executable first on ``PATH`` that
+sleeps for a configurable time and exits 0, standing in for ``docker compose``.
+"""
+
+import itertools
+import os
+import stat
+import threading
+import time
+
+import docker.errors
+from docker.models.containers import ExecResult
+
+COMPOSE_LATENCY_ENV = "DEVDOCK_BENCH_COMPOSE_LATENCY"
+
+
+class FakeContainer:
+    def __init__(self, daemon, container_id):
+        self._daemon = daemon
+        self.id = container_id
+
+    @property
+    def attrs(self):
+        return self._daemon.summary(self.id)
+
+    @property
+    def name(self):
+        return self.attrs["Names"][0].lstrip("/")
+
+    @property
+    def labels(self):
+        return self.attrs["Labels"]
+
+    @property
+    def status(self):
+        return self.attrs["State"]
+
+    def start(self):
+        self._daemon.set_state(self.id, "running")
+
+    def stop(self, timeout=None):
+        self._daemon.set_state(self.id, "exited")
+
+    def kill(self, signal=None):
+        self._daemon.set_state(self.id, "exited")
+
+    def remove(self, force=False):
+        self._daemon.remove(self.id)
+
+    def exec_run(self, command):
+        self._daemon.round_trip()
+        return ExecResult(0, b"")
+
+
+class FakeDaemon:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._containers = {}
+        self._names = {}
+        self._ids = (f"{n:064x}" for n in itertools.count(1))
+
+    def round_trip(self):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def add(self, name, image="python:3.11", labels=None, state="running"):
+        with self._lock:
+            if name in self._names:
+                raise docker.errors.APIError(f"Conflict: name {name} in use")
+            container_id = next(self._ids)
+            self._containers[container_id] = {
+                "Id": container_id,
+                "Names": [f"/{name}"],
+                "Image": image,
+                "State": state,
+                "Created": int(time.time()),
+                "Labels": dict(labels or {}),
+            }
+            self._names[name] = container_id
+        return container_id
+
+    def resolve(self, identifier):
+        with self._lock:
+            container_id = self._names.get(identifier.lstrip("/"), identifier)
+            if container_id not in self._containers:
+                raise docker.errors.NotFound(f"No such container: {identifier}")
+            return container_id
+
+    def summary(self, container_id):
+        with self._lock:
+            summary = self._containers[container_id]
+            return {**summary, "Labels": dict(summary["Labels"])}
+
+    def summaries(self):
+        with self._lock:
+            return [
+                {**s, "Labels": dict(s["Labels"])} for s in self._containers.values()
+            ]
+
+    def set_state(self, container_id, state):
+        self.round_trip()
+        with self._lock:
+            self._containers[container_id]["State"] = state
+
+    def remove(self, container_id):
+        self.round_trip()
+        with self._lock:
+            summary = self._containers.pop(container_id)
+            self._names.pop(summary["Names"][0].lstrip("/"), None)
+
+    def rename(self, identifier, name):
+        self.round_trip()
+        container_id = self.resolve(identifier)
+        with self._lock:
+            summary = self._containers[container_id]
+            self._names.pop(summary["Names"][0].lstrip("/"))
+            summary["Names"] = [f"/{name}"]
+            self._names[name] = container_id
+
+
+def _matches_labels(summary, selectors):
+    labels = summary["Labels"]
+    for selector in selectors:
+        key, sep, value = selector.partition("=")
+        if key not in labels or (sep and labels[key] != value):
+            return False
+    return True
+
+
+class _FakeApi:
+    def __init__(self, daemon):
+        self._daemon = daemon
+
+    def containers(self, all=False, filters=None):
+        self._daemon.round_trip()
+        labels = (filters or {}).get("label") or []
+        if isinstance(labels, str):
+            labels = [labels]
+        return [
+            s
+            for s in self._daemon.summaries()
+            if (all or s["State"] == "running") and _matches_labels(s, labels)
+        ]
+
+    def rename(self, container, name):
+        self._daemon.rename(container, name)
+
+
+class _FakeContainers:
+    def __init__(self, daemon):
+        self._daemon = daemon
+
+    def run(self, image, name=None, labels=None, **kwargs):
+        self._daemon.round_trip()
+        container_id = self._daemon.add(name or os.urandom(6).hex(), image, labels)
+        return FakeContainer(self._daemon, container_id)
+
+    def get(self, container_id):
+        self._daemon.round_trip()
+        return FakeContainer(self._daemon, self._daemon.resolve(container_id))
+
+    def list(self, all=False, filters=None):
+        summaries = _FakeApi(self._daemon).containers(all=all, filters=filters)
+        return [FakeContainer(self._daemon, s["Id"]) for s in summaries]
+
+    def prepare_model(self, summary):
+        return FakeContainer(self._daemon, summary["Id"])
+
+
+class _FakeImages:
+    def __init__(self, daemon):
+        self._daemon = daemon
+
+    def get(self, name):
+        self._daemon.round_trip()
+        return name
+
+    def pull(self, name):
+        self._daemon.round_trip()
+        return name
+
+
+class FakeDockerClient:
+    """Drop-in for ``docker.DockerClient`` as far as DevContainerManager goes."""
+
+    def __init__(self, latency=0.0):
+        self.daemon = FakeDaemon(latency)
+        self.api = _FakeApi(self.daemon)
+        self.containers = _FakeContainers(self.daemon)
+        self.images = _FakeImages(self.daemon)
+
+
+def install_compose_stub(directory, latency=0.0):
+    """Put a stub ``docker`` first on PATH; returns the previous PATH."""
+    path = os.path.join(directory, "docker")
+    with open(path, "w") as f:
+        f.write(f'#!/bin/sh\nsleep "${{{COMPOSE_LATENCY_ENV}:-0}}"\n')
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+    previous = os.environ.get("PATH", "")
+    os.environ["PATH"] = os.pathsep.join([directory, previous])
+    os.environ[COMPOSE_LATENCY_ENV] = str(latency)
+    return previous
@@ -0,0 +1,90 @@
+"""Reporting, storage and regression comparison shared by the benchmarks.
+
+Results are saved as JSON (``--save FILE``) with the median and minimum of
+each case in milliseconds. ``--compare FILE`` prints the change against such
+a file and makes the script exit 1 when a case's median got slower by more
+than ``--threshold`` percent.
+"""
+
+import datetime
+import json
+import platform
+import statistics
+import sys
+
+
+def add_arguments(parser):
+    parser.add_argument("--save", metavar="FILE", help="Write results as JSON")
+    parser.add_argument(
+        "--compare", metavar="FILE", help="Compare against saved results"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="Allowed slowdown of a median, in percent (default: 10)",
+    )
+
+
+def summarize(rows):
+    """Turn ``[(label, samples_ms)]`` into ``{label: {"median_ms", "min_ms"}}``."""
+    return {
+        label: {
+            "median_ms": round(statistics.median(samples), 3),
+            "min_ms": round(min(samples), 3),
+        }
+        for label, samples in rows
+    }
+
+
+def print_table(results):
+    width = max([len(label) for label in results] + [4])
+    print(f"{'case':<{width}} {'median ms':>10} {'min ms':>10}")
+    for label, result in results.items():
+        print(
+            f"{label:<{width}} {result['median_ms']:>10.1f} {result['min_ms']:>10.1f}"
+        )
+
+
+def save(path, results):
+    document = {
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+
+
+def compare(path, results, threshold):
+    """Print the change of each median against ``path``; True if one regressed."""
+    with open(path) as f:
+        baseline = json.load(f)["results"]
+    width = max([len(label) for label in results] + [4])
+    print(f"\n{'case':<{width}} {'baseline':>10} {'current':>10} {'change':>8}")
+    regressed = False
+    for label, result in results.items():
+        if label not in baseline:
+            print(f"{label:<{width}} {'-':>10} {result['median_ms']:>10.1f} {'new':>8}")
+            continue
+        before = baseline[label]["median_ms"]
+        after = result["median_ms"]
+        change = (after - before) / before * 100 if before else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressed = True
+        print(f"{label:<{width}} {before:>10.1f} {after:>10.1f} {change:>+7.1f}%{flag}")
+    return regressed
+
+
+def report(rows, args):
+    """Print, save and compare ``rows`` per the parsed arguments; exits 1 on a
+    regression."""
+    results = summarize(rows)
+    print_table(results)
+    if args.save:
+        save(args.save, results)
+    if args.compare and compare(args.compare, results, args.threshold):
+        sys.exit(1)
@@ -1,4 +1,19 @@
 from .manager import ConfigManager, DevContainerManager
 from .shell import run_command, run_shell
 
-__all__ = ["ConfigManager", "DevContainerManager", "run_command", "run_shell"]
+__all__ = [
+    "AsyncDevContainerManager",
+    "ConfigManager",
+    "DevContainerManager",
+    "run_command",
+    "run_shell",
+]
+
+
+def __getattr__(name):
+    # asyncio is slow to import; only load it for callers of the async API.
+    if name == "AsyncDevContainerManager":
+        from .async_manager import AsyncDevContainerManager
+
+        return AsyncDevContainerManager
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
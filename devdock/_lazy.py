@@ -0,0 +1,29 @@
+import importlib
+import importlib.util
+import sys
+
+
+def lazy_import(name):
+    """Return ``name`` as a module that is only executed on first attribute access.
+
+    The module is registered in ``sys.modules``, and bound on its parent
+    package for a dotted name, so every lazy or regular import of ``name``
+    shares the same object.
+    """
+    try:
+        return sys.modules[name]
+    except KeyError:
+        pass
+    parent_name, _, child = name.rpartition(".")
+    parent = importlib.import_module(parent_name) if parent_name else None
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    if parent is not None:
+        setattr(parent, child, module)
+    return module
@@ -0,0 +1,77 @@
+import io
+import tarfile
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class ChunkReader(io.RawIOBase):
+    """Read-only file over an iterator of byte chunks, e.g. ``get_archive``."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._pending = b""
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._pending:
+            try:
+                self._pending = next(self._chunks)
+            except StopIteration:
+                return 0
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def read_tar(chunks):
+    """Iterate ``(TarInfo, fileobj or None)`` over a streamed tar archive.
+
+    The archive is never held in memory or on disk; each file object is only
+    valid until the next member is requested.
+    """
+    reader = io.BufferedReader(ChunkReader(chunks), CHUNK_SIZE)
+    with tarfile.open(fileobj=reader, mode="r|") as tar:
+        for info in tar:
+            yield info, tar.extractfile(info) if info.isfile() else None
+
+
+def _members_data(members):
+    for info, open_fn in members:
+        yield info.tobuf(tarfile.PAX_FORMAT, "utf-8", "surrogateescape")
+        if open_fn is None or not info.size:
+            continue
+        remaining = info.size
+        with open_fn() as f:
+            while remaining:
+                data = f.read(min(CHUNK_SIZE, remaining))
+                if not data:
+                    raise OSError(f"{info.name} shrank while it was archived")
+                remaining -= len(data)
+                yield data
+        padding = -info.size % tarfile.BLOCKSIZE
+        if padding:
+            yield tarfile.NUL * padding
+    # End-of-archive marker.
+    yield tarfile.NUL * (2 * tarfile.BLOCKSIZE)
+
+
+def tar_chunks(members):
+    """Stream a tar archive of ``(TarInfo, open_fn or None)`` members.
+
+    ``open_fn`` is called only when the member is written and must return a
+    binary file of at least ``info.size`` bytes. The archive is yielded in
+    chunks of about ``CHUNK_SIZE`` bytes, suitable as the body of
+    ``put_archive``; nothing else is buffered, however large the files are.
+    """
+    pending, size = [], 0
+    for data in _members_data(members):
+        pending.append(data)
+        size += len(data)
+        if size >= CHUNK_SIZE:
+            yield b"".join(pending)
+            pending, size = [], 0
+    if pending:
+        yield b"".join(pending)
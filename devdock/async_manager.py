@@ -0,0 +1,221 @@
+import asyncio
+import contextlib
+import functools
+import threading
+from concurrent import futures
+
+from devdock._lazy import lazy_import
+from devdock.manager import (
+    COMPOSE_ENGINE_SDK,
+    PULL_IF_NOT_PRESENT,
+    DevContainerManager,
+)
+
+docker = lazy_import("docker")
+
+# The manager's DEFAULT_MAX_WORKERS stays under the SDK's default of 10 pooled
+# connections. The async manager creates its client with a connection pool
+# sized to its executor, so it can afford the concurrency one event loop
+# driving many operations needs.
+DEFAULT_MAX_WORKERS = 32
+DEFAULT_MAX_SUBPROCESSES = 16
+
+
+class AsyncDevContainerManager:
+    """asyncio front end for DevContainerManager.
+
+    Docker SDK calls run on a bounded thread pool whose size also sets the
+    client's HTTP connection pool, and ``docker compose`` runs through
+    ``asyncio.create_subprocess_exec``, so one event loop can drive hundreds of
+    operations. Cancelling a compose operation terminates its subprocess;
+    cancelling an SDK call stops waiting for it, but the request already sent
+    to the daemon still completes in its worker thread.
+    """
+
+    def __init__(
+        self,
+        manager=None,
+        max_workers=DEFAULT_MAX_WORKERS,
+        max_subprocesses=DEFAULT_MAX_SUBPROCESSES,
+    ):
+        self.manager = manager or DevContainerManager()
+        self.max_workers = max_workers
+        self.max_subprocesses = max_subprocesses
+        self._executor = futures.ThreadPoolExecutor(max_workers=max_workers)
+        self._client_lock = threading.Lock()
+        self._subprocess_slots = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+    def _ensure_client(self):
+        # Size the connection pool to the executor so workers never queue for
+        # (or discard) HTTP connections.
+        with self._client_lock:
+            if self.manager._client is None:
+                self.manager.client = docker.from_env(max_pool_size=self.max_workers)
+
+    def _with_client(self, fn, *args, **kwargs):
+        self._ensure_client()
+        return fn(*args, **kwargs)
+
+    async def _call(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(self._with_client, fn, *args, **kwargs)
+        )
+
+    async def _compose(self, file_path, *args, capture=False):
+        if self._subprocess_slots is None:
+            # Created lazily so it binds to the running loop on Python < 3.10.
+            self._subprocess_slots = asyncio.Semaphore(self.max_subprocesses)
+        pipe = asyncio.subprocess.PIPE if capture else None
+        async with self._subprocess_slots:
+            process = await asyncio.create_subprocess_exec(
+                "docker", "compose", "-f", file_path, *args, stdout=pipe, stderr=pipe
+            )
+            try:
+                stdout, _ = await process.communicate()
+            except asyncio.CancelledError:
+                with contextlib.suppress(ProcessLookupError):
+                    process.terminate()
+                await process.wait()
+                raise
+        return process.returncode, stdout.decode() if capture else None
+
+    async def create_container(
+        self, image, name, volumes=None, pull_policy=PULL_IF_NOT_PRESENT
+    ):
+        return await self._call(
+            self.manager.create_container, image, name, volumes, pull_policy
+        )
+
+    async def create_dev_container(
+        self,
+        name,
+        image,
+        volumes=None,
+        pull_policy=PULL_IF_NOT_PRESENT,
+        warm=False,
+        caches=None,
+        sync=False,
+    ):
+        return await self._call(
+            self.manager.create_dev_container,
+            name,
+            image,
+            volumes,
+            pull_policy,
+            warm=warm,
+            caches=caches,
+            sync=sync,
+        )
+
+    async def remove_dev_container(self, name):
+        return await self._call(self.manager.remove_dev_container, name)
+
+    async def start_container(self, identifier):
+        return await self._call(self.manager.start_container, identifier)
+
+    async def stop_container(self, identifier, timeout=None, signal=None):
+        return await self._call(
+            self.manager.stop_container, identifier, timeout, signal
+        )
+
+    async def remove_container(self, identifier):
+        return await self._call(self.manager.remove_container, identifier)
+
+    async def run_command(self, identifier, command, service=None):
+        if service:
+            container = await self._call(self.manager._exec_target, identifier, service)
+            if container is None:
+                compose_file = await self._call(
+                    self.manager.resolve_compose_file, identifier
+                )
+                returncode, output = await self._compose(
+                    compose_file,
+                    "exec",
+                    "-T",
+                    service,
+                    *command.split(),
+                    capture=True,
+                )
+                if returncode:
+                    raise RuntimeError(
+                        f"Failed to run command in service {service}: "
+                        f"exit code {returncode}"
+                    )
+                return output
+        return await self._call(self.manager.run_command, identifier, command, service)
+
+    async def start_compose_services(self, file_path, services=None, recreate=None):
+        if self.manager.compose_engine == COMPOSE_ENGINE_SDK:
+            return await self._call(
+                self.manager.start_compose_services, file_path, services, recreate
+            )
+        args = ["up", "-d"]
+        if services:
+            args += await self._call(
+                self.manager.get_service_dependencies, file_path, services
+            )
+        returncode, _ = await self._compose(file_path, *args)
+        if returncode:
+            raise RuntimeError(
+                f"Failed to start services using Docker Compose file {file_path}"
+            )
+
+    async def stop_compose_services(self, file_path):
+        if self.manager.compose_engine == COMPOSE_ENGINE_SDK:
+            return await self._call(self.manager.stop_compose_services, file_path)
+        returncode, _ = await self._compose(file_path, "down")
+        if returncode:
+            raise RuntimeError(
+                f"Failed to stop services using Docker Compose file {file_path}"
+            )
+
+    async def create_dev_compose(
+        self, name, compose_file, volume_mappings=None, caches=None, sync=False
+    ):
+        # Config and volume work runs on the executor; compose itself runs as
+        # a subprocess of the event loop so cancelling terminates it.
+        try:
+            plan = await self._call(
+                self.manager._plan_dev_compose,
+                name,
+                compose_file,
+                volume_mappings,
+                caches,
+                sync,
+            )
+            if plan["stale"]:
+                await self.start_compose_services(
+                    plan["compose_file"], plan["stale"], recreate=plan["recreate"]
+                )
+            await self._call(self.manager._save_dev_compose, name, plan)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Docker Compose file {compose_file} not found")
+        except ValueError as e:
+            raise ValueError(str(e))
+        except Exception as e:
+            raise RuntimeError(f"Failed to create dev compose: {str(e)}")
+
+    async def remove_dev_compose(self, name):
+        config = await self._call(self.manager.config_manager.read_config, name)
+        await self._call(self.manager.config_manager.delete_config, name)
+        await self.stop_compose_services(config["compose_file"])
+        await self._call(self.manager._remove_sync_volumes, config)
+
+    async def activate_dev(self, name, services=None):
+        config = await self._call(self.manager.config_manager.read_config, name)
+        await self._call(self.manager._ensure_config_caches, config)
+        if config["type"] == "container":
+            await self.start_container(config["name"])
+        elif config["type"] == "compose":
+            await self.start_compose_services(config["compose_file"], services)
+        return config
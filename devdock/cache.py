@@ -0,0 +1,157 @@
+import os
+import time
+
+from devdock._lazy import lazy_import
+
+docker = lazy_import("docker")
+
+CACHE_LABEL = "devdock.cache"
+CACHE_VOLUME_PREFIX = "devdock-cache-"
+
+# Where the usual tools keep their download caches in the official images,
+# which run as root. apt only keeps downloaded packages in an image whose
+# docker-clean apt config has been removed.
+CACHE_PATHS = {
+    "apt": "/var/cache/apt/archives",
+    "cargo": "/usr/local/cargo/registry",
+    "go": "/go/pkg/mod",
+    "gradle": "/root/.gradle/caches",
+    "maven": "/root/.m2/repository",
+    "npm": "/root/.npm",
+    "pip": "/root/.cache/pip",
+    "yarn": "/usr/local/share/.cache/yarn",
+}
+
+
+def parse_cache(entry):
+    """Resolve ``pip`` or ``name:/path`` into ``(volume, container_path)``."""
+    kind, _, path = entry.partition(":")
+    if not path:
+        if kind not in CACHE_PATHS:
+            raise ValueError(
+                f"Unknown cache: {kind} (expected one of {', '.join(CACHE_PATHS)} "
+                f"or name:/path)"
+            )
+        path = CACHE_PATHS[kind]
+    return f"{CACHE_VOLUME_PREFIX}{kind}", path
+
+
+def cache_mounts(caches):
+    """Volume mappings (``volume:path``) mounting ``caches`` into a container."""
+    return [":".join(parse_cache(entry)) for entry in caches or []]
+
+
+def compose_cache_mounts(caches, services):
+    """Map ``caches`` onto compose services; returns ``{service: [mapping]}``.
+
+    An entry applies to every service, or only to one when prefixed with its
+    name: ``pip``, ``web:npm``, ``web:assets:/app/.cache``.
+    """
+    mounts = {service: [] for service in services}
+    for entry in caches or []:
+        service, _, rest = entry.partition(":")
+        if rest and not rest.startswith("/"):
+            if service not in mounts:
+                raise ValueError(f"Unknown service in cache {entry}: {service}")
+            mounts[service].append(":".join(parse_cache(rest)))
+        else:
+            mapping = ":".join(parse_cache(entry))
+            for service_mounts in mounts.values():
+                service_mounts.append(mapping)
+    return mounts
+
+
+class CacheVolumes:
+    """Named volumes shared by dev containers as dependency caches.
+
+    Every dev container asking for ``pip`` mounts the same
+    ``devdock-cache-pip`` volume, so packages downloaded in one are reused by
+    the next. The time a cache was last mounted is the mtime of a marker file
+    under ``<base_dir>``, which lets concurrent devdock processes record it
+    without coordinating; pruning removes unused caches least recently used
+    first.
+    """
+
+    def __init__(self, manager, base_dir=None):
+        self.manager = manager
+        self.base_dir = base_dir or os.path.join(
+            manager.config_manager.base_dir, "caches"
+        )
+
+    def _marker(self, volume):
+        return os.path.join(self.base_dir, volume)
+
+    def ensure(self, mappings):
+        """Create the cache volumes of ``mappings`` and mark them as used."""
+        os.makedirs(self.base_dir, exist_ok=True)
+        for volume in sorted({mapping.split(":", 1)[0] for mapping in mappings}):
+            try:
+                self.manager.client.volumes.get(volume)
+            except docker.errors.NotFound:
+                self.manager.create_volume(
+                    volume, labels={CACHE_LABEL: volume[len(CACHE_VOLUME_PREFIX) :]}
+                )
+            with open(self._marker(volume), "a"):
+                pass
+            os.utime(self._marker(volume))
+
+    def list(self):
+        """Return the cache volumes, least recently used first.
+
+        Each is ``{"name", "cache", "size", "in_use", "last_used"}``; the size
+        comes from the daemon's disk usage report and is -1 when unknown.
+        """
+        caches = []
+        for volume in self.manager.client.df().get("Volumes") or []:
+            labels = volume.get("Labels") or {}
+            if CACHE_LABEL not in labels:
+                continue
+            usage = volume.get("UsageData") or {}
+            try:
+                last_used = os.path.getmtime(self._marker(volume["Name"]))
+            except FileNotFoundError:
+                last_used = 0
+            caches.append(
+                {
+                    "name": volume["Name"],
+                    "cache": labels[CACHE_LABEL],
+                    "size": usage.get("Size", -1),
+                    "in_use": usage.get("RefCount", 0) > 0,
+                    "last_used": last_used,
+                }
+            )
+        return sorted(caches, key=lambda c: c["last_used"])
+
+    def prune(self, max_bytes=None, max_age=None, drain=False):
+        """Remove unused caches; returns the removed ones.
+
+        Caches unused for more than ``max_age`` seconds go first, then the
+        least recently used until the total size is at most ``max_bytes``;
+        ``drain`` removes every unused cache. Caches mounted by a container
+        are kept.
+        """
+        caches = self.list()
+        total = sum(max(c["size"], 0) for c in caches)
+        now = time.time()
+        removed = []
+        for cache in caches:
+            if cache["in_use"]:
+                continue
+            expired = max_age is not None and now - cache["last_used"] > max_age
+            over = max_bytes is not None and total > max_bytes
+            if not (drain or expired or over):
+                continue
+            try:
+                self.manager.remove_volume(cache["name"])
+            except docker.errors.NotFound:
+                pass
+            except RuntimeError:
+                # Mounted since the usage report was taken.
+                continue
+            try:
+                os.remove(self._marker(cache["name"]))
+            except FileNotFoundError:
+                pass
+            total -= max(cache["size"], 0)
+            removed.append(cache)
+        return removed
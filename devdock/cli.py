@@ -1,18 +1,73 @@
+import subprocess
+import sys
+import time
+
 import click
-from devdock.manager import DevContainerManager
+from devdock._lazy import lazy_import
+from devdock.manager import (
+    DEFAULT_MAX_WORKERS,
+    PULL_IF_NOT_PRESENT,
+    PULL_POLICIES,
+    DevContainerManager,
+)
+from devdock import profiling
+from devdock.cache import CACHE_PATHS, CacheVolumes
 from devdock.shell import run_shell
-import docker
-import subprocess
+from devdock.stats import DEFAULT_INTERVAL
+from devdock.streams import STDERR
+
+docker = lazy_import("docker")
+exec_server = lazy_import("devdock.exec_server")
+json = lazy_import("json")
+container_logs = lazy_import("devdock.logs")
+pool = lazy_import("devdock.pool")
+seed = lazy_import("devdock.seed")
+snapshot_store = lazy_import("devdock.snapshot")
+file_sync = lazy_import("devdock.sync")
+watch_mod = lazy_import("devdock.watch")
 
 
 @click.group()
-def cli():
-    pass
+@click.option(
+    "--profile",
+    is_flag=True,
+    envvar="DEVDOCK_PROFILE",
+    help="Print where the command spent its time (or set DEVDOCK_PROFILE=1)",
+)
+@click.option(
+    "--profile-output",
+    type=click.Path(dir_okay=False),
+    envvar="DEVDOCK_PROFILE_OUTPUT",
+    help="Also write the spans to this file",
+)
+@click.option(
+    "--profile-format",
+    type=click.Choice(profiling.EXPORT_FORMATS),
+    default=profiling.FORMAT_CHROME,
+    envvar="DEVDOCK_PROFILE_FORMAT",
+    show_default=True,
+    help="Chrome trace or OpenTelemetry (OTLP JSON) for --profile-output",
+)
+@click.pass_context
+def cli(ctx, profile, profile_output, profile_format):
+    if profile or profile_output:
+        profiler = profiling.enable()
+        ctx.call_on_close(
+            lambda: _report_profile(profiler, profile_output, profile_format)
+        )
+
+
+def _report_profile(profiler, output, format):
+    profiling.disable()
+    click.echo(profiler.format_summary(), err=True)
+    if output:
+        profiler.export(output, format)
+        click.echo(f"Profile written to {output}.", err=True)
 
 
 @cli.command()
 @click.option("--image", help="The Docker image to use")
-@click.option("--name", prompt="Container name", help="The name of the container")
+@click.option("--name", help="The name of the container")
 @click.option(
     "--volumes", multiple=True, help="Volume mappings (host_path:container_path)"
 )
@@ -24,17 +79,93 @@ def cli():
     multiple=True,
     help="Volume mappings for services (service_name:host_path:container_path)",
 )
-def mkdevcontainer(image, name, volumes, compose_file, volume_mappings):
+@click.option(
+    "--pull",
+    "pull_policy",
+    type=click.Choice(PULL_POLICIES),
+    default=PULL_IF_NOT_PRESENT,
+    show_default=True,
+    help="When to pull the image from the registry",
+)
+@click.option(
+    "--from-manifest",
+    "manifest",
+    type=click.Path(),
+    help="Create every dev container listed in a fleet manifest",
+)
+@click.option(
+    "--parallel",
+    type=click.IntRange(min=1),
+    default=DEFAULT_MAX_WORKERS,
+    show_default=True,
+    help="Containers to create at once with --from-manifest",
+)
+@click.option(
+    "--warm",
+    is_flag=True,
+    help="Claim a pre-started container from the image's pool (see devdock pool)",
+)
+@click.option(
+    "--cache",
+    "caches",
+    multiple=True,
+    help=f"Shared cache volume to mount ({', '.join(CACHE_PATHS)} or "
+    "name:/path); with -f, prefix a service to limit it (web:npm)",
+)
+@click.option(
+    "--sync",
+    is_flag=True,
+    help="Copy host directories into volumes instead of bind-mounting them "
+    "(keep them current with devdock sync)",
+)
+def mkdevcontainer(
+    image,
+    name,
+    volumes,
+    compose_file,
+    volume_mappings,
+    pull_policy,
+    manifest,
+    parallel,
+    warm,
+    caches,
+    sync,
+):
+    if not name and not manifest:
+        name = click.prompt("Container name")
     manager = DevContainerManager()
     try:
-        if compose_file:
-            manager.create_dev_compose(name, compose_file, volume_mappings)
+        if manifest:
+            specs = manager.read_manifest(manifest)
+            results = manager.create_dev_containers(specs, pull_policy, parallel)
+            for result in results:
+                if result["error"] is None:
+                    container = result["container"]
+                    click.echo(
+                        f"Dev container {container.name} created with ID {container.id}."
+                    )
+                else:
+                    click.echo(f"Error: {result['name']}: {str(result['error'])}")
+            created = sum(1 for result in results if result["error"] is None)
+            click.echo(f"Created {created} of {len(results)} dev containers.")
+        elif compose_file:
+            manager.create_dev_compose(
+                name, compose_file, volume_mappings, caches=list(caches), sync=sync
+            )
             click.echo(
                 f"Dev compose configuration {name} created and services started."
             )
         else:
             volume_list = [v for v in volumes]
-            container = manager.create_dev_container(name, image, volume_list)
+            container = manager.create_dev_container(
+                name,
+                image,
+                volume_list,
+                pull_policy,
+                warm=warm,
+                caches=list(caches),
+                sync=sync,
+            )
             click.echo(
                 f"Dev container {container.name} created with ID {container.id}."
             )
@@ -82,13 +213,67 @@ def workon(name, services):
         click.echo(f"Error: {str(e)}")
 
 
+def _selector_options(f):
+    f = click.option(
+        "--parallel",
+        type=click.IntRange(min=1),
+        default=DEFAULT_MAX_WORKERS,
+        show_default=True,
+        help="Containers to act on at once",
+    )(f)
+    f = click.option(
+        "--config-type",
+        type=click.Choice(["container", "compose"]),
+        help="Select the containers of every devdock config of this type",
+    )(f)
+    f = click.option(
+        "--label",
+        "labels",
+        multiple=True,
+        help="Select containers with this label (key or key=value)",
+    )(f)
+    f = click.option("--match", "pattern", help="Select containers by name glob")(f)
+    return click.argument("identifiers", nargs=-1)(f)
+
+
+def _run_bulk(manager, identifiers, pattern, labels, config_type, action, verb):
+    containers, missing = manager.select_containers(
+        identifiers, pattern, labels, config_type
+    )
+    for identifier in missing:
+        click.echo(f"Error: Container {identifier} not found")
+    if not containers and not missing:
+        click.echo("Error: No containers matched.")
+        return
+    for result in action(containers):
+        if result["error"] is None:
+            click.echo(f"Container {result['name']} {verb}.")
+        else:
+            click.echo(f"Error: {result['name']}: {str(result['error'])}")
+
+
+def _is_single(identifiers, pattern, labels, config_type):
+    return len(identifiers) == 1 and not (pattern or labels or config_type)
+
+
 @cli.command()
-@click.argument("identifier")
-def start(identifier):
+@_selector_options
+def start(identifiers, pattern, labels, config_type, parallel):
     manager = DevContainerManager()
     try:
-        manager.start_container(identifier)
-        click.echo(f"Container {identifier} started.")
+        if _is_single(identifiers, pattern, labels, config_type):
+            manager.start_container(identifiers[0])
+            click.echo(f"Container {identifiers[0]} started.")
+        else:
+            _run_bulk(
+                manager,
+                identifiers,
+                pattern,
+                labels,
+                config_type,
+                lambda containers: manager.start_containers(containers, parallel),
+                "started",
+            )
     except docker.errors.NotFound as e:
         click.echo(f"Error: {str(e)}")
     except Exception as e:
@@ -96,12 +281,29 @@ def start(identifier):
 
 
 @cli.command()
-@click.argument("identifier")
-def stop(identifier):
+@_selector_options
+@click.option(
+    "--timeout", type=int, help="Seconds to wait before killing (default: 10)"
+)
+@click.option("--signal", help="Signal to send first, e.g. SIGINT")
+def stop(identifiers, pattern, labels, config_type, parallel, timeout, signal):
     manager = DevContainerManager()
     try:
-        manager.stop_container(identifier)
-        click.echo(f"Container {identifier} stopped.")
+        if _is_single(identifiers, pattern, labels, config_type):
+            manager.stop_container(identifiers[0], timeout, signal)
+            click.echo(f"Container {identifiers[0]} stopped.")
+        else:
+            _run_bulk(
+                manager,
+                identifiers,
+                pattern,
+                labels,
+                config_type,
+                lambda containers: manager.stop_containers(
+                    containers, timeout, signal, parallel
+                ),
+                "stopped",
+            )
     except docker.errors.NotFound as e:
         click.echo(f"Error: {str(e)}")
     except Exception as e:
@@ -109,12 +311,26 @@ def stop(identifier):
 
 
 @cli.command()
-@click.argument("identifier")
-def remove(identifier):
+@_selector_options
+@click.option("--force", is_flag=True, help="Remove running containers too")
+def remove(identifiers, pattern, labels, config_type, parallel, force):
     manager = DevContainerManager()
     try:
-        manager.remove_container(identifier)
-        click.echo(f"Container {identifier} removed.")
+        if _is_single(identifiers, pattern, labels, config_type) and not force:
+            manager.remove_container(identifiers[0])
+            click.echo(f"Container {identifiers[0]} removed.")
+        else:
+            _run_bulk(
+                manager,
+                identifiers,
+                pattern,
+                labels,
+                config_type,
+                lambda containers: manager.remove_containers(
+                    containers, force, parallel
+                ),
+                "removed",
+            )
     except docker.errors.NotFound as e:
         click.echo(f"Error: {str(e)}")
     except Exception as e:
@@ -122,20 +338,658 @@ def remove(identifier):
 
 
 @cli.command()
-@click.argument("identifier")
+@_selector_options
 @click.argument("command")
 @click.option("--service", help="The specific service to run the command in")
-def run(identifier, command, service):
+@click.option(
+    "--all",
+    "all_services",
+    is_flag=True,
+    help="Treat the identifiers as dev configs and run in all their containers",
+)
+@click.option(
+    "--fail-fast",
+    is_flag=True,
+    help="With several targets, stop at the first that fails",
+)
+@click.option(
+    "--stream/--no-stream",
+    default=True,
+    show_default=True,
+    help="Print output as it is produced and exit with the command's exit code",
+)
+def run(
+    identifiers,
+    pattern,
+    labels,
+    config_type,
+    parallel,
+    command,
+    service,
+    all_services,
+    fail_fast,
+    stream,
+):
+    single = _is_single(identifiers, pattern, labels, config_type)
+    if service and not single and not all_services:
+        # Selected containers are not dev configs, so have no services.
+        raise click.UsageError("--service with several targets needs --all")
+    exit_code = 0
+    try:
+        if all_services or not single:
+            exit_code = _run_many(
+                identifiers,
+                pattern,
+                labels,
+                config_type,
+                parallel,
+                command,
+                service,
+                all_services,
+                fail_fast,
+            )
+        elif stream:
+            identifier = identifiers[0]
+            try:
+                chunks = exec_server.stream_command(identifier, command, service)
+            except ConnectionError:
+                manager = DevContainerManager()
+                chunks = manager.stream_command(identifier, command, service)
+            for name, chunk in chunks:
+                click.echo(chunk, nl=False, err=name == STDERR)
+            exit_code = chunks.exit_code or 0
+        else:
+            identifier = identifiers[0]
+            try:
+                output = exec_server.send_command(identifier, command, service)
+            except ConnectionError:
+                manager = DevContainerManager()
+                output = manager.run_command(identifier, command, service)
+            click.echo(output)
+    except docker.errors.NotFound as e:
+        click.echo(f"Error: {str(e)}")
+    except Exception as e:
+        click.echo(f"Error: {str(e)}")
+    if exit_code:
+        click.get_current_context().exit(exit_code)
+
+
+def _run_many(
+    identifiers,
+    pattern,
+    labels,
+    config_type,
+    parallel,
+    command,
+    service,
+    all_services,
+    fail_fast,
+):
+    manager = DevContainerManager()
+    if all_services:
+        targets, missing = manager.command_targets(identifiers, service)
+    else:
+        containers, missing = manager.select_containers(
+            identifiers, pattern, labels, config_type
+        )
+        targets = {
+            name: container.id if container.status == "running" else None
+            for name, container in containers.items()
+        }
+    for identifier in missing:
+        click.echo(f"Error: Container {identifier} not found")
+    if not targets:
+        if not missing:
+            click.echo("Error: No containers matched.")
+        return 1
+    width = max(map(len, targets))
+    lines = manager.stream_commands(targets, command, parallel, fail_fast)
+    for name, stream_name, line in lines:
+        click.echo(
+            f"{name.ljust(width)} | ".encode() + line,
+            nl=not line.endswith(b"\n"),
+            err=stream_name == STDERR,
+        )
+    for result in lines.results:
+        if result["cancelled"]:
+            click.echo(f"{result['name']}: cancelled.")
+        elif result["error"] is not None:
+            click.echo(f"Error: {result['name']}: {str(result['error'])}")
+        elif result["exit_code"]:
+            click.echo(f"{result['name']}: exited with code {result['exit_code']}.")
+    ran = [result for result in lines.results if not result["cancelled"]]
+    failed = sum(1 for result in ran if result["exit_code"] or result["error"])
+    click.echo(f"Ran in {len(ran)} of {len(targets)} containers, {failed} failed.")
+    return max(lines.exit_code, 1 if missing else 0)
+
+
+@cli.command()
+@click.argument("name")
+@click.option(
+    "--service",
+    "services",
+    multiple=True,
+    help="Only show the logs of this compose service",
+)
+@click.option("-f", "--follow", is_flag=True, help="Keep printing new log lines")
+@click.option(
+    "--since",
+    help="Only show logs since a duration ago (10m, 2h), a Unix time or a date",
+)
+@click.option(
+    "--tail",
+    type=click.IntRange(min=0),
+    help="Lines to show from the end of each container's log",
+)
+@click.option("-t", "--timestamps", is_flag=True, help="Show timestamps")
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(dir_okay=False),
+    help="Write the logs to this file instead (gzip-compressed if it ends in .gz)",
+)
+@click.option(
+    "--max-bytes",
+    type=click.IntRange(min=1),
+    default=lambda: container_logs.DEFAULT_MAX_BYTES,
+    help="Rotate --output after this many bytes  [default: 10 MiB]",
+)
+@click.option(
+    "--backups",
+    type=click.IntRange(min=0),
+    default=lambda: container_logs.DEFAULT_BACKUPS,
+    help="Rotated --output files to keep  [default: 5]",
+)
+def logs(name, services, follow, since, tail, timestamps, output, max_bytes, backups):
+    manager = DevContainerManager()
+    try:
+        lines = manager.stream_logs(
+            name, services, follow, container_logs.parse_since(since), tail
+        )
+        width = max(map(len, lines.names))
+        count = 0
+        if output:
+            writer = container_logs.RotatingWriter(output, max_bytes, backups)
+        try:
+            for label, timestamp, line in lines:
+                prefix = f"{label.ljust(width)} | ".encode()
+                if timestamps:
+                    prefix += timestamp + b" "
+                if not line.endswith(b"\n"):
+                    line += b"\n"
+                if output:
+                    writer.write(prefix + line)
+                else:
+                    click.echo(prefix + line, nl=False)
+                count += 1
+        finally:
+            if output:
+                writer.close()
+        for label, error in lines.errors.items():
+            click.echo(f"Error: {label}: {str(error)}")
+        if output:
+            click.echo(f"Wrote {count} log lines to {output}.")
+    except FileNotFoundError as e:
+        click.echo(f"Error: {str(e)}")
+    except Exception as e:
+        click.echo(f"Error: {str(e)}")
+
+
+@cli.command("exec-server")
+@click.option("--socket", "socket_path", type=click.Path(), help="Socket to listen on")
+@click.option(
+    "--idle-timeout",
+    type=float,
+    help="Exit after this many seconds without a request",
+)
+def exec_server_command(socket_path, idle_timeout):
+    manager = DevContainerManager()
+    try:
+        server = exec_server.ExecServer(manager, socket_path)
+    except Exception as e:
+        click.echo(f"Error: {str(e)}")
+        return
+    click.echo(f"Serving devdock run on {server.socket_path}.")
+    try:
+        server.serve(idle_timeout)
+    except KeyboardInterrupt:
+        pass
+
+
+def _format_bytes(size):
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024:
+            break
+        size /= 1024
+    else:
+        unit = "TiB"
+    return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+
+
+_STATS_HEADER = (
+    f"{'NAME':<30} {'CPU %':>7} {'MEM USAGE / LIMIT':>21} {'MEM %':>6} "
+    f"{'NET I/O':>19} {'BLOCK I/O':>19} {'PIDS':>5}"
+)
+
+
+def _format_stats_row(row):
+    if "error" in row:
+        return f"{row['name']:<30} error: {row['error']}"
+    memory = (
+        f"{_format_bytes(row['memory_usage'])} / {_format_bytes(row['memory_limit'])}"
+    )
+    net = f"{_format_bytes(row['net_rx'])} / {_format_bytes(row['net_tx'])}"
+    block = f"{_format_bytes(row['block_read'])} / {_format_bytes(row['block_write'])}"
+    return (
+        f"{row['name']:<30} {row['cpu_percent']:>6.2f}% {memory:>21} "
+        f"{row['memory_percent']:>5.1f}% {net:>19} {block:>19} {row['pids']:>5}"
+    )
+
+
+@cli.command()
+@click.argument("name", required=False)
+@click.option(
+    "--interval",
+    type=click.FloatRange(min=1),
+    default=DEFAULT_INTERVAL,
+    show_default=True,
+    help="Seconds between samples",
+)
+@click.option("--json", "as_json", is_flag=True, help="Print JSON lines")
+@click.option("--no-stream", is_flag=True, help="Print a single sample and exit")
+def stats(name, interval, as_json, no_stream):
+    """Show resource usage of a dev config's containers, or of every config."""
+    manager = DevContainerManager()
+    live = not no_stream and not as_json and sys.stdout.isatty()
+    try:
+        if no_stream:
+            samples = [manager.sample_stats(name)]
+        else:
+            samples = manager.stream_stats(name, interval)
+        for rows in samples:
+            if as_json:
+                timestamp = time.time()
+                for row in rows:
+                    click.echo(json.dumps({"time": timestamp, **row}))
+                continue
+            if live:
+                click.clear()
+            click.echo(_STATS_HEADER)
+            for row in rows:
+                click.echo(_format_stats_row(row))
+    except KeyboardInterrupt:
+        pass
+    except FileNotFoundError:
+        click.echo(f"Error: Configuration {name} not found")
+    except Exception as e:
+        click.echo(f"Error: {str(e)}")
+
+
+_STATUS_HEADER = (
+    f"{'NAME':<24} {'TYPE':<9} {'STATE':<8} {'SERVICE':<16} {'CONTAINER':<30} STATUS"
+)
+
+
+def _format_status_rows(row):
+    lines = []
+    for index, container in enumerate(row["containers"]):
+        head = ("", "", "")
+        if index == 0:
+            head = (row["name"], row["type"], row["state"])
+        status = container["status"] or container["state"]
+        lines.append(
+            f"{head[0]:<24} {head[1]:<9} {head[2]:<8} "
+            f"{container['service'] or '-':<16} {container['name'] or '-':<30} "
+            f"{status}"
+        )
+    if not lines:
+        lines.append(f"{row['name']:<24} {row['type']:<9} {row['state']:<8}")
+    return lines
+
+
+@cli.command("ls")
+@click.argument("name", required=False)
+@click.option(
+    "--type",
+    "config_type",
+    type=click.Choice(["container", "compose"]),
+    help="Only show configs of this type",
+)
+@click.option("--json", "as_json", is_flag=True, help="Print JSON")
+def ls(name, config_type, as_json):
+    """Show the state of every dev config, or of NAME."""
     manager = DevContainerManager()
     try:
-        output = manager.run_command(identifier, command, service)
-        click.echo(output)
+        rows = manager.status(name, config_type)
+    except Exception as e:
+        click.echo(f"Error: {str(e)}")
+        return
+    if as_json:
+        click.echo(json.dumps(rows))
+        return
+    click.echo(_STATUS_HEADER)
+    for row in rows:
+        for line in _format_status_rows(row):
+            click.echo(line)
+
+
+cli.add_command(ls, "status")
+
+
+def _format_watch_result(result):
+    if result["name"] is None:
+        return f"Error: {str(result['error'])}"
+    if result["error"] is not None:
+        return f"Error: {result['name']}: {str(result['error'])}"
+    attempt = f" (attempt {result['attempt']})" if result["attempt"] > 1 else ""
+    if result["action"] == watch_mod.ACTION_START_SERVICES:
+        services = ", ".join(result["services"])
+        return f"Started services {services} of {result['name']}{attempt}."
+    if result["action"] == watch_mod.ACTION_CREATE:
+        return f"Recreated dev container {result['name']}{attempt}."
+    return f"Started dev container {result['name']} ({result['state']}){attempt}."
+
+
+@cli.command()
+@click.option(
+    "--debounce",
+    type=click.FloatRange(min=0),
+    default=lambda: watch_mod.DEFAULT_DEBOUNCE,
+    help="Seconds to collect events before acting on a config [default: 1]",
+)
+@click.option(
+    "--max-backoff",
+    type=click.FloatRange(min=1),
+    default=lambda: watch_mod.DEFAULT_MAX_BACKOFF,
+    help="Longest wait between restarts of a dying config [default: 60]",
+)
+def watch(debounce, max_backoff):
+    """Restart dev containers and compose services that go down."""
+    manager = DevContainerManager()
+    watcher = watch_mod.Watcher(manager, debounce=debounce, max_backoff=max_backoff)
+    try:
+        for result in watcher.run():
+            click.echo(_format_watch_result(result))
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        click.echo(f"Error: {str(e)}")
+    finally:
+        watcher.close()
+
+
+@cli.command()
+@click.argument("name")
+@click.option("--tag", help="Tag of the snapshot (default: the current time)")
+def snapshot(name, tag):
+    manager = DevContainerManager()
+    try:
+        store = snapshot_store.SnapshotStore(manager)
+        record, created = store.snapshot(name, tag)
+        if created:
+            click.echo(f"Snapshot {name}@{record['tag']} created.")
+        else:
+            click.echo(
+                f"{name} is unchanged since snapshot {name}@{record['tag']}; "
+                "nothing stored."
+            )
     except docker.errors.NotFound as e:
         click.echo(f"Error: {str(e)}")
     except Exception as e:
         click.echo(f"Error: {str(e)}")
 
 
+@cli.command()
+@click.argument("ref", metavar="NAME[@TAG]")
+def restore(ref):
+    manager = DevContainerManager()
+    name, tag = snapshot_store.parse_ref(ref)
+    try:
+        store = snapshot_store.SnapshotStore(manager)
+        container = store.restore(name, tag)
+        click.echo(f"Dev container {container.name} restored with ID {container.id}.")
+    except Exception as e:
+        click.echo(f"Error: {str(e)}")
+
+
+@cli.command()
+@click.argument("name", required=False)
+@click.option("--prune", is_flag=True, help="Drop least recently used snapshots")
+@click.option(
+    "--keep",
+    type=click.IntRange(min=0),
+    # Resolved when the command runs, so the CLI does not import tarfile.
+    default=lambda: snapshot_store.DEFAULT_KEEP,
+    help="Snapshots to keep per dev container with --prune [default: 5]",
+)
+@click.option(
+    "--max-size", type=int, help="Total bytes of snapshots to keep with --prune"
+)
+def snapshots(name, prune, keep, max_size):
+    manager = DevContainerManager()
+    try:
+        store = snapshot_store.SnapshotStore(manager)
+        if prune:
+            dropped = store.gc(keep, max_size)
+            for record in dropped:
+                click.echo(f"Removed snapshot {record['name']}@{record['tag']}.")
+            click.echo(f"Removed {len(dropped)} snapshots.")
+            return
+        for record in store.list(name):
+            created = time.strftime(
+                "%Y-%m-%d %H:%M:%S", time.localtime(record["created"])
+            )
+            click.echo(
+                f"{record['name']}@{record['tag']}  {created}  "
+                f"{_format_bytes(record['size'])}"
+            )
+    except Exception as e:
+        click.echo(f"Error: {str(e)}")
+
+
+@cli.group("volume")
+def volume_group():
+    """Manage named volumes."""
+
+
+@volume_group.command("seed")
+@click.argument("sources", nargs=-1, required=True, metavar="VOLUME HOST_DIR...")
+@click.option(
+    "--parallel",
+    type=click.IntRange(min=1),
+    default=DEFAULT_MAX_WORKERS,
+    show_default=True,
+    help="Volumes to seed at once",
+)
+@click.option(
+    "--helper-image",
+    help="Local image for the helper container [default: busybox:latest]",
+)
+def volume_seed(sources, parallel, helper_image):
+    """Copy host directories into named volumes.
+
+    Give one or more VOLUME HOST_DIR pairs. Files unchanged since the last
+    seed of a volume are skipped.
+    """
+    if len(sources) % 2:
+        raise click.UsageError("Expected VOLUME HOST_DIR pairs")
+    pairs = dict(zip(sources[::2], sources[1::2]))
+    manager = DevContainerManager()
+    try:
+        seeder = seed.VolumeSeeder(manager, helper_image or seed.DEFAULT_HELPER_IMAGE)
+        results = seeder.seed_many(pairs, parallel)
+    except Exception as e:
+        click.echo(f"Error: {str(e)}")
+        return
+    for result in results:
+        if result["error"] is not None:
+            click.echo(f"Error: {result['name']}: {str(result['error'])}")
+            continue
+        stats = result["stats"]
+        click.echo(
+            f"Volume {result['name']} seeded from {pairs[result['name']]}: "
+            f"{stats['files']} files copied ({_format_bytes(stats['bytes'])}), "
+            f"{stats['unchanged']} unchanged."
+        )
+
+
+def _format_sync_push(result):
+    if result["error"] is not None:
+        return f"Error: {result['volume']}: {str(result['error'])}"
+    return (
+        f"{result['volume']}: copied {result['files']} files "
+        f"({_format_bytes(result['bytes'])}), deleted {result['deleted']}."
+    )
+
+
+@cli.command("sync")
+@click.argument("name")
+@click.option("--once", is_flag=True, help="Copy what changed and exit")
+@click.option(
+    "--ignore",
+    multiple=True,
+    help="Pattern of paths not to copy, on top of .devdockignore",
+)
+@click.option("--poll", is_flag=True, help="Poll for changes instead of inotify")
+def sync_command(name, once, ignore, poll):
+    """Keep the volumes of a dev config created with --sync up to date."""
+    manager = DevContainerManager()
+    try:
+        config = manager.config_manager.read_config(name)
+        if not config.get("sync"):
+            click.echo(f"Error: {name} was not created with --sync")
+            return
+        syncer = file_sync.Syncer(manager, config["sync"], ignore, poll=poll)
+        for result in syncer.seed():
+            if result["error"] is not None:
+                click.echo(f"Error: {result['name']}: {str(result['error'])}")
+                continue
+            stats = result["stats"]
+            click.echo(
+                f"{result['name']}: copied {stats['files']} files "
+                f"({_format_bytes(stats['bytes'])}), {stats['unchanged']} unchanged."
+            )
+        if once:
+            return
+        click.echo("Watching for changes, press Ctrl+C to stop.")
+        for result in syncer.run():
+            click.echo(_format_sync_push(result))
+    except KeyboardInterrupt:
+        pass
+    except FileNotFoundError:
+        click.echo(f"Error: Configuration {name} not found")
+    except Exception as e:
+        click.echo(f"Error: {str(e)}")
+
+
+@cli.group("pool")
+def pool_group():
+    """Manage pools of warm containers for mkdevcontainer --warm."""
+
+
+@pool_group.command("fill")
+@click.argument("image")
+@click.option(
+    "--volumes", multiple=True, help="Volume mappings (host_path:container_path)"
+)
+@click.option(
+    "--size",
+    type=click.IntRange(min=0),
+    default=lambda: pool.DEFAULT_POOL_SIZE,
+    help="Warm containers to keep running  [default: 2]",
+)
+@click.option(
+    "--max-idle",
+    type=float,
+    default=lambda: pool.DEFAULT_MAX_IDLE,
+    help="Seconds an idle container is kept before it is evicted  [default: 3600]",
+)
+@click.option(
+    "--pull",
+    "pull_policy",
+    type=click.Choice(PULL_POLICIES),
+    default=PULL_IF_NOT_PRESENT,
+    show_default=True,
+)
+def pool_fill(image, volumes, size, max_idle, pull_policy):
+    manager = DevContainerManager()
+    try:
+        container_pool = pool.ContainerPool(manager, size=size, max_idle=max_idle)
+        created = container_pool.fill(image, list(volumes), pull_policy)
+        click.echo(f"Started {len(created)} warm containers for {image}.")
+    except Exception as e:
+        click.echo(f"Error: {str(e)}")
+
+
+@pool_group.command("ls")
+def pool_ls():
+    manager = DevContainerManager()
+    try:
+        members = pool.ContainerPool(manager).members()
+    except Exception as e:
+        click.echo(f"Error: {str(e)}")
+        return
+    counts = {}
+    for summary in members:
+        key = (summary["Labels"][pool.POOL_LABEL], summary["Image"])
+        counts[key] = counts.get(key, 0) + (summary["State"] == "running")
+    for (key, image), count in sorted(counts.items()):
+        click.echo(f"{key}  {image}  {count} idle")
+
+
+@pool_group.command("prune")
+@click.option("--all", "drain", is_flag=True, help="Remove every idle container")
+def pool_prune(drain):
+    manager = DevContainerManager()
+    try:
+        removed = pool.ContainerPool(manager).evict(drain=drain)
+        click.echo(f"Removed {len(removed)} warm containers.")
+    except Exception as e:
+        click.echo(f"Error: {str(e)}")
+
+
+@cli.group("cache")
+def cache_group():
+    """Manage the shared cache volumes of mkdevcontainer --cache."""
+
+
+@cache_group.command("ls")
+def cache_ls():
+    manager = DevContainerManager()
+    try:
+        caches = CacheVolumes(manager).list()
+    except Exception as e:
+        click.echo(f"Error: {str(e)}")
+        return
+    for cache in reversed(caches):
+        last_used = (
+            time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(cache["last_used"]))
+            if cache["last_used"]
+            else "never"
+        )
+        size = _format_bytes(cache["size"]) if cache["size"] >= 0 else "-"
+        in_use = "  in use" if cache["in_use"] else ""
+        click.echo(f"{cache['name']}  {size}  {last_used}{in_use}")
+
+
+@cache_group.command("prune")
+@click.option("--max-size", type=int, help="Total bytes of caches to keep")
+@click.option(
+    "--older-than", type=float, help="Remove caches unused for this many days"
+)
+@click.option("--all", "drain", is_flag=True, help="Remove every unused cache")
+def cache_prune(max_size, older_than, drain):
+    manager = DevContainerManager()
+    max_age = older_than * 86400 if older_than is not None else None
+    try:
+        removed = CacheVolumes(manager).prune(max_size, max_age, drain)
+        for cache in removed:
+            click.echo(f"Removed cache {cache['name']}.")
+        click.echo(f"Removed {len(removed)} caches.")
+    except Exception as e:
+        click.echo(f"Error: {str(e)}")
+
+
 @cli.command()
 @click.argument("identifier")
 @click.option("--service", help="The specific service to run the shell in")
@@ -143,8 +997,13 @@ def shell(identifier, service):
     manager = DevContainerManager()
     try:
         if service:
+            compose_file = manager.resolve_compose_file(identifier)
+            container = manager.get_service_container(compose_file, service)
+            if container is not None:
+                run_shell(container.id)
+                return
             result = subprocess.run(
-                ["docker", "compose", "-f", identifier, "exec", service, "/bin/bash"],
+                ["docker", "compose", "-f", compose_file, "exec", service, "/bin/bash"],
                 check=True,
             )
             click.echo(result.stdout)
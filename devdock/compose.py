@@ -0,0 +1,262 @@
+import copy
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from devdock._lazy import lazy_import
+
+yaml = lazy_import("yaml")
+
+
+def _loader():
+    # libyaml's C implementation is an order of magnitude faster on large files.
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def _dumper():
+    return getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+PROJECT_LABEL = "com.docker.compose.project"
+SERVICE_LABEL = "com.docker.compose.service"
+CONTAINER_NUMBER_LABEL = "com.docker.compose.container-number"
+ONEOFF_LABEL = "com.docker.compose.oneoff"
+
+
+def project_name(file_path, compose_data=None):
+    """Return the project name ``docker compose -f file_path`` would use."""
+    name = (
+        os.environ.get("COMPOSE_PROJECT_NAME")
+        or (compose_data or {}).get("name")
+        or os.path.basename(os.path.dirname(os.path.abspath(file_path)))
+    )
+    return re.sub(r"[^a-z0-9_-]", "", name.lower())
+
+
+def load_yaml(text):
+    return yaml.load(text, Loader=_loader())
+
+
+def dump_yaml(data):
+    return yaml.dump(data, Dumper=_dumper())
+
+
+def _referenced_resources(service):
+    networks = service.get("networks") or ["default"]
+    volumes = []
+    for volume in service.get("volumes") or []:
+        source = volume.get("source") if isinstance(volume, dict) else None
+        if isinstance(volume, str) and ":" in volume:
+            source = volume.split(":", 1)[0]
+        if source and not source.startswith((".", "/", "~")):
+            volumes.append(source)
+    return list(networks), volumes
+
+
+def service_hashes(compose_data):
+    """Return a content hash of each service's effective definition.
+
+    Besides the service itself, the hash covers the top-level networks and
+    named volumes it references, so changing one of those marks exactly the
+    services that use it as changed.
+    """
+    compose_data = compose_data or {}
+    top_networks = compose_data.get("networks") or {}
+    top_volumes = compose_data.get("volumes") or {}
+    hashes = {}
+    for name, service in (compose_data.get("services") or {}).items():
+        service = service or {}
+        networks, volumes = _referenced_resources(service)
+        effective = {
+            "service": service,
+            "networks": {n: top_networks.get(n) for n in networks},
+            "volumes": {v: top_volumes.get(v) for v in volumes},
+        }
+        hashes[name] = hashlib.sha256(
+            json.dumps(effective, sort_keys=True, default=str).encode()
+        ).hexdigest()
+    return hashes
+
+
+class ServiceGraph:
+    """Dependency graph of the services in a parsed compose document.
+
+    Both ``depends_on`` forms are understood: the short list of names and the
+    long mapping of name to ``{condition: ...}``. Cycles raise ``ValueError``
+    when the graph is built. Services referenced but not defined are kept as
+    leaves so that ``docker compose`` can report them itself.
+    """
+
+    def __init__(self, compose_data):
+        services = (compose_data or {}).get("services") or {}
+        self.depends_on = {}
+        for name, service in services.items():
+            depends_on = (service or {}).get("depends_on") or {}
+            if isinstance(depends_on, dict):
+                self.depends_on[name] = {
+                    dep: (spec or {}).get("condition", "service_started")
+                    for dep, spec in depends_on.items()
+                }
+            else:
+                self.depends_on[name] = {dep: "service_started" for dep in depends_on}
+        for deps in list(self.depends_on.values()):
+            for dep in deps:
+                self.depends_on.setdefault(dep, {})
+        self.layers = self._layers()
+        self.order = [name for layer in self.layers for name in layer]
+        self._closure = {}
+        for name in self.order:
+            closure = set(self.depends_on[name])
+            for dep in self.depends_on[name]:
+                closure |= self._closure[dep]
+            self._closure[name] = frozenset(closure)
+
+    def _layers(self):
+        remaining = {name: len(deps) for name, deps in self.depends_on.items()}
+        dependents = {name: [] for name in self.depends_on}
+        for name, deps in self.depends_on.items():
+            for dep in deps:
+                dependents[dep].append(name)
+        layers = []
+        ready = sorted(name for name, count in remaining.items() if count == 0)
+        while ready:
+            layers.append(ready)
+            following = []
+            for name in ready:
+                del remaining[name]
+                for dependent in dependents[name]:
+                    remaining[dependent] -= 1
+                    if remaining[dependent] == 0:
+                        following.append(dependent)
+            ready = sorted(following)
+        if remaining:
+            raise ValueError(
+                f"Dependency cycle between services: {', '.join(sorted(remaining))}"
+            )
+        return layers
+
+    def dependencies(self, service):
+        """Return every service that ``service`` transitively depends on."""
+        return self._closure.get(service, frozenset())
+
+    def closure(self, services):
+        result = set(services)
+        for service in services:
+            result |= self.dependencies(service)
+        return result
+
+    def start_order(self, services=None):
+        """Return ``services`` plus their dependencies, dependencies first."""
+        if services is None:
+            return list(self.order)
+        wanted = self.closure(services)
+        ordered = [name for name in self.order if name in wanted]
+        return ordered + sorted(wanted.difference(ordered))
+
+    def start_layers(self, services=None):
+        """Group the start order into layers that can be started concurrently."""
+        wanted = set(self.order if services is None else self.closure(services))
+        return [
+            [name for name in layer if name in wanted]
+            for layer in self.layers
+            if wanted.intersection(layer)
+        ]
+
+
+class _CacheEntry:
+    __slots__ = ("stamp", "digest", "data", "graph")
+
+    def __init__(self, stamp, digest, data, graph=None):
+        self.stamp = stamp
+        self.digest = digest
+        self.data = data
+        self.graph = graph
+
+
+class ComposeCache:
+    """LRU cache of parsed compose documents keyed by path.
+
+    An entry is reused while the file's mtime and size are unchanged. When they
+    differ the file is re-read, but only re-parsed if its SHA-256 changed too.
+    Callers get a deep copy, so mutating the result never poisons the cache.
+    """
+
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _stamp(st):
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _store(self, path, entry):
+        with self._lock:
+            self._entries[path] = entry
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    def _entry(self, file_path):
+        path = os.path.realpath(file_path)
+        with open(path, "rb") as f:
+            stamp = self._stamp(os.fstat(f.fileno()))
+            with self._lock:
+                entry = self._entries.get(path)
+                if entry is not None and entry.stamp == stamp:
+                    self._entries.move_to_end(path)
+                    return entry
+            content = f.read()
+        digest = hashlib.sha256(content).digest()
+        if entry is not None and entry.digest == digest:
+            return self._store(
+                path, _CacheEntry(stamp, digest, entry.data, entry.graph)
+            )
+        return self._store(path, _CacheEntry(stamp, digest, load_yaml(content)))
+
+    def load(self, file_path):
+        return copy.deepcopy(self._entry(file_path).data)
+
+    def service_graph(self, file_path):
+        """Return the ServiceGraph of a compose file, built once per content."""
+        entry = self._entry(file_path)
+        if entry.graph is None:
+            entry.graph = ServiceGraph(entry.data)
+        return entry.graph
+
+    def dump(self, file_path, data):
+        """Write ``data`` unless the file already holds exactly that YAML.
+
+        Returns True when the file was (re)written.
+        """
+        content = dump_yaml(data).encode()
+        digest = hashlib.sha256(content).digest()
+        written = True
+        try:
+            with open(file_path, "rb") as f:
+                if f.read() == content:
+                    written = False
+                    stamp = self._stamp(os.fstat(f.fileno()))
+        except FileNotFoundError:
+            pass
+        if written:
+            with open(file_path, "wb") as f:
+                f.write(content)
+                f.flush()
+                stamp = self._stamp(os.fstat(f.fileno()))
+        self._store(
+            os.path.realpath(file_path),
+            _CacheEntry(stamp, digest, copy.deepcopy(data)),
+        )
+        return written
+
+    def invalidate(self, file_path=None):
+        with self._lock:
+            if file_path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.realpath(file_path), None)
@@ -0,0 +1,524 @@
+import os
+import re
+import subprocess
+import threading
+import time
+from concurrent import futures
+
+from devdock._lazy import lazy_import
+from devdock.compose import (
+    CONTAINER_NUMBER_LABEL,
+    ONEOFF_LABEL,
+    PROJECT_LABEL,
+    SERVICE_LABEL,
+    project_name,
+    service_hashes,
+)
+from devdock.manager import DEFAULT_MAX_WORKERS
+
+docker = lazy_import("docker")
+
+CONFIG_FILES_LABEL = "com.docker.compose.project.config_files"
+CONFIG_HASH_LABEL = "com.docker.compose.config-hash"
+WORKING_DIR_LABEL = "com.docker.compose.project.working_dir"
+NETWORK_LABEL = "com.docker.compose.network"
+VOLUME_LABEL = "com.docker.compose.volume"
+
+# Service keys the SDK engine understands. Anything else (build, deploy, ...)
+# raises UnsupportedComposeFile so the caller falls back to the compose CLI.
+SUPPORTED_SERVICE_KEYS = {
+    "cap_add",
+    "cap_drop",
+    "command",
+    "container_name",
+    "depends_on",
+    "entrypoint",
+    "env_file",
+    "environment",
+    "expose",
+    "extra_hosts",
+    "healthcheck",
+    "hostname",
+    "image",
+    "labels",
+    "network_mode",
+    "networks",
+    "ports",
+    "privileged",
+    "pull_policy",
+    "restart",
+    "stdin_open",
+    "tty",
+    "user",
+    "volumes",
+    "working_dir",
+}
+
+# Compose pull_policy values mapped onto DevContainerManager pull policies.
+PULL_POLICY_ALIASES = {
+    "always": "always",
+    "missing": "if-not-present",
+    "if_not_present": "if-not-present",
+    "never": "never",
+}
+
+DEFAULT_WAIT_TIMEOUT = 300
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(us|ms|s|m|h)")
+_DURATION_UNITS = {"us": 1e3, "ms": 1e6, "s": 1e9, "m": 60e9, "h": 3600e9}
+
+
+def _duration_ns(value):
+    if isinstance(value, (int, float)):
+        return int(value * 1e9)
+    return int(
+        sum(float(n) * _DURATION_UNITS[unit] for n, unit in _DURATION.findall(value))
+    )
+
+
+def _key_values(value, separator="="):
+    """Normalise compose's list-or-mapping syntax into a dict."""
+    if isinstance(value, dict):
+        return dict(value)
+    result = {}
+    for item in value or []:
+        key, sep, val = str(item).partition(separator)
+        result[key] = val if sep else None
+    return result
+
+
+class UnsupportedComposeFile(ValueError):
+    """The compose file uses features only the docker compose CLI handles."""
+
+
+class ComposeEngine:
+    """Runs a compose project through the Docker SDK instead of the CLI.
+
+    Networks, volumes and containers carry the same ``com.docker.compose.*``
+    labels and names the compose CLI uses, so ``docker compose ps``, ``exec``
+    and ``down`` keep working on projects started here. Services are started
+    layer by layer from the project's ServiceGraph, each layer in parallel.
+    """
+
+    def __init__(
+        self,
+        manager,
+        max_workers=DEFAULT_MAX_WORKERS,
+        wait_timeout=DEFAULT_WAIT_TIMEOUT,
+        compose_hash=None,
+    ):
+        self.manager = manager
+        self.max_workers = max_workers
+        self.wait_timeout = wait_timeout
+        if compose_hash is None:
+            compose_hash = os.environ.get("DEVDOCK_COMPOSE_HASH") == "1"
+        self.compose_hash = compose_hash
+
+    @property
+    def client(self):
+        return self.manager.client
+
+    def _load(self, file_path):
+        compose_data = self.manager.read_compose_file(file_path) or {}
+        graph = self.manager.get_service_graph(file_path)
+        return project_name(file_path, compose_data), compose_data, graph
+
+    def _project_labels(self, project, file_path):
+        file_path = os.path.abspath(file_path)
+        return {
+            PROJECT_LABEL: project,
+            CONFIG_FILES_LABEL: file_path,
+            WORKING_DIR_LABEL: os.path.dirname(file_path),
+        }
+
+    def _resource_name(self, project, name, definition):
+        definition = definition or {}
+        if definition.get("name"):
+            return definition["name"]
+        if definition.get("external"):
+            return name
+        return f"{project}_{name}"
+
+    def container_name(self, project, service_name, service):
+        return service.get("container_name") or f"{project}-{service_name}-1"
+
+    def _service_networks(self, service):
+        if service.get("network_mode"):
+            return {}
+        networks = service.get("networks")
+        if networks is None:
+            return {"default": None}
+        if isinstance(networks, dict):
+            return networks
+        return {name: None for name in networks}
+
+    def _ensure_networks(self, project, compose_data, names, labels):
+        declared = compose_data.get("networks") or {}
+        resolved = {}
+        for name in names:
+            definition = declared.get(name) or {}
+            full_name = self._resource_name(project, name, definition)
+            resolved[name] = full_name
+            if definition.get("external") or self.client.networks.list(
+                names=[full_name]
+            ):
+                continue
+            self.client.networks.create(
+                full_name,
+                driver=definition.get("driver"),
+                labels={**labels, NETWORK_LABEL: name},
+            )
+        return resolved
+
+    def _ensure_volume(self, project, compose_data, name, labels):
+        definition = (compose_data.get("volumes") or {}).get(name) or {}
+        full_name = self._resource_name(project, name, definition)
+        if not definition.get("external"):
+            try:
+                self.client.volumes.get(full_name)
+            except docker.errors.NotFound:
+                self.client.volumes.create(
+                    full_name,
+                    driver=definition.get("driver", "local"),
+                    labels={**labels, VOLUME_LABEL: name},
+                )
+        return full_name
+
+    def _mounts(self, project, compose_data, service, base_dir, labels):
+        mounts = []
+        for volume in service.get("volumes") or []:
+            if isinstance(volume, dict):
+                source = volume.get("source")
+                target = volume["target"]
+                read_only = bool(volume.get("read_only"))
+                kind = volume.get("type", "volume")
+            else:
+                parts = volume.split(":")
+                if len(parts) == 1:
+                    source, target, mode = None, parts[0], "rw"
+                else:
+                    source, target = parts[0], parts[1]
+                    mode = parts[2] if len(parts) > 2 else "rw"
+                read_only = "ro" in mode.split(",")
+                kind = (
+                    "bind"
+                    if source and source.startswith((".", "/", "~"))
+                    else "volume"
+                )
+            if kind == "bind":
+                source = os.path.normpath(
+                    os.path.join(base_dir, os.path.expanduser(source))
+                )
+            elif source:
+                source = self._ensure_volume(project, compose_data, source, labels)
+            mounts.append(
+                docker.types.Mount(target, source, type=kind, read_only=read_only)
+            )
+        return mounts
+
+    def _port_range(self, value):
+        start, _, end = value.partition("-")
+        try:
+            start = int(start)
+            end = int(end) if end else start
+        except ValueError:
+            raise UnsupportedComposeFile(f"Unsupported port: {value}")
+        return list(range(start, end + 1))
+
+    def _ports(self, service):
+        ports = {}
+        for port in service.get("ports") or []:
+            if isinstance(port, dict):
+                host_ip = port.get("host_ip")
+                targets = self._port_range(str(port["target"]))
+                protocol = port.get("protocol", "tcp")
+                published = port.get("published")
+                published = str(published) if published else ""
+            else:
+                spec, _, protocol = str(port).partition("/")
+                protocol = protocol or "tcp"
+                parts = spec.rsplit(":", 2)
+                targets = self._port_range(parts[-1])
+                published = parts[-2] if len(parts) > 1 else ""
+                host_ip = parts[0] if len(parts) > 2 else None
+            hosts = self._port_range(published) if published else [None] * len(targets)
+            if len(hosts) != len(targets):
+                raise UnsupportedComposeFile(
+                    f"Port range {port} maps {len(hosts)} host ports "
+                    f"onto {len(targets)} container ports"
+                )
+            for target, host in zip(targets, hosts):
+                ports[f"{target}/{protocol}"] = (host_ip, host) if host_ip else host
+        return ports
+
+    def _environment(self, service, base_dir):
+        env_files = service.get("env_file") or []
+        if isinstance(env_files, str):
+            env_files = [env_files]
+        environment = {}
+        for env_file in env_files:
+            with open(os.path.join(base_dir, env_file)) as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith("#"):
+                        key, _, value = line.partition("=")
+                        environment[key.strip()] = value.strip()
+        for key, value in _key_values(service.get("environment")).items():
+            # A bare variable name takes its value from devdock's environment.
+            environment[key] = os.environ.get(key) if value is None else value
+        return {k: v for k, v in environment.items() if v is not None}
+
+    def _healthcheck(self, healthcheck):
+        if healthcheck.get("disable"):
+            return {"test": ["NONE"]}
+        result = {"test": healthcheck.get("test")}
+        for key in ("interval", "timeout", "start_period"):
+            if key in healthcheck:
+                result[key] = _duration_ns(healthcheck[key])
+        if "retries" in healthcheck:
+            result["retries"] = healthcheck["retries"]
+        return result
+
+    def _restart_policy(self, restart):
+        name, _, retries = restart.partition(":")
+        if name == "no":
+            return None
+        policy = {"Name": name}
+        if retries:
+            policy["MaximumRetryCount"] = int(retries)
+        return policy
+
+    def _validate(self, service_name, service):
+        unsupported = sorted(set(service) - SUPPORTED_SERVICE_KEYS)
+        if unsupported or "image" not in service:
+            raise UnsupportedComposeFile(
+                f"Service {service_name} uses {', '.join(unsupported) or 'build'}, "
+                "which the SDK compose engine does not support"
+            )
+
+    def _config_hashes(self, file_path, compose_data):
+        """Return the hash ``docker compose`` labels each service's container with.
+
+        By default devdock's own service hashes are used, computed from the
+        parsed file; compose does not recognise them, so a later ``docker
+        compose up`` recreates the containers. With ``compose_hash`` set the
+        hash is asked of the compose CLI instead, so those containers are
+        kept, at the cost of running it once per create.
+        """
+        hashes = service_hashes(compose_data)
+        if not self.compose_hash:
+            return hashes
+        try:
+            result = subprocess.run(
+                ["docker", "compose", "-f", file_path, "config", "--hash", "*"],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+        except (OSError, subprocess.CalledProcessError):
+            return hashes
+        for line in result.stdout.splitlines():
+            service, _, config_hash = line.strip().partition(" ")
+            if config_hash:
+                hashes[service] = config_hash
+        return hashes
+
+    def _config_hash(self, service_name, compose_data, file_path, state):
+        # Only needed when a container is created, so nothing is hashed for
+        # an up that merely starts existing containers.
+        with state["lock"]:
+            if state["hashes"] is None:
+                state["hashes"] = self._config_hashes(file_path, compose_data)
+        return state["hashes"].get(service_name, "")
+
+    def _create_kwargs(
+        self, project, service_name, service, compose_data, file_path, networks
+    ):
+        base_dir = os.path.dirname(os.path.abspath(file_path))
+        labels = self._project_labels(project, file_path)
+        kwargs = {
+            "image": service["image"],
+            "name": self.container_name(project, service_name, service),
+            "labels": {
+                **_key_values(service.get("labels")),
+                **labels,
+                SERVICE_LABEL: service_name,
+                CONTAINER_NUMBER_LABEL: "1",
+                ONEOFF_LABEL: "False",
+            },
+            "environment": self._environment(service, base_dir),
+            "mounts": self._mounts(project, compose_data, service, base_dir, labels),
+            "ports": self._ports(service),
+        }
+        for key in (
+            "command",
+            "entrypoint",
+            "working_dir",
+            "user",
+            "hostname",
+            "tty",
+            "stdin_open",
+            "privileged",
+            "cap_add",
+            "cap_drop",
+            "network_mode",
+        ):
+            if key in service:
+                kwargs[key] = service[key]
+        if "extra_hosts" in service:
+            kwargs["extra_hosts"] = _key_values(service["extra_hosts"], ":")
+        if "healthcheck" in service:
+            kwargs["healthcheck"] = self._healthcheck(service["healthcheck"])
+        if service.get("restart"):
+            kwargs["restart_policy"] = self._restart_policy(service["restart"])
+        service_networks = self._service_networks(service)
+        if service_networks:
+            name, options = next(iter(service_networks.items()))
+            aliases = [service_name] + list((options or {}).get("aliases") or [])
+            kwargs["network"] = networks[name]
+            kwargs["networking_config"] = {
+                networks[name]: self.client.api.create_endpoint_config(aliases=aliases)
+            }
+        return kwargs
+
+    def _wait_for(self, container, service_name, condition):
+        deadline = time.monotonic() + self.wait_timeout
+        if condition == "service_completed_successfully":
+            status = container.wait(timeout=self.wait_timeout)["StatusCode"]
+            if status != 0:
+                raise RuntimeError(f"Service {service_name} exited with code {status}")
+            return
+        if condition != "service_healthy":
+            return
+        while True:
+            container.reload()
+            health = container.attrs["State"].get("Health", {}).get("Status")
+            if health == "healthy":
+                return
+            if health == "unhealthy" or time.monotonic() > deadline:
+                raise RuntimeError(f"Service {service_name} did not become healthy")
+            time.sleep(0.5)
+
+    def _start_service(self, project, service_name, compose_data, file_path, state):
+        service = compose_data["services"][service_name]
+        for dependency, condition in state["graph"].depends_on[service_name].items():
+            if dependency in state["started"]:
+                self._wait_for(state["started"][dependency], dependency, condition)
+        name = self.container_name(project, service_name, service)
+        try:
+            container = self.client.containers.get(name)
+        except docker.errors.NotFound:
+            container = None
+        if container is not None and service_name in state["recreate"]:
+            container.remove(force=True)
+            container = None
+        if container is None:
+            kwargs = self._create_kwargs(
+                project,
+                service_name,
+                service,
+                compose_data,
+                file_path,
+                state["networks"],
+            )
+            kwargs["labels"][CONFIG_HASH_LABEL] = self._config_hash(
+                service_name, compose_data, file_path, state
+            )
+            container = self.client.containers.create(**kwargs)
+            # The first network is attached at create time, the rest here.
+            extra_networks = list(self._service_networks(service).items())[1:]
+            for network, options in extra_networks:
+                aliases = [service_name] + list((options or {}).get("aliases") or [])
+                self.client.networks.get(state["networks"][network]).connect(
+                    container, aliases=aliases
+                )
+        if container.status != "running":
+            container.start()
+        return container
+
+    def up(self, file_path, services=None, recreate=None):
+        """Create and start ``services`` (default: all) plus their dependencies.
+
+        Existing containers are started as they are, except those of the
+        services named in ``recreate``, which are replaced. Raises
+        UnsupportedComposeFile, before touching anything, when a service needs
+        the compose CLI.
+        """
+        project, compose_data, graph = self._load(file_path)
+        layers = graph.start_layers(services)
+        wanted = [name for layer in layers for name in layer]
+        missing = [name for name in wanted if name not in compose_data["services"]]
+        if missing:
+            raise ValueError(f"No such service: {', '.join(missing)}")
+        definitions = [compose_data["services"][name] for name in wanted]
+        for name, service in zip(wanted, definitions):
+            self._validate(name, service)
+        labels = self._project_labels(project, file_path)
+        network_names = {
+            name for service in definitions for name in self._service_networks(service)
+        }
+        state = {
+            "graph": graph,
+            "networks": self._ensure_networks(
+                project, compose_data, network_names, labels
+            ),
+            "started": {},
+            "recreate": set(recreate or ()),
+            "hashes": None,
+            "lock": threading.Lock(),
+        }
+        images = {}
+        for service in definitions:
+            policy = PULL_POLICY_ALIASES.get(
+                service.get("pull_policy", "missing"), "if-not-present"
+            )
+            images.setdefault(service["image"], policy)
+
+        with futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(
+                executor.map(
+                    lambda item: self.manager.ensure_image(*item), images.items()
+                )
+            )
+            for layer in layers:
+                jobs = {
+                    name: executor.submit(
+                        self._start_service,
+                        project,
+                        name,
+                        compose_data,
+                        file_path,
+                        state,
+                    )
+                    for name in layer
+                }
+                errors = []
+                for name, job in jobs.items():
+                    try:
+                        state["started"][name] = job.result()
+                    except Exception as e:
+                        errors.append(f"{name}: {str(e)}")
+                if errors:
+                    raise RuntimeError("; ".join(errors))
+        return state["started"]
+
+    def project_containers(self, file_path):
+        project = project_name(file_path, self.manager.read_compose_file(file_path))
+        return self.client.containers.list(
+            all=True, filters={"label": f"{PROJECT_LABEL}={project}"}
+        )
+
+    def down(self, file_path, timeout=10):
+        """Stop and remove the project's containers and networks; keep volumes."""
+        project = project_name(file_path, self.manager.read_compose_file(file_path))
+        containers = self.project_containers(file_path)
+
+        def remove(container):
+            container.stop(timeout=timeout)
+            container.remove()
+
+        with futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(remove, containers))
+        for network in self.client.networks.list(
+            filters={"label": f"{PROJECT_LABEL}={project}"}
+        ):
+            network.remove()
@@ -1,3 +1,4 @@
+from .backends import SqliteConfigBackend, YamlConfigBackend
 from .config_manager import ConfigManager
 
-__all__ = ["ConfigManager"]
+__all__ = ["ConfigManager", "SqliteConfigBackend", "YamlConfigBackend"]
@@ -0,0 +1,178 @@
+import json
+import os
+import tempfile
+import threading
+
+from devdock._lazy import lazy_import
+
+yaml = lazy_import("yaml")
+
+# Config keys that are stored in their own indexed column by SqliteConfigBackend.
+INDEXED_FIELDS = ("type", "image", "compose_file")
+# Filters SqliteConfigBackend.find pushes into SQL; ``name`` is the primary key.
+_SQL_FILTERS = ("name",) + INDEXED_FIELDS
+
+
+def _matches(config, filters):
+    return all(config.get(key) == value for key, value in filters.items())
+
+
+class YamlConfigBackend:
+    """One ``<name>.yaml`` file per config, the original on-disk layout."""
+
+    def __init__(self, base_dir):
+        self.base_dir = base_dir
+        os.makedirs(base_dir, exist_ok=True)
+
+    def get_path(self, name):
+        return os.path.join(self.base_dir, f"{name}.yaml")
+
+    def save(self, name, config):
+        # Write to a temp file in the same directory and rename it over the
+        # target, so readers never see a half-written config.
+        fd, tmp_path = tempfile.mkstemp(dir=self.base_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                yaml.dump(config, f)
+            os.replace(tmp_path, self.get_path(name))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def load(self, name):
+        try:
+            with open(self.get_path(name), "r") as f:
+                return yaml.safe_load(f)
+        except FileNotFoundError:
+            return None
+
+    def delete(self, name):
+        try:
+            os.remove(self.get_path(name))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def names(self):
+        return [
+            os.path.splitext(f)[0]
+            for f in os.listdir(self.base_dir)
+            if f.endswith(".yaml")
+        ]
+
+    def find(self, **filters):
+        names = [filters["name"]] if "name" in filters else self.names()
+        configs = (self.load(name) for name in names)
+        return [c for c in configs if c is not None and _matches(c, filters)]
+
+
+class SqliteConfigBackend:
+    """All configs in a single SQLite database, indexed by name and INDEXED_FIELDS.
+
+    Legacy ``<name>.yaml`` files found next to the database are imported on
+    first use and renamed to ``<name>.yaml.migrated``.
+    """
+
+    def __init__(self, base_dir, filename="configs.sqlite3"):
+        self.base_dir = base_dir
+        self.path = os.path.join(base_dir, filename)
+        os.makedirs(base_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        self._migrate_yaml_files()
+
+    def _connect(self):
+        sqlite3 = lazy_import("sqlite3")
+        conn = sqlite3.connect(
+            self.path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS configs ("
+            " name TEXT PRIMARY KEY,"
+            " type TEXT,"
+            " image TEXT,"
+            " compose_file TEXT,"
+            " data TEXT NOT NULL)"
+        )
+        for field in INDEXED_FIELDS:
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS configs_{field} ON configs ({field})"
+            )
+        return conn
+
+    def _row(self, name, config):
+        return (
+            (name,)
+            + tuple(config.get(f) for f in INDEXED_FIELDS)
+            + (json.dumps(config),)
+        )
+
+    def _migrate_yaml_files(self):
+        legacy = YamlConfigBackend(self.base_dir)
+        names = legacy.names()
+        if not names:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for name in names:
+                    config = legacy.load(name)
+                    if config is None:  # migrated by a concurrent process
+                        continue
+                    self._conn.execute(
+                        "INSERT OR IGNORE INTO configs VALUES (?, ?, ?, ?, ?)",
+                        self._row(name, config),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        for name in names:
+            path = legacy.get_path(name)
+            try:
+                os.replace(path, f"{path}.migrated")
+            except FileNotFoundError:
+                pass
+
+    def save(self, name, config):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO configs VALUES (?, ?, ?, ?, ?)",
+                self._row(name, config),
+            )
+
+    def load(self, name):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM configs WHERE name = ?", (name,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete(self, name):
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM configs WHERE name = ?", (name,))
+        return cursor.rowcount > 0
+
+    def names(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT name FROM configs ORDER BY name")
+            return [row[0] for row in rows]
+
+    def find(self, **filters):
+        indexed = {k: v for k, v in filters.items() if k in _SQL_FILTERS}
+        where = " AND ".join(f"{field} = ?" for field in indexed) or "1"
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT data FROM configs WHERE {where} ORDER BY name",
+                tuple(indexed.values()),
+            ).fetchall()
+        configs = [json.loads(row[0]) for row in rows]
+        return [c for c in configs if _matches(c, filters)]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+BACKENDS = {"sqlite": SqliteConfigBackend, "yaml": YamlConfigBackend}
@@ -1,35 +1,54 @@
 import os
-import yaml
+import threading
+
+from devdock.config.backends import BACKENDS
 
 CONFIG_BASE_DIR = os.path.expanduser("~/.devdock")
+DEFAULT_BACKEND = "sqlite"
 
 
 class ConfigManager:
-    def __init__(self):
-        if not os.path.exists(CONFIG_BASE_DIR):
-            os.makedirs(CONFIG_BASE_DIR)
+    def __init__(self, base_dir=None, backend=None):
+        self.base_dir = base_dir or CONFIG_BASE_DIR
+        if not os.path.exists(self.base_dir):
+            os.makedirs(self.base_dir)
+        if backend is None:
+            backend = os.environ.get("DEVDOCK_CONFIG_BACKEND", DEFAULT_BACKEND)
+        if isinstance(backend, str) and backend not in BACKENDS:
+            raise ValueError(
+                f"Unknown config backend: {backend} "
+                f"(expected one of {', '.join(BACKENDS)})"
+            )
+        self._backend = backend
+        self._backend_lock = threading.Lock()
+
+    @property
+    def backend(self):
+        # Opening the store (and migrating legacy files) is deferred until a
+        # config is actually touched.
+        with self._backend_lock:
+            if isinstance(self._backend, str):
+                self._backend = BACKENDS[self._backend](self.base_dir)
+            return self._backend
 
     def get_config_path(self, name):
-        return os.path.join(CONFIG_BASE_DIR, f"{name}.yaml")
+        return os.path.join(self.base_dir, f"{name}.yaml")
 
     def create_config(self, name, config):
-        with open(self.get_config_path(name), "w") as f:
-            yaml.dump(config, f)
+        self.backend.save(name, config)
 
     def read_config(self, name):
-        config_path = self.get_config_path(name)
-        if os.path.exists(config_path):
-            with open(config_path, "r") as f:
-                return yaml.safe_load(f)
-        else:
+        config = self.backend.load(name)
+        if config is None:
             raise FileNotFoundError(f"No configuration found for {name}")
+        return config
 
     def delete_config(self, name):
-        os.remove(self.get_config_path(name))
+        if not self.backend.delete(name):
+            raise FileNotFoundError(f"No configuration found for {name}")
 
     def list_configs(self):
-        return [
-            os.path.splitext(f)[0]
-            for f in os.listdir(CONFIG_BASE_DIR)
-            if f.endswith(".yaml")
-        ]
+        return self.backend.names()
+
+    def find_configs(self, **filters):
+        return self.backend.find(**filters)
@@ -0,0 +1,63 @@
+import threading
+import time
+
+DEFAULT_TTL = 2.0
+
+
+class ContainerIndex:
+    """Exact name/ID index of every container, built from one list call.
+
+    ``refresh`` issues a single ``GET /containers/json?all=1`` (no per-container
+    inspect) and the result is reused for ``ttl`` seconds, or until
+    ``invalidate`` is called.
+    Identifiers match a container name exactly, a full ID, or an unambiguous
+    ID prefix, the same rules ``docker inspect`` applies.
+    """
+
+    def __init__(self, client, ttl=DEFAULT_TTL):
+        self.client = client
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._refreshed_at = None
+        self._by_name = {}
+        self._by_id = {}
+
+    def is_fresh(self):
+        refreshed_at = self._refreshed_at
+        if refreshed_at is None:
+            return False
+        return time.monotonic() - refreshed_at < self.ttl
+
+    def refresh(self):
+        summaries = self.client.api.containers(all=True)
+        by_name, by_id = {}, {}
+        for summary in summaries:
+            by_id[summary["Id"]] = summary
+            for name in summary.get("Names") or []:
+                by_name[name.lstrip("/")] = summary
+        with self._lock:
+            self._by_name, self._by_id = by_name, by_id
+            self._refreshed_at = time.monotonic()
+
+    def invalidate(self):
+        self._refreshed_at = None
+
+    def summaries(self):
+        """Return the list summaries of all containers, refreshing if stale."""
+        if not self.is_fresh():
+            self.refresh()
+        with self._lock:
+            return list(self._by_id.values())
+
+    def lookup(self, identifier):
+        """Return the list summary of ``identifier``, or None if there is none."""
+        if not self.is_fresh():
+            self.refresh()
+        with self._lock:
+            summary = self._by_name.get(identifier.lstrip("/")) or self._by_id.get(
+                identifier
+            )
+            if summary is not None:
+                return summary
+            matches = [s for i, s in self._by_id.items() if i.startswith(identifier)]
+        return matches[0] if identifier and len(matches) == 1 else None
@@ -0,0 +1,155 @@
+import base64
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+
+from devdock.config.config_manager import CONFIG_BASE_DIR
+from devdock.streams import CommandStream
+
+DEFAULT_SOCKET_PATH = os.path.join(CONFIG_BASE_DIR, "exec.sock")
+
+# Unix domain sockets are not available on Windows.
+_UnixStreamServer = getattr(socketserver, "UnixStreamServer", object)
+
+
+def get_socket_path():
+    return os.environ.get("DEVDOCK_EXEC_SOCKET", DEFAULT_SOCKET_PATH)
+
+
+class _ExecHandler(socketserver.StreamRequestHandler):
+    # One JSON request per line; a client may send several over one connection.
+    # Streaming requests are answered with one {"stream", "data"} line per
+    # chunk (data is base64) followed by a final {"exit_code"} line.
+    def handle(self):
+        for line in self.rfile:
+            self.server.last_request = time.monotonic()
+            try:
+                request = json.loads(line)
+                args = (
+                    request["identifier"],
+                    request["command"],
+                    request.get("service"),
+                )
+                if request.get("stream"):
+                    chunks = self.server.manager.stream_command(*args)
+                    for name, chunk in chunks:
+                        data = base64.b64encode(chunk).decode()
+                        self._send({"stream": name, "data": data})
+                    response = {"exit_code": chunks.exit_code}
+                else:
+                    response = {"output": self.server.manager.run_command(*args)}
+            except Exception as e:
+                response = {"error": str(e)}
+            self._send(response)
+
+    def _send(self, message):
+        self.wfile.write(json.dumps(message).encode() + b"\n")
+        self.wfile.flush()
+
+
+class ExecServer(socketserver.ThreadingMixIn, _UnixStreamServer):
+    """Long-lived helper that serves ``devdock run`` from one warm manager.
+
+    The manager keeps its Docker client and resolved container handles across
+    requests, so repeated runs skip the SDK import, the daemon handshake and
+    the container lookup.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, manager, socket_path=None):
+        self.manager = manager
+        self.socket_path = socket_path or get_socket_path()
+        self.last_request = time.monotonic()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        super().__init__(self.socket_path, _ExecHandler)
+        os.chmod(self.socket_path, 0o600)
+
+    def serve(self, idle_timeout=None):
+        """Serve until interrupted, or until ``idle_timeout`` seconds pass idle."""
+        if idle_timeout:
+            threading.Thread(
+                target=self._shutdown_when_idle, args=(idle_timeout,), daemon=True
+            ).start()
+        try:
+            self.serve_forever()
+        finally:
+            self.server_close()
+
+    def _shutdown_when_idle(self, idle_timeout):
+        while time.monotonic() - self.last_request < idle_timeout:
+            time.sleep(min(1.0, idle_timeout))
+        self.shutdown()
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.remove(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+
+def _open(request, socket_path):
+    socket_path = socket_path or get_socket_path()
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(socket_path):
+        raise ConnectionError(f"No exec server listening on {socket_path}")
+    if request["service"] and os.path.exists(request["identifier"]):
+        # Compose file paths are resolved against the server's working directory.
+        request["identifier"] = os.path.abspath(request["identifier"])
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except (FileNotFoundError, ConnectionRefusedError) as e:
+        sock.close()
+        raise ConnectionError(f"No exec server listening on {socket_path}: {e}")
+    sock.sendall(json.dumps(request).encode() + b"\n")
+    return sock
+
+
+def _read_response(lines):
+    line = next(lines, None)
+    if not line:
+        raise ConnectionError("Exec server closed the connection")
+    response = json.loads(line)
+    if "error" in response:
+        raise RuntimeError(response["error"])
+    return response
+
+
+def send_command(identifier, command, service=None, socket_path=None):
+    """Run a command through a running exec server.
+
+    Raises ``ConnectionError`` when no server is listening, so callers can fall
+    back to running the command in-process.
+    """
+    request = {"identifier": identifier, "command": command, "service": service}
+    with _open(request, socket_path) as sock:
+        return _read_response(iter(sock.makefile("rb")))["output"]
+
+
+def stream_command(identifier, command, service=None, socket_path=None):
+    """Like send_command, but return a CommandStream of the live output."""
+    request = {
+        "identifier": identifier,
+        "command": command,
+        "service": service,
+        "stream": True,
+    }
+    sock = _open(request, socket_path)
+    result = {}
+
+    def chunks():
+        with sock:
+            lines = iter(sock.makefile("rb"))
+            while True:
+                response = _read_response(lines)
+                if "exit_code" in response:
+                    result["exit_code"] = response["exit_code"]
+                    return
+                yield response["stream"], base64.b64decode(response["data"])
+
+    return CommandStream(chunks(), lambda: result["exit_code"])
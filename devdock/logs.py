@@ -0,0 +1,227 @@
+import datetime
+import heapq
+import os
+import queue
+import re
+import threading
+import time
+
+from devdock._lazy import lazy_import
+from devdock.streams import MAX_PENDING_CHUNKS, STDOUT, split_lines
+
+gzip = lazy_import("gzip")
+
+# Seconds a followed container may stay quiet before the others are shown
+# without waiting for it.
+DEFAULT_LAG = 0.5
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUPS = 5
+
+_DURATION = re.compile(r"^(\d+(?:\.\d+)?)([smhd])$")
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+_END = object()
+
+
+def parse_since(value, now=None):
+    """Turn a ``--since`` value into a Unix time for the Docker API.
+
+    Accepts a duration back from now (``30s``, ``10m``, ``2h``, ``1d``), a
+    Unix time, or an ISO 8601 date; dates without a zone are local time.
+    """
+    if value is None:
+        return None
+    now = time.time() if now is None else now
+    match = _DURATION.match(value)
+    if match:
+        return int(now - float(match.group(1)) * _UNITS[match.group(2)])
+    try:
+        return int(float(value))
+    except ValueError:
+        pass
+    try:
+        moment = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"Invalid since value: {value}")
+    if moment.tzinfo is None:
+        moment = moment.astimezone()
+    return int(moment.timestamp())
+
+
+def sort_key(timestamp):
+    """Order Docker's RFC 3339 UTC timestamps, whatever their precision."""
+    seconds, _, fraction = timestamp.rstrip(b"Z").partition(b".")
+    return seconds, fraction.ljust(9, b"0")
+
+
+def _put(lines, item, closed):
+    while not closed.is_set():
+        try:
+            lines.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+class LogStream:
+    """Merge the logs of several containers in timestamp order.
+
+    ``sources`` maps a name to a callable that opens the container's raw log
+    stream, requested with timestamps. Each stream is opened and read on its
+    own thread into a bounded queue, and a heap holding at most one line per
+    container picks the oldest next, so memory stays bounded however long
+    the logs are. Yields ``(name, timestamp, line)``; ``names`` lists the
+    containers in order.
+
+    With ``lag`` None every container is waited for and the order is exact.
+    When following, pass a ``lag``: a container that stays quiet that many
+    seconds is not waited for again until it logs, so one idle container
+    does not hold the others back. Once consumed, ``errors`` maps the name
+    of each stream that failed to its exception.
+    """
+
+    def __init__(self, sources, lag=None):
+        self._sources = dict(sources)
+        self.names = list(self._sources)
+        self.lag = lag
+        self.errors = {}
+        self._opened = []
+
+    def _read(self, name, open_source, lines, wake, closed):
+        try:
+            source = open_source()
+            self._opened.append(source)
+            if closed.is_set():
+                # The consumer finished while this stream was being opened.
+                getattr(source, "close", lambda: None)()
+                return
+            timestamp = b""
+            partial = False
+            for _, line in split_lines((STDOUT, chunk) for chunk in source):
+                if partial:
+                    # The rest of a line too long to pass on in one piece.
+                    message = line
+                else:
+                    timestamp, _, message = line.partition(b" ")
+                partial = not line.endswith(b"\n")
+                if not _put(lines, (timestamp, message), closed):
+                    return
+                wake.set()
+        except Exception as e:
+            if not closed.is_set():
+                self.errors[name] = e
+        _put(lines, _END, closed)
+        wake.set()
+
+    def __iter__(self):
+        names = self.names
+        queues = [queue.Queue(maxsize=MAX_PENDING_CHUNKS) for _ in names]
+        wake = threading.Event()
+        closed = threading.Event()
+        for name, lines in zip(names, queues):
+            threading.Thread(
+                target=self._read,
+                args=(name, self._sources[name], lines, wake, closed),
+                daemon=True,
+            ).start()
+        heap = []
+        active = set(range(len(names)))
+        # Active streams without a line in the heap.
+        waiting = set(active)
+        idle = set()
+        stalled_at = None
+        try:
+            while active:
+                wake.clear()
+                for index in list(waiting):
+                    try:
+                        item = queues[index].get_nowait()
+                    except queue.Empty:
+                        continue
+                    waiting.discard(index)
+                    idle.discard(index)
+                    if item is _END:
+                        active.discard(index)
+                    else:
+                        timestamp, message = item
+                        heapq.heappush(
+                            heap, (sort_key(timestamp), index, timestamp, message)
+                        )
+                blocking = waiting - idle
+                if heap and not blocking:
+                    _, index, timestamp, message = heapq.heappop(heap)
+                    waiting.add(index)
+                    stalled_at = None
+                    yield names[index], timestamp, message
+                elif not heap or self.lag is None:
+                    if active:
+                        wake.wait()
+                else:
+                    now = time.monotonic()
+                    if stalled_at is None:
+                        stalled_at = now
+                    remaining = stalled_at + self.lag - now
+                    if remaining > 0:
+                        wake.wait(remaining)
+                    else:
+                        idle |= blocking
+                        stalled_at = None
+        finally:
+            closed.set()
+            for source in self._opened:
+                close = getattr(source, "close", None)
+                if close is not None:
+                    close()
+
+
+class RotatingWriter:
+    """Write bytes to ``path``, rotating it once ``max_bytes`` are written.
+
+    Rotated files are ``path.1`` (newest) to ``path.<backups>``, so disk use
+    stays bounded. A path ending in ``.gz`` is written gzip-compressed and
+    rotated to ``name.1.gz`` and so on; ``max_bytes`` then counts the bytes
+    before compression.
+    """
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES, backups=DEFAULT_BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.compressed = path.endswith(".gz")
+        self._open()
+
+    def _name(self, index):
+        if not index:
+            return self.path
+        if self.compressed:
+            return f"{self.path[:-3]}.{index}.gz"
+        return f"{self.path}.{index}"
+
+    def _open(self):
+        if self.compressed:
+            self._file = gzip.open(self.path, "wb")
+        else:
+            self._file = open(self.path, "wb")
+        self._written = 0
+
+    def write(self, data):
+        if self._written and self._written + len(data) > self.max_bytes:
+            self.rotate()
+        self._file.write(data)
+        self._written += len(data)
+
+    def rotate(self):
+        self._file.close()
+        for index in range(self.backups, 0, -1):
+            if os.path.exists(self._name(index - 1)):
+                os.replace(self._name(index - 1), self._name(index))
+        self._open()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
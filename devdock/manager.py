@@ -1,28 +1,148 @@
-import docker
-import yaml
+import fnmatch
+import os
 import subprocess
+from concurrent import futures
+
+from devdock._lazy import lazy_import
+from devdock.cache import CacheVolumes, cache_mounts, compose_cache_mounts
+from devdock.compose import (
+    CONTAINER_NUMBER_LABEL,
+    ONEOFF_LABEL,
+    PROJECT_LABEL,
+    SERVICE_LABEL,
+    ComposeCache,
+    project_name,
+    service_hashes,
+)
 from devdock.config.config_manager import ConfigManager
+from devdock.container_index import ContainerIndex
+from devdock.profiling import span
+from devdock.streams import FanOutStream, exec_stream, process_stream
+
+docker = lazy_import("docker")
+yaml = lazy_import("yaml")
+pool = lazy_import("devdock.pool")
+file_sync = lazy_import("devdock.sync")
+container_logs = lazy_import("devdock.logs")
+# Both import DEFAULT_MAX_WORKERS from here, so are only loaded once used.
+compose_sdk = lazy_import("devdock.compose_engine")
+container_stats = lazy_import("devdock.stats")
+
+PULL_ALWAYS = "always"
+PULL_IF_NOT_PRESENT = "if-not-present"
+PULL_NEVER = "never"
+PULL_POLICIES = (PULL_ALWAYS, PULL_IF_NOT_PRESENT, PULL_NEVER)
+
+# The Docker SDK keeps at most 10 pooled connections per client by default.
+DEFAULT_MAX_WORKERS = 8
+
+COMPOSE_ENGINE_CLI = "cli"
+COMPOSE_ENGINE_SDK = "sdk"
+COMPOSE_ENGINES = (COMPOSE_ENGINE_CLI, COMPOSE_ENGINE_SDK)
+
+
+def _summary_name(summary):
+    names = summary.get("Names") or []
+    return names[0].lstrip("/") if names else summary["Id"]
+
+
+def _label_matches(labels, selector):
+    key, sep, value = selector.partition("=")
+    return key in labels and (not sep or labels[key] == value)
+
+
+def _replace_mount(service, source, container_path):
+    # One mount per container path; the latest mapping wins.
+    service["volumes"] = [
+        volume
+        for volume in service.get("volumes") or []
+        if not isinstance(volume, str) or volume.split(":")[1:2] != [container_path]
+    ] + [f"{source}:{container_path}"]
 
 
 class DevContainerManager:
-    def __init__(self):
-        self.client = docker.from_env()
+    def __init__(self, client=None, compose_engine=None):
+        self._client = client
+        if compose_engine is None:
+            compose_engine = os.environ.get(
+                "DEVDOCK_COMPOSE_ENGINE", COMPOSE_ENGINE_CLI
+            )
+        if compose_engine not in COMPOSE_ENGINES:
+            raise ValueError(
+                f"Unknown compose engine: {compose_engine} "
+                f"(expected one of {', '.join(COMPOSE_ENGINES)})"
+            )
+        self.compose_engine = compose_engine
         self.config_manager = ConfigManager()
+        self.compose_cache = ComposeCache()
+        # Resolved exec targets keyed by (identifier, service), reused across
+        # run_command calls for as long as this manager lives.
+        self._exec_targets = {}
+        self._container_index = None
+
+    @property
+    def client(self):
+        # Connecting to the daemon is deferred until a command actually needs it,
+        # so config-only commands never pay for the handshake.
+        if self._client is None:
+            self._client = docker.from_env()
+        return self._client
+
+    @client.setter
+    def client(self, client):
+        self._client = client
+        self._container_index = None
+
+    @property
+    def container_index(self):
+        if self._container_index is None:
+            self._container_index = ContainerIndex(self.client)
+        return self._container_index
 
     def get_container(self, identifier):
+        # Names match exactly. A warm index resolves a name to its ID; a miss
+        # may be a container created since it was listed, so the daemon has
+        # the last word. A cold index is not worth a full list.
+        container_id = identifier
+        index = self._container_index
+        if index is not None and index.is_fresh():
+            summary = index.lookup(identifier)
+            if summary is not None:
+                container_id = summary["Id"]
         try:
-            return self.client.containers.get(identifier)
+            return self.client.containers.get(container_id)
         except docker.errors.NotFound:
-            containers = self.client.containers.list(
-                all=True, filters={"name": identifier}
-            )
-            if containers:
-                return containers[0]
             raise docker.errors.NotFound(f"Container {identifier} not found")
 
-    def create_container(self, image, name, volumes=None):
+    def _containers_changed(self):
+        if self._container_index is not None:
+            self._container_index.invalidate()
+
+    def ensure_image(self, image, pull_policy=PULL_IF_NOT_PRESENT):
+        if pull_policy not in PULL_POLICIES:
+            raise ValueError(
+                f"Invalid pull policy: {pull_policy} "
+                f"(expected one of {', '.join(PULL_POLICIES)})"
+            )
+        if pull_policy != PULL_ALWAYS:
+            # images.get resolves both tags and repo@sha256 digests against the
+            # local store without contacting the registry.
+            try:
+                return self.client.images.get(image)
+            except docker.errors.ImageNotFound:
+                if pull_policy == PULL_NEVER:
+                    raise docker.errors.ImageNotFound(
+                        f"Image {image} not found locally and pull policy is "
+                        f"'{PULL_NEVER}'"
+                    )
+        with span("docker.pull"):
+            return self.client.images.pull(image)
+
+    def create_container(
+        self, image, name, volumes=None, pull_policy=PULL_IF_NOT_PRESENT, labels=None
+    ):
         try:
-            self.client.images.pull(image)
+            self.ensure_image(image, pull_policy)
 
             volume_bindings = {}
             if volumes:
@@ -33,15 +153,18 @@ class DevContainerManager:
                     host_path, container_path = parts
                     volume_bindings[host_path] = {"bind": container_path, "mode": "rw"}
 
-            container = self.client.containers.run(
-                image=image,
-                name=name,
-                volumes=volume_bindings,
-                detach=True,
-                stdin_open=True,
-                tty=True,
-                command="/bin/sh",
-            )
+            with span("docker.run"):
+                container = self.client.containers.run(
+                    image=image,
+                    name=name,
+                    volumes=volume_bindings,
+                    labels=labels,
+                    detach=True,
+                    stdin_open=True,
+                    tty=True,
+                    command="/bin/sh",
+                )
+            self._containers_changed()
             return container
         except docker.errors.ImageNotFound as e:
             raise docker.errors.ImageNotFound(str(e))
@@ -50,27 +173,28 @@ class DevContainerManager:
         except Exception as e:
             raise RuntimeError(f"Failed to create container: {str(e)}")
 
-    def create_dev_compose(self, name, compose_file, volume_mappings=None):
+    def create_dev_compose(
+        self, name, compose_file, volume_mappings=None, caches=None, sync=False
+    ):
+        """Generate ``<file>.dev.yaml`` and bring its services up incrementally.
+
+        The dev file is only rewritten when its content changes, and only
+        services whose effective definition changed since the last run (or
+        that are not running) are passed to compose, so re-running with the
+        same inputs does no work. ``caches`` mounts shared cache volumes into
+        the services (see ``compose_cache_mounts``). With ``sync``, host
+        directories in ``volume_mappings`` are copied into volumes instead of
+        bind-mounted (see ``devdock.sync.Syncer``).
+        """
         try:
-            compose_data = self.read_compose_file(compose_file)
-            dev_compose_file = f"{compose_file.rsplit('.', 1)[0]}.dev.yaml"
-            if volume_mappings:
-                for mapping in volume_mappings:
-                    service_name, host_path, container_path = mapping.split(":")
-                    if service_name in compose_data["services"]:
-                        updated_volumes = [f"{host_path}:{container_path}"]
-                        if "volumes" in compose_data["services"][service_name]:
-                            compose_data["services"][service_name]["volumes"].extend(
-                                updated_volumes
-                            )
-                        else:
-                            compose_data["services"][service_name]["volumes"] = (
-                                updated_volumes
-                            )
-            self.write_compose_file(dev_compose_file, compose_data)
-            self.start_compose_services(dev_compose_file)
-            config = {"type": "compose", "name": name, "compose_file": dev_compose_file}
-            self.config_manager.create_config(name, config)
+            plan = self._plan_dev_compose(
+                name, compose_file, volume_mappings, caches, sync
+            )
+            if plan["stale"]:
+                self.start_compose_services(
+                    plan["compose_file"], plan["stale"], recreate=plan["recreate"]
+                )
+            self._save_dev_compose(name, plan)
         except FileNotFoundError as e:
             raise FileNotFoundError(f"Docker Compose file {compose_file} not found")
         except ValueError as e:
@@ -78,6 +202,94 @@ class DevContainerManager:
         except Exception as e:
             raise RuntimeError(f"Failed to create dev compose: {str(e)}")
 
+    def _plan_dev_compose(self, name, compose_file, volume_mappings, caches, sync):
+        # The daemon-side preparation of create_dev_compose: write the dev
+        # file, seed sync volumes and ensure caches. Starting the services is
+        # left to the caller so the async manager can run compose itself.
+        compose_data = self.read_compose_file(compose_file)
+        dev_compose_file = f"{compose_file.rsplit('.', 1)[0]}.dev.yaml"
+        sources = {}
+        if volume_mappings:
+            for mapping in volume_mappings:
+                service_name, host_path, container_path = mapping.split(":")
+                if service_name in compose_data["services"]:
+                    service = compose_data["services"][service_name]
+                    if sync and file_sync.is_sync_source(host_path):
+                        # Compose resolves relative paths from the file.
+                        host_path = os.path.join(
+                            os.path.dirname(os.path.abspath(compose_file)),
+                            os.path.expanduser(host_path),
+                        )
+                        volume = file_sync.sync_volume(name, host_path)
+                        sources[volume] = os.path.normpath(host_path)
+                        host_path = volume
+                        top_volumes = compose_data.get("volumes") or {}
+                        top_volumes[volume] = {"external": True}
+                        compose_data["volumes"] = top_volumes
+                    _replace_mount(service, host_path, container_path)
+        if sources:
+            self._seed_sync_volumes(sources)
+        mounts = []
+        if caches:
+            services = compose_data["services"]
+            for service_name, mappings in compose_cache_mounts(
+                caches, services
+            ).items():
+                for mapping in mappings:
+                    volume, container_path = mapping.split(":")
+                    _replace_mount(services[service_name], volume, container_path)
+                    mounts.append(mapping)
+            # Created by devdock, so compose must not prefix the names.
+            top_volumes = compose_data.get("volumes") or {}
+            for mapping in mounts:
+                top_volumes[mapping.split(":")[0]] = {"external": True}
+            compose_data["volumes"] = top_volumes
+            CacheVolumes(self).ensure(mounts)
+        self.write_compose_file(dev_compose_file, compose_data)
+
+        hashes = service_hashes(compose_data)
+        try:
+            previous = self.config_manager.read_config(name)
+        except FileNotFoundError:
+            previous = {}
+        previous_hashes = {}
+        if previous.get("compose_file") == dev_compose_file:
+            previous_hashes = previous.get("service_hashes") or {}
+        changed = [s for s, h in hashes.items() if previous_hashes.get(s) != h]
+        running = self.get_running_services(dev_compose_file) if hashes else set()
+        stale = [s for s in hashes if s in changed or s not in running]
+        config = {
+            "type": "compose",
+            "name": name,
+            "compose_file": dev_compose_file,
+            "service_hashes": hashes,
+        }
+        if caches:
+            config["cache"] = list(caches)
+        if sources:
+            config["sync"] = sources
+        return {
+            "compose_file": dev_compose_file,
+            "stale": stale,
+            "recreate": changed,
+            "config": config,
+            "previous": previous,
+        }
+
+    def _save_dev_compose(self, name, plan):
+        if plan["config"] != plan["previous"]:
+            self.config_manager.create_config(name, plan["config"])
+
+    def get_running_services(self, compose_file):
+        """Return the names of the compose services with a running container."""
+        compose_data = self.read_compose_file(compose_file)
+        containers = self.client.containers.list(
+            filters={
+                "label": f"{PROJECT_LABEL}={project_name(compose_file, compose_data)}"
+            }
+        )
+        return {container.labels.get(SERVICE_LABEL) for container in containers}
+
     def start_container(self, identifier):
         try:
             container = self.get_container(identifier)
@@ -87,10 +299,10 @@ class DevContainerManager:
         except Exception as e:
             raise RuntimeError(f"Failed to start container: {str(e)}")
 
-    def stop_container(self, identifier):
+    def stop_container(self, identifier, timeout=None, signal=None):
         try:
             container = self.get_container(identifier)
-            container.stop()
+            self._stop(container, timeout, signal)
         except docker.errors.NotFound:
             raise docker.errors.NotFound(f"Container {identifier} not found")
         except Exception as e:
@@ -100,35 +312,433 @@ class DevContainerManager:
         try:
             container = self.get_container(identifier)
             container.remove()
+            self._containers_changed()
         except docker.errors.NotFound:
             raise docker.errors.NotFound(f"Container {identifier} not found")
         except Exception as e:
             raise RuntimeError(f"Failed to remove container: {str(e)}")
 
-    def run_command(self, identifier, command, service=None):
+    def _stop(self, container, timeout=None, signal=None):
+        if signal:
+            # docker stop always sends the image's StopSignal; deliver the
+            # requested one first and let stop enforce the timeout.
+            container.kill(signal=signal)
+        container.stop(timeout=timeout)
+
+    def stats_targets(self, name=None):
+        """Map the running containers of a dev config (or of every config) to IDs.
+
+        A container config maps to its container, a compose config to every
+        container of its compose project. Resolved with one list call.
+        """
+        if name:
+            configs = [self.config_manager.read_config(name)]
+        else:
+            configs = self.config_manager.find_configs()
+        names = {c["name"] for c in configs if c["type"] == "container"}
+        projects = {self._config_project(c) for c in configs if c["type"] == "compose"}
+        targets = {}
+        for summary in self.container_index.summaries():
+            if summary.get("State") != "running":
+                continue
+            container_name = _summary_name(summary)
+            labels = summary.get("Labels") or {}
+            if container_name in names or labels.get(PROJECT_LABEL) in projects:
+                targets[container_name] = summary["Id"]
+        return targets
+
+    def _config_project(self, config):
+        compose_file = config["compose_file"]
+        try:
+            compose_data = self.read_compose_file(compose_file)
+        except FileNotFoundError:
+            compose_data = None
+        return project_name(compose_file, compose_data)
+
+    def status(self, name=None, config_type=None):
+        """Return the state of every dev config (or of ``name``).
+
+        The configs are read in one pass and joined in memory with one list of
+        containers, so the cost does not grow with a daemon round trip per
+        config. Each row is ``{"name", "type", "source", "state",
+        "containers"}`` where ``source`` is the image or compose file and
+        ``containers`` has one ``{"service", "name", "id", "state", "status",
+        "created"}`` entry per container or compose service; ``status`` is
+        the daemon's summary such as ``Up 2 hours``. A config's state is the
+        container's state, or for compose ``running``, ``partial`` or
+        ``stopped``; ``missing`` when it has no container.
+        """
+        filters = {}
+        if config_type:
+            filters["type"] = config_type
+        if name:
+            filters["name"] = name
+        configs = self.config_manager.find_configs(**filters)
+        if name and not configs:
+            raise FileNotFoundError(f"No configuration found for {name}")
+        by_name, by_project = {}, {}
+        for summary in self.container_index.summaries():
+            labels = summary.get("Labels") or {}
+            if labels.get(ONEOFF_LABEL) == "True":
+                continue
+            by_name[_summary_name(summary)] = summary
+            if PROJECT_LABEL in labels:
+                by_project.setdefault(labels[PROJECT_LABEL], []).append(summary)
+
+        def entry(service, summary):
+            if summary is None:
+                return {
+                    "service": service,
+                    "name": None,
+                    "id": None,
+                    "state": "missing",
+                    "status": "",
+                    "created": None,
+                }
+            return {
+                "service": service,
+                "name": _summary_name(summary),
+                "id": summary["Id"],
+                "state": summary.get("State", ""),
+                "status": summary.get("Status", ""),
+                "created": summary.get("Created"),
+            }
+
+        rows = []
+        for config in sorted(configs, key=lambda c: c["name"]):
+            if config["type"] == "compose":
+                summaries = sorted(
+                    by_project.get(self._config_project(config), []),
+                    key=_summary_name,
+                )
+                services = {}
+                for summary in summaries:
+                    service = summary["Labels"].get(SERVICE_LABEL)
+                    services.setdefault(service, []).append(summary)
+                containers = [
+                    entry(service, summary)
+                    for service in config.get("service_hashes") or {}
+                    for summary in services.pop(service, [None])
+                ]
+                containers += [
+                    entry(service, summary)
+                    for service, summaries in sorted(services.items())
+                    for summary in summaries
+                ]
+                running = sum(c["state"] == "running" for c in containers)
+                if not containers or all(c["state"] == "missing" for c in containers):
+                    state = "missing"
+                elif running == len(containers):
+                    state = "running"
+                else:
+                    state = "partial" if running else "stopped"
+                source = config["compose_file"]
+            else:
+                containers = [entry(None, by_name.get(config["name"]))]
+                state = containers[0]["state"]
+                source = config.get("image")
+            rows.append(
+                {
+                    "name": config["name"],
+                    "type": config["type"],
+                    "source": source,
+                    "state": state,
+                    "containers": containers,
+                }
+            )
+        return rows
+
+    def sample_stats(self, name=None, max_workers=DEFAULT_MAX_WORKERS):
+        """Return one resource-usage row per running container of ``name``."""
+        return container_stats.sample_once(
+            self.client.api, self.stats_targets(name), max_workers
+        )
+
+    def stream_stats(self, name=None, interval=None):
+        """Yield resource-usage rows for ``name`` every ``interval`` seconds."""
+        if interval is None:
+            interval = container_stats.DEFAULT_INTERVAL
+        targets = self.stats_targets(name)
+        with container_stats.StatsSampler(self.client.api, targets) as sampler:
+            yield from sampler.samples(interval)
+
+    def select_containers(
+        self, identifiers=(), pattern=None, labels=None, config_type=None
+    ):
+        """Resolve identifiers and selectors to containers with one list call.
+
+        ``pattern`` is a glob on the container name, ``labels`` a list of
+        ``key`` or ``key=value`` filters, and ``config_type`` picks the
+        containers of every devdock config of that type (``container`` or
+        ``compose``). The selectors are combined with AND; explicit
+        identifiers are added on top. Returns ``(containers, missing)`` where
+        ``containers`` maps names to sparse containers and ``missing`` lists
+        identifiers that matched nothing.
+        """
+        index = self.container_index
+        selected = {}
+        missing = []
+        for identifier in identifiers:
+            summary = index.lookup(identifier)
+            if summary is None:
+                missing.append(identifier)
+            else:
+                selected[_summary_name(summary)] = summary
+
+        if pattern or labels or config_type:
+            names = projects = None
+            if config_type:
+                configs = self.config_manager.find_configs(type=config_type)
+                names = {c["name"] for c in configs if c["type"] == "container"}
+                projects = {
+                    self._config_project(c) for c in configs if c["type"] == "compose"
+                }
+            for summary in index.summaries():
+                name = _summary_name(summary)
+                summary_labels = summary.get("Labels") or {}
+                if pattern and not fnmatch.fnmatchcase(name, pattern):
+                    continue
+                if labels and not all(
+                    _label_matches(summary_labels, label) for label in labels
+                ):
+                    continue
+                if config_type and not (
+                    name in names or summary_labels.get(PROJECT_LABEL) in projects
+                ):
+                    continue
+                selected[name] = summary
+
+        containers = {
+            name: self.client.containers.prepare_model(summary)
+            for name, summary in sorted(selected.items())
+        }
+        return containers, missing
+
+    def _bulk(self, action, containers, max_workers):
+        def run(item):
+            name, container = item
+            try:
+                action(container)
+                return {"name": name, "error": None}
+            except Exception as e:
+                return {"name": name, "error": e}
+
+        with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(run, containers.items()))
+
+    def start_containers(self, containers, max_workers=DEFAULT_MAX_WORKERS):
+        """Start ``{name: container}`` concurrently; one result dict per name."""
+        return self._bulk(lambda c: c.start(), containers, max_workers)
+
+    def stop_containers(
+        self, containers, timeout=None, signal=None, max_workers=DEFAULT_MAX_WORKERS
+    ):
+        return self._bulk(
+            lambda c: self._stop(c, timeout, signal), containers, max_workers
+        )
+
+    def remove_containers(
+        self, containers, force=False, max_workers=DEFAULT_MAX_WORKERS
+    ):
+        try:
+            return self._bulk(lambda c: c.remove(force=force), containers, max_workers)
+        finally:
+            self._containers_changed()
+
+    def resolve_compose_file(self, identifier):
+        """Map a compose dev config name to its compose file; paths pass through."""
+        if os.path.exists(identifier):
+            return identifier
+        try:
+            config = self.config_manager.read_config(identifier)
+        except FileNotFoundError:
+            return identifier
+        return config.get("compose_file", identifier)
+
+    def get_service_container(self, compose_file, service):
+        """Return the running container of a compose service, or None."""
         try:
+            compose_data = self.read_compose_file(compose_file)
+        except FileNotFoundError:
+            compose_data = None
+        containers = self.client.containers.list(
+            filters={
+                "label": [
+                    f"{PROJECT_LABEL}={project_name(compose_file, compose_data)}",
+                    f"{SERVICE_LABEL}={service}",
+                ]
+            }
+        )
+        if not containers:
+            return None
+        # Like `docker compose exec`, prefer the first replica.
+        return min(
+            containers,
+            key=lambda c: int(c.labels.get(CONTAINER_NUMBER_LABEL, "0") or 0),
+        )
+
+    def _exec_target(self, identifier, service=None):
+        key = (identifier, service)
+        container = self._exec_targets.get(key)
+        if container is None:
             if service:
-                result = subprocess.run(
-                    ["docker", "compose", "-f", identifier, "exec", service]
-                    + command.split(),
-                    capture_output=True,
-                    text=True,
+                container = self.get_service_container(
+                    self.resolve_compose_file(identifier), service
                 )
             else:
                 container = self.get_container(identifier)
-                result = container.exec_run(command)
-                return result.output.decode()
+            if container is not None:
+                self._exec_targets[key] = container
+        return container
+
+    def run_command(self, identifier, command, service=None):
+        try:
+            container = self._exec_target(identifier, service)
+            if container is None:
+                compose_file = self.resolve_compose_file(identifier)
+                with span("compose.exec"):
+                    result = subprocess.run(
+                        ["docker", "compose", "-f", compose_file, "exec", service]
+                        + command.split(),
+                        capture_output=True,
+                        text=True,
+                    )
+                return result.stdout
+            try:
+                with span("docker.exec"):
+                    result = container.exec_run(command)
+            except docker.errors.APIError:
+                # The cached handle may have gone stale: the container was
+                # removed (404) or recreated and is not running (409).
+                self._exec_targets.pop((identifier, service), None)
+                container = self._exec_target(identifier, service)
+                if container is None:
+                    raise
+                with span("docker.exec"):
+                    result = container.exec_run(command)
+            return result.output.decode()
         except docker.errors.NotFound:
             raise docker.errors.NotFound(f"Container {identifier} not found")
         except subprocess.CalledProcessError as e:
             raise RuntimeError(f"Failed to run command in service: {str(e)}")
         except Exception as e:
             raise RuntimeError(f"Failed to run command: {str(e)}")
-        return result.stdout
 
-    def create_volume(self, name):
+    def stream_command(self, identifier, command, service=None):
+        """Run a command and return a CommandStream of its output as it arrives.
+
+        Unlike run_command nothing is buffered: stdout and stderr are yielded
+        separately, and the stream's ``exit_code`` is set once it is consumed.
+        """
+        try:
+            container = self._exec_target(identifier, service)
+            if container is None:
+                compose_file = self.resolve_compose_file(identifier)
+                process = subprocess.Popen(
+                    ["docker", "compose", "-f", compose_file, "exec", "-T", service]
+                    + command.split(),
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                )
+                return process_stream(process)
+            try:
+                return exec_stream(self.client.api, container.id, command)
+            except docker.errors.APIError:
+                self._exec_targets.pop((identifier, service), None)
+                container = self._exec_target(identifier, service)
+                if container is None:
+                    raise
+                return exec_stream(self.client.api, container.id, command)
+        except docker.errors.NotFound:
+            raise docker.errors.NotFound(f"Container {identifier} not found")
+        except Exception as e:
+            raise RuntimeError(f"Failed to run command: {str(e)}")
+
+    def command_targets(self, names, service=None):
+        """Map every container of the dev configs ``names`` to its ID.
+
+        A compose config contributes each of its services, or only
+        ``service``. Containers that are not running map to ``None``. Returns
+        ``(targets, missing)`` like ``select_containers``.
+        """
+        rows = {row["name"]: row for row in self.status()}
+        targets, missing = {}, []
+        for name in names:
+            row = rows.get(name)
+            if row is None:
+                missing.append(name)
+                continue
+            for container in row["containers"]:
+                if service and container["service"] != service:
+                    continue
+                label = container["name"] or "/".join(
+                    filter(None, (name, container["service"]))
+                )
+                running = container["state"] == "running"
+                targets[label] = container["id"] if running else None
+        return targets, missing
+
+    def stream_commands(
+        self, targets, command, max_workers=DEFAULT_MAX_WORKERS, fail_fast=False
+    ):
+        """Run ``command`` in ``{name: container_id}`` concurrently.
+
+        Returns a FanOutStream of ``(name, stream, line)`` tuples; see it for
+        the per-target results and the aggregate exit code.
+        """
+        return FanOutStream(
+            lambda container_id: exec_stream(self.client.api, container_id, command),
+            targets,
+            max_workers,
+            fail_fast,
+        )
+
+    def log_targets(self, name, services=()):
+        """Map every container of dev config ``name`` to its ID for logs.
+
+        Stopped containers are included; ``services`` limits a compose
+        config to those services.
+        """
+        row = self.status(name)[0]
+        targets = {
+            container["name"]: container["id"]
+            for container in row["containers"]
+            if container["id"] is not None
+            and (not services or container["service"] in services)
+        }
+        if not targets:
+            raise RuntimeError(f"No containers found for {name}")
+        return targets
+
+    def stream_logs(self, name, services=(), follow=False, since=None, tail=None):
+        """Return a LogStream merging the logs of ``name``'s containers.
+
+        ``since`` is a Unix time and ``tail`` the number of lines to show from
+        the end of each container's log.
+        """
+        api = self.client.api
+
+        def opener(container_id):
+            return lambda: api.logs(
+                container_id,
+                stream=True,
+                follow=follow,
+                timestamps=True,
+                since=since,
+                tail="all" if tail is None else tail,
+            )
+
+        return container_logs.LogStream(
+            {
+                label: opener(container_id)
+                for label, container_id in self.log_targets(name, services).items()
+            },
+            lag=container_logs.DEFAULT_LAG if follow else None,
+        )
+
+    def create_volume(self, name, labels=None):
         try:
-            volume = self.client.volumes.create(name)
+            volume = self.client.volumes.create(name, labels=labels)
             return volume
         except Exception as e:
             raise RuntimeError(f"Failed to create volume: {str(e)}")
@@ -144,8 +754,7 @@ class DevContainerManager:
 
     def read_compose_file(self, file_path):
         try:
-            with open(file_path, "r") as file:
-                return yaml.safe_load(file)
+            return self.compose_cache.load(file_path)
         except FileNotFoundError:
             raise FileNotFoundError(f"Docker Compose file {file_path} not found")
         except yaml.YAMLError as e:
@@ -153,32 +762,50 @@ class DevContainerManager:
 
     def write_compose_file(self, file_path, data):
         try:
-            with open(file_path, "w") as file:
-                yaml.safe_dump(data, file)
+            return self.compose_cache.dump(file_path, data)
         except Exception as e:
             raise RuntimeError(f"Failed to write Docker Compose file: {str(e)}")
 
-    def start_compose_services(self, file_path, services=None):
+    def start_compose_services(self, file_path, services=None, recreate=None):
+        # The compose CLI decides on its own which containers to recreate from
+        # their config hash; ``recreate`` names them for the SDK engine.
+        if self.compose_engine == COMPOSE_ENGINE_SDK:
+            try:
+                compose_sdk.ComposeEngine(self).up(
+                    file_path, services or None, recreate
+                )
+                return
+            except compose_sdk.UnsupportedComposeFile:
+                # E.g. a service with build:; the compose CLI handles it.
+                pass
         try:
             if services:
                 services_to_start = self.get_service_dependencies(file_path, services)
-                subprocess.run(
-                    ["docker", "compose", "-f", file_path, "up", "-d"]
-                    + services_to_start,
-                    check=True,
-                )
+                with span("compose.up"):
+                    subprocess.run(
+                        ["docker", "compose", "-f", file_path, "up", "-d"]
+                        + services_to_start,
+                        check=True,
+                    )
             else:
-                subprocess.run(
-                    ["docker", "compose", "-f", file_path, "up", "-d"], check=True
-                )
+                with span("compose.up"):
+                    subprocess.run(
+                        ["docker", "compose", "-f", file_path, "up", "-d"], check=True
+                    )
         except subprocess.CalledProcessError:
             raise RuntimeError(
                 f"Failed to start services using Docker Compose file {file_path}"
             )
 
     def stop_compose_services(self, file_path):
+        if self.compose_engine == COMPOSE_ENGINE_SDK:
+            compose_sdk.ComposeEngine(self).down(file_path)
+            return
         try:
-            subprocess.run(["docker", "compose", "-f", file_path, "down"], check=True)
+            with span("compose.down"):
+                subprocess.run(
+                    ["docker", "compose", "-f", file_path, "down"], check=True
+                )
         except subprocess.CalledProcessError:
             raise RuntimeError(
                 f"Failed to stop services using Docker Compose file {file_path}"
@@ -205,27 +832,193 @@ class DevContainerManager:
                 f"Failed to update volumes in Docker Compose file: {str(e)}"
             )
 
-    def create_dev_container(self, name, image, volumes=None):
+    def create_dev_container(
+        self,
+        name,
+        image,
+        volumes=None,
+        pull_policy=PULL_IF_NOT_PRESENT,
+        warm=False,
+        caches=None,
+        sync=False,
+    ):
+        """Create a dev container, claiming a warm one from its pool if ``warm``.
+
+        A claimed container is already running, so the hand-off is a rename.
+        Either way the pool is then refilled by a detached process, which
+        also primes a pool that was empty. ``caches``
+        names shared cache volumes to mount, e.g. ``["pip", "npm"]``. With
+        ``sync``, host directories in ``volumes`` are copied into volumes
+        instead of bind-mounted; ``devdock sync`` keeps them up to date.
+        """
+        mounts = cache_mounts(caches)
+        sources = {}
+        if sync:
+            volumes = list(volumes or [])
+            for index, mapping in enumerate(volumes):
+                host_path, _, container_path = mapping.partition(":")
+                if file_sync.is_sync_source(host_path):
+                    volume = file_sync.sync_volume(name, host_path)
+                    sources[volume] = os.path.abspath(os.path.expanduser(host_path))
+                    volumes[index] = f"{volume}:{container_path}"
         config = {
             "type": "container",
             "name": name,
             "image": image,
             "volumes": volumes or [],
         }
+        if caches:
+            config["cache"] = list(caches)
+        if sources:
+            config["sync"] = sources
         self.config_manager.create_config(name, config)
-        return self.create_container(image, name, volumes)
+        if sources:
+            self._seed_sync_volumes(sources)
+        if mounts:
+            CacheVolumes(self).ensure(mounts)
+            volumes = (volumes or []) + mounts
+        if not warm:
+            return self.create_container(image, name, volumes, pull_policy)
+        try:
+            container = pool.ContainerPool(self).claim(image, name, volumes)
+        except Exception as e:
+            raise RuntimeError(f"Failed to claim warm container: {str(e)}")
+        if container is None:
+            # Create first so the refill finds the image already pulled.
+            container = self.create_container(image, name, volumes, pull_policy)
+            warm_pool = pool.ContainerPool(self)
+        else:
+            # Refill to the size the claimed container's pool was filled to.
+            labels = container.labels or {}
+            warm_pool = pool.ContainerPool(
+                self,
+                size=int(labels.get(pool.POOL_SIZE_LABEL, pool.DEFAULT_POOL_SIZE)),
+                max_idle=float(
+                    labels.get(pool.POOL_MAX_IDLE_LABEL, pool.DEFAULT_MAX_IDLE)
+                ),
+            )
+        try:
+            warm_pool.refill(image, volumes)
+        except OSError:
+            # The container is ready; a failed refill only costs the next claim.
+            pass
+        return container
+
+    def read_manifest(self, file_path):
+        """Expand a fleet manifest into one container spec per dev container.
+
+        A manifest has optional ``defaults`` and a list of ``containers``. An
+        entry with ``count: N`` is repeated N times and its name is formatted
+        with ``{index}`` (starting at 1)::
+
+            defaults:
+              image: python:3.9
+            containers:
+              - name: trainee-{index}
+                count: 50
+              - name: mentor
+                image: python:3.11
+        """
+        manifest = self.load_external_config(file_path) or {}
+        defaults = manifest.get("defaults") or {}
+        specs = []
+        for entry in manifest.get("containers") or []:
+            entry = {**defaults, **entry}
+            count = entry.pop("count", None)
+            if "name" not in entry or "image" not in entry:
+                raise ValueError(f"Manifest entry needs a name and an image: {entry}")
+            if count is None:
+                specs.append(entry)
+                continue
+            for index in range(1, int(count) + 1):
+                specs.append({**entry, "name": entry["name"].format(index=index)})
+        names = [spec["name"] for spec in specs]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"Duplicate container names in manifest: {duplicates}")
+        return specs
+
+    def create_dev_containers(
+        self, specs, pull_policy=PULL_IF_NOT_PRESENT, max_workers=DEFAULT_MAX_WORKERS
+    ):
+        """Create many dev containers concurrently.
+
+        Each image is resolved once for the whole batch, then the containers are
+        created on a bounded thread pool sharing this manager's client. Returns
+        one ``{"name", "container", "error"}`` dict per spec, in spec order.
+        """
+        # Connect up front so the worker threads share one client.
+        self.client
+        images = {}
+        for spec in specs:
+            images.setdefault(spec["image"], spec.get("pull_policy", pull_policy))
+
+        with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pulls = {
+                image: executor.submit(self.ensure_image, image, policy)
+                for image, policy in images.items()
+            }
+            image_errors = {}
+            for image, future in pulls.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    image_errors[image] = e
+
+            def create(spec):
+                if spec["image"] in image_errors:
+                    raise image_errors[spec["image"]]
+                return self.create_dev_container(
+                    spec["name"],
+                    spec["image"],
+                    spec.get("volumes"),
+                    PULL_NEVER,
+                    caches=spec.get("cache"),
+                )
+
+            jobs = [executor.submit(create, spec) for spec in specs]
+
+        results = []
+        for spec, job in zip(specs, jobs):
+            try:
+                results.append(
+                    {"name": spec["name"], "container": job.result(), "error": None}
+                )
+            except Exception as e:
+                results.append({"name": spec["name"], "container": None, "error": e})
+        return results
+
+    def _seed_sync_volumes(self, sources):
+        for result in file_sync.Syncer(self, sources).seed():
+            if result["error"] is not None:
+                raise RuntimeError(
+                    f"Failed to copy {sources[result['name']]} into "
+                    f"{result['name']}: {str(result['error'])}"
+                )
+
+    def _remove_sync_volumes(self, config):
+        # The volumes only hold copies of host directories.
+        for volume in config.get("sync") or {}:
+            try:
+                self.remove_volume(volume)
+            except docker.errors.NotFound:
+                pass
 
     def remove_dev_container(self, name):
+        config = self.config_manager.read_config(name)
         self.config_manager.delete_config(name)
         self.remove_container(name)
+        self._remove_sync_volumes(config)
 
     def remove_dev_compose(self, name):
         config = self.config_manager.read_config(name)
         self.config_manager.delete_config(name)
         self.stop_compose_services(config["compose_file"])
+        self._remove_sync_volumes(config)
 
     def activate_dev(self, name, services=None):
         config = self.config_manager.read_config(name)
+        self._ensure_config_caches(config)
         if config["type"] == "container":
             self.start_container(config["name"])
         elif config["type"] == "compose":
@@ -235,6 +1028,17 @@ class DevContainerManager:
                 self.start_compose_services(config["compose_file"])
         return config
 
+    def _ensure_config_caches(self, config):
+        if config.get("cache"):
+            CacheVolumes(self).ensure(self._config_cache_mounts(config))
+
+    def _config_cache_mounts(self, config):
+        if config["type"] == "compose":
+            services = self.read_compose_file(config["compose_file"])["services"]
+            mappings = compose_cache_mounts(config["cache"], services).values()
+            return [mapping for service in mappings for mapping in service]
+        return cache_mounts(config["cache"])
+
     def load_external_config(self, file_path):
         try:
             with open(file_path, "r") as f:
@@ -248,21 +1052,14 @@ class DevContainerManager:
                 f"Failed to parse external configuration file: {str(e)}"
             )
 
+    def get_service_graph(self, file_path):
+        try:
+            return self.compose_cache.service_graph(file_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Docker Compose file {file_path} not found")
+        except yaml.YAMLError as e:
+            raise yaml.YAMLError(f"Failed to parse Docker Compose file: {str(e)}")
+
     def get_service_dependencies(self, file_path, services):
-        compose_data = self.read_compose_file(file_path)
-        all_services_to_start = set(services)
-        for service in services:
-            all_services_to_start.update(
-                self._get_dependencies_recursive(compose_data, service)
-            )
-        return list(all_services_to_start)
-
-    def _get_dependencies_recursive(self, compose_data, service):
-        dependencies = set()
-        if "depends_on" in compose_data["services"].get(service, {}):
-            for dependency in compose_data["services"][service]["depends_on"]:
-                dependencies.add(dependency)
-                dependencies.update(
-                    self._get_dependencies_recursive(compose_data, dependency)
-                )
-        return dependencies
+        """Return ``services`` and their dependencies in start order."""
+        return self.get_service_graph(file_path).start_order(services)
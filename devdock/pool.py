@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent import futures
+
+from devdock._lazy import lazy_import
+from devdock.manager import DEFAULT_MAX_WORKERS, PULL_IF_NOT_PRESENT, PULL_NEVER
+
+docker = lazy_import("docker")
+
+POOL_LABEL = "devdock.pool"
+POOL_SIZE_LABEL = "devdock.pool.size"
+POOL_MAX_IDLE_LABEL = "devdock.pool.max-idle"
+POOL_NAME_PREFIX = "devdock-pool-"
+
+DEFAULT_POOL_SIZE = 2
+# Seconds an idle warm container may wait for a claim before it is evicted.
+DEFAULT_MAX_IDLE = 3600
+
+
+def profile(image, volumes=None):
+    """Key of the pool serving ``image`` with exactly these volume mappings.
+
+    Bind mounts are fixed when a container is created, so containers are only
+    interchangeable when both the image and the mappings match.
+    """
+    spec = json.dumps([image, sorted(volumes or [])])
+    return hashlib.sha256(spec.encode()).hexdigest()[:12]
+
+
+def _is_member(summary):
+    # Claimed containers keep their (immutable) pool labels but lose the
+    # pool name, which is what takes them out of the pool.
+    return any(n.lstrip("/").startswith(POOL_NAME_PREFIX) for n in summary["Names"])
+
+
+def _pool_name(summary):
+    return summary["Names"][0].lstrip("/")
+
+
+class ContainerPool:
+    """Pre-created, running containers waiting to become dev containers.
+
+    The pool state lives entirely in Docker: members are containers labelled
+    with their profile and named ``devdock-pool-<profile>-<suffix>``, so any
+    devdock process can fill, claim from or evict a pool. Claiming renames a
+    member by its pool name, which the daemon does atomically; if another
+    process claimed it first the rename fails and the next member is tried.
+    """
+
+    def __init__(
+        self,
+        manager,
+        size=DEFAULT_POOL_SIZE,
+        max_idle=DEFAULT_MAX_IDLE,
+        max_workers=DEFAULT_MAX_WORKERS,
+    ):
+        self.manager = manager
+        self.size = size
+        self.max_idle = max_idle
+        self.max_workers = max_workers
+
+    def members(self, image=None, volumes=None):
+        """Return the list summaries of pool members, oldest first."""
+        label = POOL_LABEL
+        if image is not None:
+            label = f"{POOL_LABEL}={profile(image, volumes)}"
+        summaries = self.manager.client.api.containers(
+            all=True, filters={"label": label}
+        )
+        return sorted(
+            (s for s in summaries if _is_member(s)), key=lambda s: s["Created"]
+        )
+
+    def _expired(self, summary, now):
+        labels = summary.get("Labels") or {}
+        max_idle = float(labels.get(POOL_MAX_IDLE_LABEL, self.max_idle))
+        return summary["State"] != "running" or now - summary["Created"] > max_idle
+
+    def claim(self, image, name, volumes=None):
+        """Rename an idle member to ``name`` and return it, or None if empty."""
+        api = self.manager.client.api
+        now = time.time()
+        for summary in self.members(image, volumes):
+            if self._expired(summary, now):
+                continue
+            try:
+                api.rename(_pool_name(summary), name)
+            except docker.errors.NotFound:
+                continue
+            except docker.errors.APIError as e:
+                # 409: another process claimed it first, or is renaming it.
+                if e.status_code == 409:
+                    continue
+                raise
+            self.manager._containers_changed()
+            return self.manager.client.containers.get(summary["Id"])
+        return None
+
+    def evict(self, image=None, volumes=None, drain=False):
+        """Remove expired and surplus members; returns the removed names.
+
+        Without an image every pool is pruned of expired members only. With
+        ``drain`` every idle member is removed.
+        """
+        members = self.members(image, volumes)
+        now = time.time()
+        keep = [s for s in members if not drain and not self._expired(s, now)]
+        if image is not None:
+            keep = keep[len(keep) - self.size :] if len(keep) > self.size else keep
+        kept_ids = {s["Id"] for s in keep}
+        doomed = {
+            _pool_name(s): self.manager.client.containers.prepare_model(s)
+            for s in members
+            if s["Id"] not in kept_ids
+        }
+        results = self.manager.remove_containers(
+            doomed, force=True, max_workers=self.max_workers
+        )
+        return [r["name"] for r in results if r["error"] is None]
+
+    def fill(self, image, volumes=None, pull_policy=PULL_IF_NOT_PRESENT):
+        """Evict stale members, then start members until the pool is full.
+
+        Returns the containers that were created.
+        """
+        self.manager.ensure_image(image, pull_policy)
+        self.evict(image, volumes)
+        missing = self.size - len(self.members(image, volumes))
+        if missing <= 0:
+            return []
+        key = profile(image, volumes)
+        labels = {
+            POOL_LABEL: key,
+            POOL_SIZE_LABEL: str(self.size),
+            POOL_MAX_IDLE_LABEL: str(self.max_idle),
+        }
+
+        def create(_):
+            name = f"{POOL_NAME_PREFIX}{key}-{os.urandom(4).hex()}"
+            # The image was resolved above; never pull once per member.
+            return self.manager.create_container(
+                image, name, volumes, PULL_NEVER, labels=labels
+            )
+
+        with futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(create, range(missing)))
+
+    def refill(self, image, volumes=None):
+        """Fill the pool from a detached ``devdock pool fill`` process.
+
+        The fill runs in its own session, so the caller returns immediately
+        and the refill survives it.
+        """
+        command = [sys.executable, "-m", "devdock.cli", "pool", "fill", image]
+        command += ["--size", str(self.size), "--max-idle", str(self.max_idle)]
+        for volume in volumes or []:
+            command += ["--volumes", volume]
+        return subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
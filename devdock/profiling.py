@@ -0,0 +1,224 @@
+import contextlib
+import functools
+import os
+import threading
+import time
+
+from devdock._lazy import lazy_import
+
+json = lazy_import("json")
+
+FORMAT_CHROME = "chrome"
+FORMAT_OTEL = "otel"
+EXPORT_FORMATS = (FORMAT_CHROME, FORMAT_OTEL)
+
+_NULL_SPAN = contextlib.nullcontext()
+_active = None
+_patched = []
+
+
+class Profiler:
+    """Collects finished spans as ``(name, start_ns, end_ns, thread, id, parent)``."""
+
+    def __init__(self):
+        self.spans = []
+        self.trace_id = os.urandom(16).hex()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def summary(self):
+        """Return ``(name, calls, total_ms, mean_ms, max_ms)`` rows, slowest first."""
+        totals = {}
+        for name, start, end, *_ in self.spans:
+            calls, total, longest = totals.get(name, (0, 0, 0))
+            duration = end - start
+            totals[name] = (calls + 1, total + duration, max(longest, duration))
+        rows = [
+            (name, calls, total / 1e6, total / calls / 1e6, longest / 1e6)
+            for name, (calls, total, longest) in totals.items()
+        ]
+        return sorted(rows, key=lambda row: row[2], reverse=True)
+
+    def format_summary(self):
+        lines = [
+            f"{'SPAN':<45} {'CALLS':>6} {'TOTAL ms':>10} {'MEAN ms':>9} {'MAX ms':>9}"
+        ]
+        for name, calls, total, mean, longest in self.summary():
+            lines.append(
+                f"{name:<45} {calls:>6} {total:>10.2f} {mean:>9.2f} {longest:>9.2f}"
+            )
+        return "\n".join(lines)
+
+    def chrome_trace(self):
+        """The spans as a Chrome trace (chrome://tracing, Perfetto)."""
+        pid = os.getpid()
+        return {
+            "traceEvents": [
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": start / 1e3,
+                    "dur": (end - start) / 1e3,
+                    "pid": pid,
+                    "tid": thread,
+                }
+                for name, start, end, thread, _, _ in self.spans
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def otel_trace(self):
+        """The spans in the OpenTelemetry OTLP/JSON trace format."""
+        spans = []
+        for name, start, end, thread, span_id, parent_id in self.spans:
+            span = {
+                "traceId": self.trace_id,
+                "spanId": span_id,
+                "name": name,
+                "kind": 1,
+                "startTimeUnixNano": str(start),
+                "endTimeUnixNano": str(end),
+                "attributes": [
+                    {"key": "thread.id", "value": {"intValue": str(thread)}}
+                ],
+            }
+            if parent_id:
+                span["parentSpanId"] = parent_id
+            spans.append(span)
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {"key": "service.name", "value": {"stringValue": "devdock"}}
+                        ]
+                    },
+                    "scopeSpans": [{"scope": {"name": "devdock"}, "spans": spans}],
+                }
+            ]
+        }
+
+    def export(self, path, format=FORMAT_CHROME):
+        if format not in EXPORT_FORMATS:
+            raise ValueError(
+                f"Invalid profile format: {format} "
+                f"(expected one of {', '.join(EXPORT_FORMATS)})"
+            )
+        trace = self.chrome_trace() if format == FORMAT_CHROME else self.otel_trace()
+        with open(path, "w") as f:
+            json.dump(trace, f)
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "start", "span_id", "parent_id")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        stack = self.profiler._stack()
+        self.parent_id = stack[-1] if stack else None
+        self.span_id = os.urandom(8).hex()
+        stack.append(self.span_id)
+        # Wall-clock nanoseconds so exported traces line up with other tools.
+        self.start = time.time_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        end = time.time_ns()
+        self.profiler._stack().pop()
+        record = (
+            self.name,
+            self.start,
+            end,
+            threading.get_ident(),
+            self.span_id,
+            self.parent_id,
+        )
+        with self.profiler._lock:
+            self.profiler.spans.append(record)
+
+
+def span(name):
+    """Context manager timing the phase ``name`` while profiling is enabled."""
+    profiler = _active
+    if profiler is None:
+        return _NULL_SPAN
+    return _Span(profiler, name)
+
+
+def _timed(name, fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with span(name):
+            return fn(*args, **kwargs)
+
+    return wrapper
+
+
+def _instrument(cls):
+    # inspect costs milliseconds to import; only pay for it when profiling.
+    import inspect
+
+    for attr, value in list(vars(cls).items()):
+        if attr.startswith("_") or not inspect.isfunction(value):
+            continue
+        # A generator's work happens while it is iterated, outside any span
+        # this wrapper could open.
+        if inspect.isgeneratorfunction(value):
+            continue
+        _patched.append((cls, attr, value))
+        setattr(cls, attr, _timed(f"{cls.__name__}.{attr}", value))
+
+
+def _instrument_function(module, attr, name):
+    fn = getattr(module, attr)
+    _patched.append((module, attr, fn))
+    setattr(module, attr, _timed(name, fn))
+
+
+def enable():
+    """Start recording spans and return the new profiler.
+
+    Every public method of the manager, the config manager and the SDK
+    compose engine is wrapped in a span named ``<Class>.<method>``, and the
+    phases inside them (``docker.pull``, ``docker.run``, ``compose.up``,
+    ``yaml.load``, ...) open their own spans. Until this is called the
+    methods are the plain functions and ``span`` returns a shared no-op
+    context manager, so disabled profiling costs one global lookup per phase.
+    """
+    global _active
+    from devdock import compose, compose_engine, manager
+    from devdock.config import config_manager
+
+    if _active is not None:
+        return _active
+    _active = Profiler()
+    _instrument(manager.DevContainerManager)
+    _instrument(config_manager.ConfigManager)
+    _instrument(compose_engine.ComposeEngine)
+    _instrument_function(compose, "load_yaml", "yaml.load")
+    _instrument_function(compose, "dump_yaml", "yaml.dump")
+    return _active
+
+
+def disable():
+    """Stop recording, undo the instrumentation and return the profiler."""
+    global _active
+    profiler, _active = _active, None
+    while _patched:
+        owner, attr, original = _patched.pop()
+        setattr(owner, attr, original)
+    return profiler
+
+
+def active():
+    """Return the running profiler, or None when profiling is disabled."""
+    return _active
@@ -0,0 +1,205 @@
+import fnmatch
+import hashlib
+import io
+import json
+import os
+import stat
+import tarfile
+from concurrent import futures
+
+from devdock._lazy import lazy_import
+from devdock.archive import CHUNK_SIZE, read_tar, tar_chunks
+from devdock.manager import DEFAULT_MAX_WORKERS
+
+docker = lazy_import("docker")
+
+# Any small local image works: the helper container is only created, never
+# started, and exists to mount the volume for the archive API.
+DEFAULT_HELPER_IMAGE = "busybox:latest"
+MANIFEST_NAME = ".devdock-seed.json"
+_MOUNT = "/seed"
+_EMPTY_DIGEST = hashlib.sha256().hexdigest()
+
+
+def is_ignored(path, patterns):
+    """True if ``path`` (relative, ``/``-separated) matches an ignore pattern.
+
+    A pattern matches the basename of any component or the relative path,
+    so ``node_modules``, ``*.pyc`` and ``build/out`` all work.
+    """
+    return any(
+        fnmatch.fnmatchcase(part, pattern) or fnmatch.fnmatchcase(path, pattern)
+        for pattern in patterns
+        for part in path.split("/")
+    )
+
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for data in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(data)
+    return digest.hexdigest()
+
+
+class _HashingReader:
+    """File wrapper that hashes what is read and reports it on close."""
+
+    def __init__(self, path, on_close):
+        self._file = open(path, "rb")
+        self._digest = hashlib.sha256()
+        self._on_close = on_close
+
+    def read(self, size=-1):
+        data = self._file.read(size)
+        self._digest.update(data)
+        return data
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._file.close()
+        self._on_close(self._digest.hexdigest())
+
+
+def _tar_info(name, st):
+    info = tarfile.TarInfo(name)
+    info.mode = stat.S_IMODE(st.st_mode)
+    info.uid = st.st_uid
+    info.gid = st.st_gid
+    info.mtime = int(st.st_mtime)
+    return info
+
+
+class VolumeSeeder:
+    """Copy host directory trees into named volumes through the archive API.
+
+    The tree is streamed as a tar straight into ``put_archive`` on a helper
+    container that mounts the volume, so nothing is staged on disk. The
+    volume keeps a manifest (``.devdock-seed.json``) of the size, mtime and
+    SHA-256 of every seeded file; on the next seed a file with the same size
+    and mtime is skipped without being read, and one whose mtime changed but
+    whose content hash did not is skipped too. Files deleted on the host are
+    left in the volume.
+    """
+
+    def __init__(self, manager, helper_image=DEFAULT_HELPER_IMAGE):
+        self.manager = manager
+        self.helper_image = helper_image
+
+    def _read_manifest(self, helper):
+        try:
+            chunks, _ = helper.get_archive(f"{_MOUNT}/{MANIFEST_NAME}")
+        except docker.errors.NotFound:
+            return {}
+        for _, fileobj in read_tar(chunks):
+            if fileobj is not None:
+                return json.load(fileobj)
+        return {}
+
+    def _members(self, host_dir, manifest, stats, ignore=()):
+        seeded = {}
+
+        def record(path, size, mtime_ns):
+            def on_close(digest):
+                seeded[path] = [size, mtime_ns, digest]
+
+            return on_close
+
+        for root, dirs, files in os.walk(host_dir):
+            prefix = os.path.relpath(root, host_dir).replace(os.sep, "/")
+            prefix = "" if prefix == "." else f"{prefix}/"
+            if ignore:
+                dirs[:] = [d for d in dirs if not is_ignored(prefix + d, ignore)]
+                files = [f for f in files if not is_ignored(prefix + f, ignore)]
+            dirs.sort()
+            for name in dirs + sorted(files):
+                full_path = os.path.join(root, name)
+                path = prefix + name
+                st = os.lstat(full_path)
+                info = _tar_info(path, st)
+                if stat.S_ISDIR(st.st_mode):
+                    info.type = tarfile.DIRTYPE
+                    yield info, None
+                elif stat.S_ISLNK(st.st_mode):
+                    info.type = tarfile.SYMTYPE
+                    info.linkname = os.readlink(full_path)
+                    yield info, None
+                elif stat.S_ISREG(st.st_mode):
+                    old = manifest.get(path)
+                    if old is not None and old[0] == st.st_size:
+                        if old[1] == st.st_mtime_ns:
+                            seeded[path] = old
+                            stats["unchanged"] += 1
+                            continue
+                        digest = _hash_file(full_path)
+                        if digest == old[2]:
+                            seeded[path] = [st.st_size, st.st_mtime_ns, digest]
+                            stats["unchanged"] += 1
+                            continue
+                    info.size = st.st_size
+                    stats["files"] += 1
+                    stats["bytes"] += st.st_size
+                    on_close = record(path, st.st_size, st.st_mtime_ns)
+                    if not st.st_size:
+                        # Empty files are never opened, so never hashed.
+                        on_close(_EMPTY_DIGEST)
+                    yield info, (
+                        lambda full_path=full_path, on_close=on_close: _HashingReader(
+                            full_path, on_close
+                        )
+                    )
+
+        # Written last, once every file above has been streamed and hashed.
+        data = json.dumps(seeded, sort_keys=True).encode()
+        info = tarfile.TarInfo(MANIFEST_NAME)
+        info.size = len(data)
+        info.mode = 0o644
+        yield info, lambda: io.BytesIO(data)
+
+    def seed(self, volume, host_dir, ignore=()):
+        """Copy ``host_dir`` into ``volume``, creating the volume if needed.
+
+        Paths matching a pattern in ``ignore`` (see ``is_ignored``) are left
+        out. Returns ``{"files", "bytes", "unchanged"}``: the files copied,
+        their total size, and the files skipped as unchanged.
+        """
+        if not os.path.isdir(host_dir):
+            raise FileNotFoundError(f"Directory {host_dir} not found")
+        self.manager.ensure_image(self.helper_image)
+        self.manager.create_volume(volume)
+        helper = self.manager.client.containers.create(
+            self.helper_image, volumes={volume: {"bind": _MOUNT, "mode": "rw"}}
+        )
+        try:
+            manifest = self._read_manifest(helper)
+            stats = {"files": 0, "bytes": 0, "unchanged": 0}
+            helper.put_archive(
+                _MOUNT, tar_chunks(self._members(host_dir, manifest, stats, ignore))
+            )
+            return stats
+        finally:
+            helper.remove(force=True)
+
+    def seed_many(self, sources, max_workers=DEFAULT_MAX_WORKERS, ignore=()):
+        """Seed ``{volume: host_dir}`` concurrently.
+
+        Returns one ``{"name", "stats", "error"}`` dict per volume.
+        """
+        # Resolve the helper image once rather than racing to pull it.
+        self.manager.ensure_image(self.helper_image)
+
+        def run(item):
+            volume, host_dir = item
+            try:
+                return {
+                    "name": volume,
+                    "stats": self.seed(volume, host_dir, ignore),
+                    "error": None,
+                }
+            except Exception as e:
+                return {"name": volume, "stats": None, "error": e}
+
+        with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(run, sources.items()))
@@ -0,0 +1,401 @@
+import hashlib
+import io
+import json
+import os
+import tarfile
+import tempfile
+import time
+
+from devdock._lazy import lazy_import
+from devdock.archive import CHUNK_SIZE, read_tar, tar_chunks
+from devdock.cache import CACHE_LABEL, cache_mounts
+from devdock.manager import PULL_NEVER
+from devdock.sync import SYNC_VOLUME_PREFIX
+
+docker = lazy_import("docker")
+
+SNAPSHOT_REPOSITORY = "devdock-snapshot"
+# Snapshots kept per dev container by the automatic collection after a new
+# snapshot; the least recently used go first.
+DEFAULT_KEEP = 5
+
+_TYPES = {
+    tarfile.REGTYPE: "file",
+    tarfile.AREGTYPE: "file",
+    tarfile.DIRTYPE: "dir",
+    tarfile.SYMTYPE: "symlink",
+    tarfile.LNKTYPE: "hardlink",
+}
+_TAR_TYPES = {"file": tarfile.REGTYPE, "dir": tarfile.DIRTYPE}
+_TAR_TYPES.update(symlink=tarfile.SYMTYPE, hardlink=tarfile.LNKTYPE)
+
+
+def parse_ref(ref):
+    """Split ``name@tag`` into ``(name, tag)``; the tag is None if omitted."""
+    name, _, tag = ref.partition("@")
+    return name, tag or None
+
+
+def _relative(path):
+    # get_archive prefixes every entry with the basename of the archived path.
+    _, _, rest = path.partition("/")
+    return rest
+
+
+class SnapshotStore:
+    """Content-addressed snapshots of dev containers and their volumes.
+
+    A snapshot is the committed image of the container plus, for every named
+    volume mounted in it, a manifest of the volume's files. Shared cache
+    volumes and sync volumes are left out: they belong to other containers
+    or to the host tree, and stay mounted as the dev config says. File contents are
+    stored once per SHA-256 under ``<base_dir>/blobs``, and a file whose size
+    and mtime match the previous snapshot is skipped in the archive stream
+    without being hashed or written, so repeated snapshots only store what
+    changed. The daemon still streams each volume in full, as ``get_archive``
+    cannot send a subset. A snapshot whose image layers and volume manifests
+    hash to the same key as an existing one is not stored again.
+    """
+
+    def __init__(self, manager, base_dir=None):
+        self.manager = manager
+        self.base_dir = base_dir or os.path.join(
+            manager.config_manager.base_dir, "snapshots"
+        )
+        self.blob_dir = os.path.join(self.base_dir, "blobs")
+        self.index_path = os.path.join(self.base_dir, "index.json")
+        os.makedirs(self.blob_dir, exist_ok=True)
+
+    @property
+    def client(self):
+        return self.manager.client
+
+    def _load_index(self):
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return []
+
+    def _save_index(self, records):
+        fd, tmp_path = tempfile.mkstemp(dir=self.base_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(records, f, indent=1)
+            os.replace(tmp_path, self.index_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def _blob_path(self, digest):
+        return os.path.join(self.blob_dir, digest[:2], digest)
+
+    def _store_blob(self, fileobj):
+        """Copy ``fileobj`` into the blob store; returns ``(digest, size)``."""
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.blob_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                for data in iter(lambda: fileobj.read(CHUNK_SIZE), b""):
+                    digest.update(data)
+                    out.write(data)
+                    size += len(data)
+            path = self._blob_path(digest.hexdigest())
+            if os.path.exists(path):
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return digest.hexdigest(), size
+
+    def _is_shared(self, volume):
+        if volume.startswith(SYNC_VOLUME_PREFIX):
+            return True
+        try:
+            labels = self.client.volumes.get(volume).attrs.get("Labels") or {}
+        except docker.errors.NotFound:
+            return False
+        return CACHE_LABEL in labels
+
+    def _read_manifest(self, digest):
+        with open(self._blob_path(digest)) as f:
+            return json.load(f)
+
+    def _export_volume(self, container, destination, previous):
+        """Manifest of the files under ``destination``, storing changed ones."""
+        chunks, _ = container.get_archive(destination)
+        entries = []
+        for info, fileobj in read_tar(chunks):
+            path = _relative(info.name)
+            kind = _TYPES.get(info.type)
+            if not path or kind is None:
+                continue
+            entry = {
+                "path": path,
+                "type": kind,
+                "mode": info.mode,
+                "uid": info.uid,
+                "gid": info.gid,
+                "mtime": info.mtime,
+                "size": info.size if kind == "file" else 0,
+            }
+            if kind in ("symlink", "hardlink"):
+                entry["link"] = (
+                    info.linkname if kind == "symlink" else _relative(info.linkname)
+                )
+            elif kind == "file":
+                old = previous.get(path)
+                if (
+                    old is not None
+                    and (old["size"], old["mtime"]) == (info.size, info.mtime)
+                    and os.path.exists(self._blob_path(old["blob"]))
+                ):
+                    # Unchanged since the last snapshot: the stream skips the
+                    # content without it being read or hashed.
+                    entry["blob"] = old["blob"]
+                else:
+                    entry["blob"], _ = self._store_blob(fileobj)
+            entries.append(entry)
+        return entries
+
+    def _members(self, manifest):
+        for entry in manifest:
+            info = tarfile.TarInfo(entry["path"])
+            info.type = _TAR_TYPES[entry["type"]]
+            info.mode = entry["mode"]
+            info.uid = entry["uid"]
+            info.gid = entry["gid"]
+            info.mtime = entry["mtime"]
+            info.linkname = entry.get("link", "")
+            if entry["type"] == "file":
+                info.size = entry["size"]
+                path = self._blob_path(entry["blob"])
+                yield info, lambda path=path: open(path, "rb")
+            else:
+                yield info, None
+
+    def list(self, name=None):
+        """Return the snapshot records of ``name`` (or all), newest first."""
+        records = [r for r in self._load_index() if name is None or r["name"] == name]
+        return sorted(records, key=lambda r: r["created"], reverse=True)
+
+    def find(self, name, tag=None):
+        for record in self.list(name):
+            if tag is None or record["tag"] == tag:
+                return record
+        ref = f"{name}@{tag}" if tag else name
+        raise ValueError(f"No snapshot {ref}")
+
+    def snapshot(self, name, tag=None):
+        """Snapshot the dev container ``name``.
+
+        Returns ``(record, created)``; ``created`` is False when an identical
+        snapshot already existed and was returned instead.
+        """
+        container = self.manager.get_container(name)
+        records = self._load_index()
+        previous = {}
+        latest = [r for r in records if r["name"] == name]
+        if latest:
+            last = max(latest, key=lambda r: r["created"])
+            for volume in last["volumes"]:
+                manifest = self._read_manifest(volume["manifest"])
+                previous[volume["destination"]] = {e["path"]: e for e in manifest}
+
+        volumes = []
+        volume_bytes = 0
+        for mount in container.attrs.get("Mounts") or []:
+            if mount.get("Type") != "volume" or self._is_shared(mount["Name"]):
+                continue
+            destination = mount["Destination"]
+            manifest = self._export_volume(
+                container, destination, previous.get(destination, {})
+            )
+            volume_bytes += sum(e["size"] for e in manifest)
+            data = json.dumps(manifest, sort_keys=True).encode()
+            digest, _ = self._store_blob(io.BytesIO(data))
+            volumes.append(
+                {
+                    "volume": mount["Name"],
+                    "destination": destination,
+                    "manifest": digest,
+                }
+            )
+
+        image = container.commit()
+        key = hashlib.sha256(
+            json.dumps(
+                {
+                    "layers": image.attrs["RootFS"]["Layers"],
+                    "volumes": [[v["destination"], v["manifest"]] for v in volumes],
+                }
+            ).encode()
+        ).hexdigest()
+        now = time.time()
+        for record in records:
+            if record["name"] == name and record["key"] == key:
+                if image.id != record["image"]:
+                    self.client.images.remove(image.id)
+                record["last_used"] = now
+                self._save_index(records)
+                return record, False
+
+        tag = tag or time.strftime("%Y%m%d-%H%M%S")
+        image.tag(SNAPSHOT_REPOSITORY, f"{name}.{tag}")
+        record = {
+            "name": name,
+            "tag": tag,
+            "key": key,
+            "image": image.id,
+            "ref": f"{SNAPSHOT_REPOSITORY}:{name}.{tag}",
+            "volumes": volumes,
+            "size": image.attrs.get("Size", 0) + volume_bytes,
+            "created": now,
+            "last_used": now,
+        }
+        records.append(record)
+        self._save_index(records)
+        self.gc()
+        return record, True
+
+    def restore(self, name, tag=None):
+        """Recreate the dev container ``name`` and its volumes from a snapshot.
+
+        Without ``tag`` the newest snapshot is used. Bind mounts, shared
+        caches and sync volumes are taken from the dev config, which is left
+        as it is; the snapshotted volumes are emptied and refilled. Raises
+        RuntimeError, before removing anything, if another container uses one
+        of those volumes.
+        """
+        record = self.find(name, tag)
+        try:
+            config = self.manager.config_manager.read_config(name)
+        except FileNotFoundError:
+            config = None
+        # Snapshots taken before shared volumes were skipped may list them.
+        restored = [v for v in record["volumes"] if not self._is_shared(v["volume"])]
+        for volume in restored:
+            users = [
+                c.name
+                for c in self.client.containers.list(
+                    all=True, filters={"volume": volume["volume"]}
+                )
+                if c.name != name
+            ]
+            if users:
+                # Checked before anything is removed, so a failed restore
+                # leaves the dev container as it was.
+                raise RuntimeError(
+                    f"Volume {volume['volume']} is in use by {', '.join(users)}"
+                )
+        destinations = {v["destination"] for v in restored}
+        binds = [
+            b
+            for b in ((config or {}).get("volumes") or [])
+            + cache_mounts((config or {}).get("cache"))
+            if b.split(":")[1] not in destinations
+        ]
+
+        try:
+            self.client.containers.get(name).remove(force=True)
+            self.manager._containers_changed()
+        except docker.errors.NotFound:
+            pass
+        for volume in restored:
+            try:
+                self.client.volumes.get(volume["volume"]).remove()
+            except docker.errors.NotFound:
+                pass
+            self.manager.create_volume(volume["volume"])
+
+        if restored:
+            helper = self.client.containers.create(
+                record["image"],
+                volumes={
+                    v["volume"]: {"bind": v["destination"], "mode": "rw"}
+                    for v in restored
+                },
+            )
+            try:
+                for volume in restored:
+                    manifest = self._read_manifest(volume["manifest"])
+                    helper.put_archive(
+                        volume["destination"], tar_chunks(self._members(manifest))
+                    )
+            finally:
+                helper.remove(force=True)
+
+        volumes = binds + [f"{v['volume']}:{v['destination']}" for v in restored]
+        if config is None:
+            container = self.manager.create_dev_container(
+                name, record["ref"], volumes, PULL_NEVER
+            )
+        else:
+            container = self.manager.create_container(
+                record["ref"], name, volumes, PULL_NEVER
+            )
+        records = self._load_index()
+        for stored in records:
+            if stored["key"] == record["key"] and stored["name"] == name:
+                stored["last_used"] = time.time()
+        self._save_index(records)
+        return container
+
+    def gc(self, keep=DEFAULT_KEEP, max_bytes=None):
+        """Drop least recently used snapshots; returns the dropped records.
+
+        Each dev container keeps its ``keep`` most recently used snapshots,
+        and with ``max_bytes`` more are dropped, oldest use first, until the
+        total size fits. Snapshots whose image is still used by a container
+        are kept. Blobs no longer referenced are deleted.
+        """
+        records = sorted(self._load_index(), key=lambda r: r["last_used"], reverse=True)
+        seen = {}
+        candidates = []
+        for record in records:
+            seen[record["name"]] = seen.get(record["name"], 0) + 1
+            if seen[record["name"]] > keep:
+                candidates.append(record)
+        if max_bytes is not None:
+            kept = [r for r in records if r not in candidates]
+            total = sum(r["size"] for r in kept)
+            for record in reversed(kept):
+                if total <= max_bytes:
+                    break
+                candidates.append(record)
+                total -= record["size"]
+
+        dropped = []
+        for record in candidates:
+            try:
+                self.client.images.remove(record["ref"])
+            except docker.errors.NotFound:
+                pass
+            except docker.errors.APIError:
+                # Still in use, e.g. by the container restored from it.
+                continue
+            dropped.append(record)
+        if not dropped:
+            return []
+        remaining = [r for r in records if r not in dropped]
+        self._save_index(remaining)
+        self._sweep(remaining)
+        return dropped
+
+    def _sweep(self, records):
+        referenced = set()
+        for record in records:
+            for volume in record["volumes"]:
+                referenced.add(volume["manifest"])
+                for entry in self._read_manifest(volume["manifest"]):
+                    if "blob" in entry:
+                        referenced.add(entry["blob"])
+        for directory, _, files in os.walk(self.blob_dir):
+            for filename in files:
+                if filename not in referenced and not filename.endswith(".tmp"):
+                    os.remove(os.path.join(directory, filename))
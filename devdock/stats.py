@@ -0,0 +1,148 @@
+import threading
+import time
+from concurrent import futures
+
+from devdock.manager import DEFAULT_MAX_WORKERS
+
+DEFAULT_INTERVAL = 2.0
+
+
+def _sum_io(entries, op):
+    return sum(
+        e.get("value", 0) for e in entries or [] if e.get("op", "").lower() == op
+    )
+
+
+def parse_stats(raw):
+    """Reduce a raw stats API sample to the figures ``docker stats`` shows."""
+    cpu = raw.get("cpu_stats") or {}
+    precpu = raw.get("precpu_stats") or {}
+    cpu_delta = (cpu.get("cpu_usage") or {}).get("total_usage", 0) - (
+        precpu.get("cpu_usage") or {}
+    ).get("total_usage", 0)
+    system_delta = cpu.get("system_cpu_usage", 0) - precpu.get("system_cpu_usage", 0)
+    online_cpus = (
+        cpu.get("online_cpus")
+        or len((cpu.get("cpu_usage") or {}).get("percpu_usage") or [])
+        or 1
+    )
+    cpu_percent = 0.0
+    # The first sample of a stream has no previous reading to compare with.
+    if precpu.get("system_cpu_usage") and cpu_delta > 0 and system_delta > 0:
+        cpu_percent = cpu_delta / system_delta * online_cpus * 100
+
+    memory = raw.get("memory_stats") or {}
+    memory_stats = memory.get("stats") or {}
+    # Like docker stats, reclaimable page cache does not count as used
+    # (total_inactive_file on cgroup v1, inactive_file on v2).
+    inactive = memory_stats.get(
+        "total_inactive_file", memory_stats.get("inactive_file", 0)
+    )
+    memory_usage = max(memory.get("usage", 0) - inactive, 0)
+    memory_limit = memory.get("limit", 0)
+
+    networks = (raw.get("networks") or {}).values()
+    blkio = (raw.get("blkio_stats") or {}).get("io_service_bytes_recursive")
+    return {
+        "cpu_percent": round(cpu_percent, 2),
+        "memory_usage": memory_usage,
+        "memory_limit": memory_limit,
+        "memory_percent": (
+            round(memory_usage / memory_limit * 100, 2) if memory_limit else 0.0
+        ),
+        "net_rx": sum(n.get("rx_bytes", 0) for n in networks),
+        "net_tx": sum(n.get("tx_bytes", 0) for n in networks),
+        "block_read": _sum_io(blkio, "read"),
+        "block_write": _sum_io(blkio, "write"),
+        "pids": (raw.get("pids_stats") or {}).get("current", 0),
+    }
+
+
+def _rows(samples):
+    return [{"name": name, **samples[name]} for name in sorted(samples)]
+
+
+def sample_once(api, targets, max_workers=DEFAULT_MAX_WORKERS):
+    """One sample of every ``{name: container_id}`` target, taken concurrently.
+
+    The daemon needs two readings a second apart to compute CPU usage, so a
+    one-shot sample takes about a second however many containers there are.
+    """
+
+    def sample(container_id):
+        return parse_stats(api.stats(container_id, stream=False))
+
+    with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        jobs = {name: executor.submit(sample, cid) for name, cid in targets.items()}
+    samples = {}
+    for name, job in jobs.items():
+        try:
+            samples[name] = job.result()
+        except Exception as e:
+            samples[name] = {"error": str(e)}
+    return _rows(samples)
+
+
+class StatsSampler:
+    """Latest resource usage of several containers.
+
+    One daemon thread per container follows that container's stats stream,
+    which the daemon pushes once a second with the CPU delta already paired
+    up, so reading a snapshot costs no API calls however often it is taken.
+    """
+
+    def __init__(self, api, targets):
+        self.api = api
+        self.targets = dict(targets)
+        self._lock = threading.Lock()
+        self._latest = {}
+        self._stopped = threading.Event()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def start(self):
+        for name, container_id in self.targets.items():
+            threading.Thread(
+                target=self._follow, args=(name, container_id), daemon=True
+            ).start()
+
+    def _follow(self, name, container_id):
+        try:
+            for raw in self.api.stats(container_id, stream=True, decode=True):
+                if self._stopped.is_set():
+                    return
+                sample = parse_stats(raw)
+                with self._lock:
+                    self._latest[name] = sample
+        except Exception as e:
+            if not self._stopped.is_set():
+                with self._lock:
+                    self._latest[name] = {"error": str(e)}
+
+    def snapshot(self):
+        """Return one row per container that has reported, sorted by name."""
+        with self._lock:
+            return _rows(self._latest)
+
+    def samples(self, interval=DEFAULT_INTERVAL):
+        """Yield a snapshot every ``interval`` seconds, forever."""
+        deadline = time.monotonic() + interval
+        # Hold the first snapshot until every container reported once (or the
+        # interval is up) so it is not missing rows.
+        while time.monotonic() < deadline:
+            with self._lock:
+                if len(self._latest) == len(self.targets):
+                    break
+            time.sleep(0.05)
+        while True:
+            yield self.snapshot()
+            time.sleep(interval)
+
+    def close(self):
+        # The streams end at their next sample, at most a second later.
+        self._stopped.set()
@@ -0,0 +1,196 @@
+import queue
+import threading
+
+STDOUT = "stdout"
+STDERR = "stderr"
+
+CHUNK_SIZE = 64 * 1024
+# Chunks buffered between a producer and a slow consumer; bounds memory use.
+MAX_PENDING_CHUNKS = 64
+
+
+class CommandStream:
+    """Iterator over the ``(STDOUT | STDERR, bytes)`` chunks of a command.
+
+    ``exit_code`` is ``None`` until the stream has been fully consumed.
+    """
+
+    def __init__(self, chunks, exit_code=None):
+        self._chunks = chunks
+        self._exit_code = exit_code
+        self.exit_code = None
+
+    def __iter__(self):
+        yield from self._chunks
+        self.exit_code = self._exit_code()
+
+    def read(self):
+        """Consume the stream, returning ``(stdout, stderr)`` as bytes."""
+        output = {STDOUT: [], STDERR: []}
+        for name, chunk in self:
+            output[name].append(chunk)
+        return b"".join(output[STDOUT]), b"".join(output[STDERR])
+
+
+def _demuxed(output):
+    for stdout, stderr in output:
+        if stdout:
+            yield STDOUT, stdout
+        if stderr:
+            yield STDERR, stderr
+
+
+def exec_stream(api, container_id, command):
+    """Start ``command`` in a container and stream its demultiplexed output."""
+    exec_id = api.exec_create(container_id, command)["Id"]
+    output = api.exec_start(exec_id, stream=True, demux=True)
+    return CommandStream(
+        _demuxed(output), lambda: api.exec_inspect(exec_id)["ExitCode"]
+    )
+
+
+def process_stream(process):
+    """Stream the stdout and stderr pipes of a ``subprocess.Popen``."""
+    pending = queue.Queue(maxsize=MAX_PENDING_CHUNKS)
+
+    def pump(name, pipe):
+        with pipe:
+            for chunk in iter(lambda: pipe.read1(CHUNK_SIZE), b""):
+                pending.put((name, chunk))
+        pending.put((name, None))
+
+    def chunks():
+        for name, pipe in ((STDOUT, process.stdout), (STDERR, process.stderr)):
+            threading.Thread(target=pump, args=(name, pipe), daemon=True).start()
+        open_pipes = 2
+        while open_pipes:
+            name, chunk = pending.get()
+            if chunk is None:
+                open_pipes -= 1
+            else:
+                yield name, chunk
+
+    return CommandStream(chunks(), process.wait)
+
+
+def split_lines(chunks):
+    """Re-chunk ``(STDOUT | STDERR, bytes)`` pairs into lines per stream.
+
+    A line longer than CHUNK_SIZE is passed on in pieces, so memory stays
+    bounded whatever the command prints.
+    """
+    pending = {STDOUT: b"", STDERR: b""}
+    for name, chunk in chunks:
+        *lines, rest = (pending[name] + chunk).split(b"\n")
+        for line in lines:
+            yield name, line + b"\n"
+        if len(rest) >= CHUNK_SIZE:
+            yield name, rest
+            rest = b""
+        pending[name] = rest
+    for name, rest in pending.items():
+        if rest:
+            yield name, rest
+
+
+def _failed(result):
+    return result["error"] is not None or bool(result["exit_code"])
+
+
+def _exit_code(result):
+    if result["cancelled"]:
+        return 0
+    if result["error"] is not None:
+        return 1
+    return result["exit_code"] or 0
+
+
+class FanOutStream:
+    """Iterator over the output lines of one command run on many targets.
+
+    ``targets`` maps a name to whatever ``start`` takes to begin the command
+    there and return a ``CommandStream``; a ``None`` target is reported as
+    not running. Yields ``(name, STDOUT | STDERR, line)`` where ``line`` is
+    bytes ending in a newline, except possibly the last of a stream. At most
+    ``max_workers`` commands run at once, and a bounded queue between them
+    and the consumer keeps memory flat however much they print.
+
+    Once consumed, ``results`` has one ``{"name", "exit_code", "error",
+    "cancelled"}`` dict per target, in target order, and ``exit_code`` is the
+    highest exit code, counting a target that could not be run as 1. With
+    ``fail_fast`` the first failure cancels the targets not yet started and
+    stops reading the others; commands already started are not killed.
+    """
+
+    def __init__(self, start, targets, max_workers, fail_fast=False):
+        self._start = start
+        self._targets = dict(targets)
+        self.max_workers = max_workers
+        self.fail_fast = fail_fast
+        self.results = []
+        self.exit_code = None
+
+    def __iter__(self):
+        names = list(self._targets)
+        todo = queue.SimpleQueue()
+        for name in names:
+            todo.put(name)
+        pending = queue.Queue(maxsize=MAX_PENDING_CHUNKS)
+        cancelled = threading.Event()
+
+        def put(item):
+            while not cancelled.is_set():
+                try:
+                    pending.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def work():
+            while not cancelled.is_set():
+                try:
+                    name = todo.get_nowait()
+                except queue.Empty:
+                    return
+                result = {
+                    "name": name,
+                    "exit_code": None,
+                    "error": None,
+                    "cancelled": False,
+                }
+                try:
+                    target = self._targets[name]
+                    if target is None:
+                        raise RuntimeError(f"Container {name} is not running")
+                    stream = self._start(target)
+                    for stream_name, line in split_lines(stream):
+                        if not put((name, stream_name, line)):
+                            return
+                    result["exit_code"] = stream.exit_code
+                except Exception as e:
+                    result["error"] = e
+                put((name, None, result))
+
+        # Daemon threads: a worker stuck reading a cancelled command must not
+        # keep the process alive.
+        for _ in range(min(self.max_workers, len(names))):
+            threading.Thread(target=work, daemon=True).start()
+        done = {}
+        try:
+            while len(done) < len(names):
+                name, stream_name, value = pending.get()
+                if stream_name is not None:
+                    yield name, stream_name, value
+                    continue
+                done[name] = value
+                if self.fail_fast and _failed(value):
+                    break
+        finally:
+            cancelled.set()
+        self.results = [
+            done.get(name)
+            or {"name": name, "exit_code": None, "error": None, "cancelled": True}
+            for name in names
+        ]
+        self.exit_code = max(map(_exit_code, self.results), default=0)
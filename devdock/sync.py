@@ -0,0 +1,391 @@
+import ctypes
+import ctypes.util
+import hashlib
+import os
+import select
+import stat
+import struct
+import sys
+import tarfile
+import time
+
+from devdock._lazy import lazy_import
+from devdock.archive import tar_chunks
+from devdock.seed import DEFAULT_HELPER_IMAGE, VolumeSeeder, _tar_info, is_ignored
+
+docker = lazy_import("docker")
+
+SYNC_VOLUME_PREFIX = "devdock-sync-"
+IGNORE_FILE = ".devdockignore"
+DEFAULT_IGNORE = (".git", "__pycache__", "*.pyc", "*.swp", "*~", ".DS_Store")
+# Seconds without further changes before a batch is pushed.
+DEFAULT_BATCH_DELAY = 0.2
+# Longest a batch is held back while changes keep arriving.
+MAX_BATCH_DELAY = 2.0
+DEFAULT_POLL_INTERVAL = 1.0
+_MOUNT = "/sync"
+# Paths per rm invocation, well below ARG_MAX.
+_DELETE_BATCH = 500
+
+_IN_MODIFY = 0x2
+_IN_ATTRIB = 0x4
+_IN_CLOSE_WRITE = 0x8
+_IN_MOVED_FROM = 0x40
+_IN_MOVED_TO = 0x80
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_DELETE_SELF = 0x400
+_IN_Q_OVERFLOW = 0x4000
+_IN_IGNORED = 0x8000
+_IN_ONLYDIR = 0x01000000
+_IN_DONT_FOLLOW = 0x02000000
+_IN_ISDIR = 0x40000000
+_WATCH_MASK = (
+    _IN_MODIFY
+    | _IN_ATTRIB
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_ONLYDIR
+    | _IN_DONT_FOLLOW
+)
+_EVENT = struct.Struct("iIII")
+
+
+def is_sync_source(host_path):
+    """True for a mapping source that is a host directory, not a named volume."""
+    return host_path.startswith((".", "/", "~")) and os.path.isdir(
+        os.path.expanduser(host_path)
+    )
+
+
+def sync_volume(name, host_dir):
+    """Name of the volume holding the synced copy of ``host_dir`` for ``name``."""
+    digest = hashlib.sha256(os.path.abspath(host_dir).encode()).hexdigest()[:8]
+    return f"{SYNC_VOLUME_PREFIX}{name}-{digest}"
+
+
+def load_ignore(host_dir, extra=()):
+    """Default patterns, those in ``<host_dir>/.devdockignore`` and ``extra``."""
+    patterns = list(DEFAULT_IGNORE)
+    try:
+        with open(os.path.join(host_dir, IGNORE_FILE)) as f:
+            for line in f:
+                line = line.strip().strip("/")
+                if line and not line.startswith("#"):
+                    patterns.append(line)
+    except FileNotFoundError:
+        pass
+    return patterns + list(extra)
+
+
+def _relative(root, path):
+    path = os.path.relpath(path, root).replace(os.sep, "/")
+    return "" if path == "." else path
+
+
+class PollingWatcher:
+    """Find changed paths by comparing the trees' stats every ``interval``."""
+
+    def __init__(self, roots, ignore=None, interval=DEFAULT_POLL_INTERVAL):
+        self.roots = roots
+        self.ignore = ignore or {}
+        self.interval = interval
+        self._state = {key: self._scan(key) for key in roots}
+        self._scanned_at = time.monotonic()
+
+    def _scan(self, key):
+        root, ignore = self.roots[key], self.ignore.get(key, ())
+        state = {}
+        for directory, dirs, files in os.walk(root):
+            prefix = _relative(root, directory)
+            prefix = f"{prefix}/" if prefix else ""
+            dirs[:] = [d for d in dirs if not is_ignored(prefix + d, ignore)]
+            for name in dirs + files:
+                path = prefix + name
+                if is_ignored(path, ignore):
+                    continue
+                try:
+                    st = os.lstat(os.path.join(directory, name))
+                except FileNotFoundError:
+                    continue
+                state[path] = (st.st_mode, st.st_size, st.st_mtime_ns)
+        return state
+
+    def read(self, timeout):
+        """Return ``{key: {path}}`` changed since the last call (maybe empty)."""
+        wait = self._scanned_at + self.interval - time.monotonic()
+        if wait > timeout:
+            time.sleep(max(timeout, 0))
+            return {}
+        time.sleep(max(wait, 0))
+        self._scanned_at = time.monotonic()
+        changes = {}
+        for key in self.roots:
+            old, new = self._state[key], self._scan(key)
+            self._state[key] = new
+            changed = {p for p in old.keys() | new.keys() if old.get(p) != new.get(p)}
+            if changed:
+                changes[key] = changed
+        return changes
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Linux inotify watches on every directory of the trees.
+
+    Raises OSError when inotify is unavailable or its watch limit is reached;
+    use ``PollingWatcher`` then.
+    """
+
+    def __init__(self, roots, ignore=None):
+        self.roots = roots
+        self.ignore = ignore or {}
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watches = {}
+        try:
+            for key, root in roots.items():
+                self._watch_tree(key, root)
+        except OSError:
+            self.close()
+            raise
+
+    def _watch(self, key, path):
+        wd = self._add_watch(self._fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"Cannot watch {path}: {os.strerror(errno)}")
+        self._watches[wd] = (key, _relative(self.roots[key], path))
+
+    def _watch_tree(self, key, top):
+        """Watch ``top`` and its subdirectories; returns the paths found."""
+        root, ignore = self.roots[key], self.ignore.get(key, ())
+        found = set()
+        for directory, dirs, files in os.walk(top):
+            try:
+                self._watch(key, directory)
+            except FileNotFoundError:
+                continue
+            prefix = _relative(root, directory)
+            prefix = f"{prefix}/" if prefix else ""
+            dirs[:] = [d for d in dirs if not is_ignored(prefix + d, ignore)]
+            found.update(
+                prefix + name
+                for name in dirs + files
+                if not is_ignored(prefix + name, ignore)
+            )
+        return found
+
+    def read(self, timeout):
+        """Return ``{key: {path}}`` changed within ``timeout`` (maybe empty)."""
+        readable, _, _ = select.select([self._fd], [], [], max(timeout, 0))
+        if not readable:
+            return {}
+        changes = {}
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+                offset += length
+                self._handle(wd, mask, name, changes)
+        return changes
+
+    def _handle(self, wd, mask, name, changes):
+        if mask & _IN_Q_OVERFLOW:
+            # Events were dropped: everything may have changed.
+            for key, root in self.roots.items():
+                changes.setdefault(key, set()).update(self._watch_tree(key, root))
+            return
+        if mask & _IN_IGNORED:
+            self._watches.pop(wd, None)
+            return
+        if wd not in self._watches or not name:
+            return
+        key, directory = self._watches[wd]
+        path = f"{directory}/{name}" if directory else name
+        if is_ignored(path, self.ignore.get(key, ())):
+            return
+        paths = changes.setdefault(key, set())
+        paths.add(path)
+        if mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO):
+            # Files may have been created before the new watch was in place.
+            full_path = os.path.join(self.roots[key], path)
+            try:
+                paths.update(self._watch_tree(key, full_path))
+            except OSError:
+                # Out of watches: the directory's later changes are missed.
+                pass
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def watcher(roots, ignore=None, poll=False):
+    """An inotify watcher on Linux, else (or with ``poll``) a polling one."""
+    if not poll and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(roots, ignore)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(roots, ignore)
+
+
+class Syncer:
+    """Keep named volumes in sync with host directories.
+
+    ``sources`` maps each volume to its host directory. ``seed`` copies the
+    trees in bulk (see ``VolumeSeeder``); ``run`` then watches them and
+    pushes only the paths that changed. Changes are batched until the trees
+    are quiet for ``batch_delay`` seconds, then each volume gets one tar
+    stream through ``put_archive`` and one ``rm`` for deleted paths, on a
+    helper container that mounts every volume. Paths matching the ignore
+    patterns (``load_ignore``) are never copied.
+    """
+
+    def __init__(
+        self,
+        manager,
+        sources,
+        ignore=(),
+        helper_image=DEFAULT_HELPER_IMAGE,
+        batch_delay=DEFAULT_BATCH_DELAY,
+        poll=False,
+    ):
+        self.manager = manager
+        self.sources = {
+            volume: os.path.abspath(os.path.expanduser(host_dir))
+            for volume, host_dir in sources.items()
+        }
+        self.ignore = {
+            volume: load_ignore(host_dir, ignore)
+            for volume, host_dir in self.sources.items()
+        }
+        self.helper_image = helper_image
+        self.batch_delay = batch_delay
+        self.poll = poll
+        self._mounts = {
+            volume: f"{_MOUNT}/{index}" for index, volume in enumerate(self.sources)
+        }
+        self._helper = None
+        self._closed = False
+
+    def seed(self):
+        """Bulk-copy every tree; returns ``{"name", "stats", "error"}`` each."""
+        seeder = VolumeSeeder(self.manager, self.helper_image)
+        results = []
+        for volume, host_dir in self.sources.items():
+            try:
+                stats = seeder.seed(volume, host_dir, self.ignore[volume])
+                results.append({"name": volume, "stats": stats, "error": None})
+            except Exception as e:
+                results.append({"name": volume, "stats": None, "error": e})
+        return results
+
+    def _start_helper(self):
+        self.manager.ensure_image(self.helper_image)
+        self._helper = self.manager.client.containers.run(
+            self.helper_image,
+            command=["sleep", "2147483647"],
+            volumes={
+                volume: {"bind": mount, "mode": "rw"}
+                for volume, mount in self._mounts.items()
+            },
+            detach=True,
+            auto_remove=True,
+        )
+
+    def _members(self, host_dir, paths, stats):
+        for path in paths:
+            full_path = os.path.join(host_dir, path)
+            try:
+                st = os.lstat(full_path)
+            except FileNotFoundError:
+                continue
+            info = _tar_info(path, st)
+            if stat.S_ISDIR(st.st_mode):
+                info.type = tarfile.DIRTYPE
+                yield info, None
+            elif stat.S_ISLNK(st.st_mode):
+                info.type = tarfile.SYMTYPE
+                info.linkname = os.readlink(full_path)
+                yield info, None
+            elif stat.S_ISREG(st.st_mode):
+                info.size = st.st_size
+                stats["files"] += 1
+                stats["bytes"] += st.st_size
+                yield info, lambda full_path=full_path: open(full_path, "rb")
+
+    def push(self, volume, paths):
+        """Copy ``paths`` of a volume's tree, deleting those that are gone.
+
+        Returns ``{"volume", "files", "bytes", "deleted", "error"}``.
+        """
+        host_dir, mount = self.sources[volume], self._mounts[volume]
+        stats = {"volume": volume, "files": 0, "bytes": 0, "deleted": 0, "error": None}
+        # Parents sort before their children, so directories exist first.
+        paths = sorted(paths)
+        existing = [p for p in paths if os.path.lexists(os.path.join(host_dir, p))]
+        deleted = sorted(set(paths) - set(existing))
+        try:
+            for start in range(0, len(deleted), _DELETE_BATCH):
+                batch = deleted[start : start + _DELETE_BATCH]
+                self._helper.exec_run(
+                    ["rm", "-rf", "--"] + [f"{mount}/{path}" for path in batch]
+                )
+                stats["deleted"] += len(batch)
+            if existing:
+                self._helper.put_archive(
+                    mount, tar_chunks(self._members(host_dir, existing, stats))
+                )
+        except Exception as e:
+            stats["error"] = e
+        return stats
+
+    def run(self):
+        """Watch the trees until ``close``, yielding a ``push`` result per batch."""
+        watch = watcher(self.sources, self.ignore, self.poll)
+        try:
+            self._start_helper()
+            pending, first_change = {}, None
+            while not self._closed:
+                changes = watch.read(self.batch_delay if pending else 0.5)
+                for volume, paths in changes.items():
+                    pending.setdefault(volume, set()).update(paths)
+                if changes and first_change is None:
+                    first_change = time.monotonic()
+                if not pending:
+                    continue
+                if changes and time.monotonic() - first_change < MAX_BATCH_DELAY:
+                    continue
+                for volume, paths in pending.items():
+                    result = self.push(volume, paths)
+                    yield result
+                pending, first_change = {}, None
+        finally:
+            watch.close()
+            if self._helper is not None:
+                try:
+                    self._helper.remove(force=True)
+                except docker.errors.NotFound:
+                    pass
+                self._helper = None
+
+    def close(self):
+        self._closed = True
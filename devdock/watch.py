@@ -0,0 +1,267 @@
+import queue
+import threading
+import time
+
+from devdock.cache import cache_mounts
+from devdock.compose import ONEOFF_LABEL, PROJECT_LABEL, SERVICE_LABEL
+
+# Container events that can change whether a dev config is up.
+WATCH_EVENTS = ("start", "kill", "stop", "die", "oom", "destroy")
+# Seconds to collect events for a config before reconciling it.
+DEFAULT_DEBOUNCE = 1.0
+DEFAULT_BACKOFF = 1.0
+# Longest wait before a restart; a config up for this long is considered
+# healthy again and its backoff is reset.
+DEFAULT_MAX_BACKOFF = 60.0
+
+ACTION_START = "start"
+ACTION_CREATE = "create"
+ACTION_START_SERVICES = "start-services"
+
+_UP_STATES = ("running", "paused", "restarting")
+_ALL = None
+_RESYNC = object()
+_CLOSED = object()
+
+
+class Watcher:
+    """Keep dev configs running by reacting to Docker container events.
+
+    One events stream, filtered to container lifecycle events, is read on a
+    background thread; events of containers that belong to no dev config are
+    dropped. A container that dies is not restarted at once: events for a
+    config are collected for ``debounce`` seconds and the config is then
+    reconciled against a single ``status`` pass, so an event storm (a compose
+    project going down, a daemon restart) costs one reconcile per config.
+    A config that keeps dying is restarted with exponential backoff, starting
+    at ``backoff`` seconds and capped at ``max_backoff``. Containers stopped or
+    killed on purpose (``devdock stop``, ``docker stop``, ``compose down``)
+    are left alone until they are started again. Every config is reconciled
+    when watching starts and after reconnecting to the daemon.
+    """
+
+    def __init__(
+        self,
+        manager,
+        debounce=DEFAULT_DEBOUNCE,
+        backoff=DEFAULT_BACKOFF,
+        max_backoff=DEFAULT_MAX_BACKOFF,
+    ):
+        self.manager = manager
+        self.debounce = debounce
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._names = {}
+        self._projects = {}
+        self._refreshed_at = None
+        # (config, service) pairs stopped on purpose; service is None for a
+        # container config.
+        self._held = set()
+        self._due = {}
+        self._restarts = {}
+        self._queue = queue.Queue()
+        self._closed = threading.Event()
+        self._events = None
+
+    def refresh_targets(self):
+        """Re-read which containers and compose projects belong to a config."""
+        configs = self.manager.config_manager.find_configs()
+        self._names = {
+            c["name"]: c["name"] for c in configs if c["type"] == "container"
+        }
+        self._projects = {
+            self.manager._config_project(c): c["name"]
+            for c in configs
+            if c["type"] == "compose"
+        }
+        self._refreshed_at = time.monotonic()
+
+    def _target(self, attributes):
+        if PROJECT_LABEL in attributes:
+            config = self._projects.get(attributes[PROJECT_LABEL])
+            return config, attributes.get(SERVICE_LABEL)
+        return self._names.get(attributes.get("name")), None
+
+    def handle_event(self, event, now=None):
+        """Update the held set and schedule reconciles for one raw event."""
+        now = time.monotonic() if now is None else now
+        action = event.get("Action") or event.get("status") or ""
+        # Exec events arrive as e.g. "exec_die"; health checks as
+        # "health_status: ...".
+        action = action.split(":")[0]
+        attributes = (event.get("Actor") or {}).get("Attributes") or {}
+        if attributes.get(ONEOFF_LABEL) == "True":
+            return
+        config, service = self._target(attributes)
+        if config is None and (
+            self._refreshed_at is None or now - self._refreshed_at >= self.debounce
+        ):
+            # Possibly a config created since the targets were read.
+            self.refresh_targets()
+            config, service = self._target(attributes)
+        if config is None:
+            return
+        key = (config, service)
+        if action in ("kill", "stop"):
+            self._held.add(key)
+        elif action == "start":
+            self._held.discard(key)
+        elif action in ("die", "oom", "destroy") and key not in self._held:
+            self.schedule(config, now)
+
+    def schedule(self, config, now=None):
+        """Reconcile ``config`` (or every config for None) after the debounce.
+
+        Events arriving while a reconcile is pending are folded into it.
+        """
+        now = time.monotonic() if now is None else now
+        if config in self._due:
+            return
+        delay = self.debounce
+        attempts, last_restart = self._restarts.get(config, (0, None))
+        if attempts and now - last_restart < self.max_backoff:
+            delay = max(
+                delay, min(self.backoff * 2 ** (attempts - 1), self.max_backoff)
+            )
+        self._due[config] = now + delay
+
+    def due(self, now=None):
+        """Pop the configs whose reconcile is due; None stands for all."""
+        now = time.monotonic() if now is None else now
+        ready = [config for config, at in self._due.items() if at <= now]
+        for config in ready:
+            del self._due[config]
+        return ready
+
+    def _next_timeout(self):
+        if not self._due:
+            return None
+        return max(0.0, min(self._due.values()) - time.monotonic())
+
+    def _record_restart(self, config, now):
+        attempts, last_restart = self._restarts.get(config, (0, None))
+        if last_restart is None or now - last_restart >= self.max_backoff:
+            attempts = 0
+        self._restarts[config] = (attempts + 1, now)
+        return attempts + 1
+
+    def reconcile(self, configs=_ALL):
+        """Start or recreate what is down in ``configs`` (default: every one).
+
+        Returns one ``{"name", "action", "services", "state", "attempt",
+        "error"}`` dict per config acted on.
+        """
+        self.manager._containers_changed()
+        rows = self.manager.status()
+        if configs is not _ALL:
+            wanted = set(configs)
+            rows = [row for row in rows if row["name"] in wanted]
+        results = []
+        for row in rows:
+            down = [
+                c
+                for c in row["containers"]
+                if c["state"] not in _UP_STATES
+                and (row["name"], c["service"]) not in self._held
+            ]
+            if not down:
+                continue
+            now = time.monotonic()
+            result = {
+                "name": row["name"],
+                "action": None,
+                "services": [],
+                "state": down[0]["state"],
+                "attempt": self._record_restart(row["name"], now),
+                "error": None,
+            }
+            try:
+                if row["type"] == "compose":
+                    result["action"] = ACTION_START_SERVICES
+                    result["services"] = [c["service"] for c in down]
+                    self.manager.start_compose_services(
+                        row["source"], result["services"]
+                    )
+                elif down[0]["state"] == "missing":
+                    result["action"] = ACTION_CREATE
+                    config = self.manager.config_manager.read_config(row["name"])
+                    volumes = (config.get("volumes") or []) + cache_mounts(
+                        config.get("cache")
+                    )
+                    self.manager.create_container(config["image"], row["name"], volumes)
+                else:
+                    result["action"] = ACTION_START
+                    self.manager.start_container(row["name"])
+            except Exception as e:
+                result["error"] = e
+            results.append(result)
+        return results
+
+    def _subscribe(self):
+        self._events = self.manager.client.events(
+            decode=True,
+            filters={"type": "container", "event": list(WATCH_EVENTS)},
+        )
+        return self._events
+
+    def _pump(self, events):
+        delay = self.backoff
+        while not self._closed.is_set():
+            try:
+                for event in events:
+                    self._queue.put(event)
+                    delay = self.backoff
+            except Exception:
+                pass
+            # The stream ended: the daemon restarted or the connection broke.
+            while not self._closed.is_set():
+                if self._closed.wait(delay):
+                    return
+                try:
+                    events = self._subscribe()
+                    break
+                except Exception:
+                    delay = min(delay * 2, self.max_backoff)
+            # Events were missed while disconnected.
+            self._queue.put(_RESYNC)
+
+    def run(self):
+        """Watch until ``close`` is called, yielding each reconcile result."""
+        self.refresh_targets()
+        events = self._subscribe()
+        threading.Thread(target=self._pump, args=(events,), daemon=True).start()
+        yield from self.reconcile()
+        while not self._closed.is_set():
+            try:
+                item = self._queue.get(timeout=self._next_timeout())
+            except queue.Empty:
+                item = None
+            if item is _CLOSED:
+                break
+            if item is _RESYNC:
+                self.refresh_targets()
+                self.schedule(_ALL)
+            elif item is not None:
+                self.handle_event(item)
+            ready = self.due()
+            if not ready:
+                continue
+            try:
+                yield from self.reconcile(_ALL if _ALL in ready else ready)
+            except Exception as e:
+                # E.g. the daemon is restarting; the resync retries later.
+                yield {
+                    "name": None,
+                    "action": None,
+                    "services": [],
+                    "state": None,
+                    "attempt": 0,
+                    "error": e,
+                }
+
+    def close(self):
+        self._closed.set()
+        self._queue.put(_CLOSED)
+        events, self._events = self._events, None
+        if events is not None:
+            events.close()
@@ -0,0 +1,151 @@
+import asyncio
+import subprocess
+import sys
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+from devdock.async_manager import AsyncDevContainerManager
+
+
+def fake_process(returncode=0, stdout=b""):
+    process = MagicMock()
+    process.returncode = returncode
+    process.communicate = AsyncMock(return_value=(stdout, b""))
+    process.wait = AsyncMock(return_value=returncode)
+    return process
+
+
+class TestAsyncDevContainerManager(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.manager = MagicMock()
+        self.manager.compose_engine = "cli"
+        self.aio = AsyncDevContainerManager(self.manager, max_workers=4)
+
+    def tearDown(self):
+        self.aio.close()
+
+    async def test_daemon_calls_run_on_executor(self):
+        self.manager.start_container.return_value = "started"
+        results = await asyncio.gather(
+            *(self.aio.start_container(f"c{i}") for i in range(10))
+        )
+        self.assertEqual(results, ["started"] * 10)
+        self.assertEqual(self.manager.start_container.call_count, 10)
+
+    async def test_stop_container_passes_options(self):
+        await self.aio.stop_container("web", timeout=3, signal="SIGINT")
+        self.manager.stop_container.assert_called_once_with("web", 3, "SIGINT")
+
+    @patch("devdock.async_manager.asyncio.create_subprocess_exec")
+    async def test_start_compose_services(self, mock_exec):
+        mock_exec.return_value = fake_process()
+        self.manager.get_service_dependencies.return_value = ["db", "web"]
+
+        await self.aio.start_compose_services("compose.yml", ["web"])
+        self.assertEqual(
+            mock_exec.call_args.args,
+            ("docker", "compose", "-f", "compose.yml", "up", "-d", "db", "web"),
+        )
+
+    @patch("devdock.async_manager.asyncio.create_subprocess_exec")
+    async def test_compose_failure_raises(self, mock_exec):
+        mock_exec.return_value = fake_process(returncode=1)
+        with self.assertRaises(RuntimeError):
+            await self.aio.stop_compose_services("compose.yml")
+
+    async def test_sdk_engine_delegates_to_manager(self):
+        self.manager.compose_engine = "sdk"
+        await self.aio.start_compose_services("compose.yml", ["web"])
+        self.manager.start_compose_services.assert_called_once_with(
+            "compose.yml", ["web"], None
+        )
+
+    @patch("devdock.async_manager.asyncio.create_subprocess_exec")
+    async def test_run_command_falls_back_to_compose_exec(self, mock_exec):
+        mock_exec.return_value = fake_process(stdout=b"hello\n")
+        self.manager._exec_target.return_value = None
+        self.manager.resolve_compose_file.return_value = "compose.yml"
+
+        output = await self.aio.run_command("proj", "echo hello", service="web")
+        self.assertEqual(output, "hello\n")
+        self.assertEqual(
+            mock_exec.call_args.args[4:], ("exec", "-T", "web", "echo", "hello")
+        )
+        self.manager.run_command.assert_not_called()
+
+    @patch("devdock.async_manager.asyncio.create_subprocess_exec")
+    async def test_cancel_terminates_compose_process(self, mock_exec):
+        async def hang():
+            await asyncio.sleep(60)
+
+        process = fake_process()
+        process.communicate = hang
+        mock_exec.return_value = process
+
+        task = asyncio.ensure_future(self.aio.stop_compose_services("compose.yml"))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        process.terminate.assert_called_once()
+        process.wait.assert_awaited_once()
+
+    @patch("devdock.async_manager.asyncio.create_subprocess_exec")
+    async def test_config_operations_run_compose_as_subprocess(self, mock_exec):
+        mock_exec.return_value = fake_process()
+        config = {"type": "compose", "name": "shop", "compose_file": "x.dev.yaml"}
+        self.manager.config_manager.read_config.return_value = config
+
+        self.assertEqual(await self.aio.activate_dev("shop"), config)
+        self.manager._ensure_config_caches.assert_called_once_with(config)
+        await self.aio.remove_dev_compose("shop")
+        self.manager.config_manager.delete_config.assert_called_once_with("shop")
+        self.manager._remove_sync_volumes.assert_called_once_with(config)
+        self.assertEqual(
+            [c.args[4:] for c in mock_exec.call_args_list], [("up", "-d"), ("down",)]
+        )
+        self.manager.start_compose_services.assert_not_called()
+        self.manager.stop_compose_services.assert_not_called()
+
+    @patch("devdock.async_manager.asyncio.create_subprocess_exec")
+    async def test_create_dev_compose_starts_stale_services(self, mock_exec):
+        mock_exec.return_value = fake_process()
+        plan = {"compose_file": "x.dev.yaml", "stale": ["web"], "recreate": ["web"]}
+        self.manager._plan_dev_compose.return_value = plan
+        self.manager.get_service_dependencies.return_value = ["web"]
+
+        await self.aio.create_dev_compose("shop", "x.yaml", caches=["pip"])
+        self.manager._plan_dev_compose.assert_called_once_with(
+            "shop", "x.yaml", None, ["pip"], False
+        )
+        self.assertEqual(mock_exec.call_args.args[4:], ("up", "-d", "web"))
+        self.manager._save_dev_compose.assert_called_once_with("shop", plan)
+
+    @patch("devdock.async_manager.asyncio.create_subprocess_exec")
+    async def test_run_command_compose_failure_raises(self, mock_exec):
+        mock_exec.return_value = fake_process(returncode=2)
+        self.manager._exec_target.return_value = None
+        self.manager.resolve_compose_file.return_value = "compose.yml"
+        with self.assertRaises(RuntimeError):
+            await self.aio.run_command("proj", "false", service="web")
+
+
+class TestImport(unittest.TestCase):
+    def test_package_import_leaves_stdlib_usable(self):
+        # Run in a clean interpreter: the test runner has already imported
+        # asyncio and unittest.mock.
+        code = (
+            "from devdock import AsyncDevContainerManager\n"
+            "import asyncio, unittest.mock, concurrent.futures\n"
+            "async def main():\n"
+            "    return 1\n"
+            "assert asyncio.run(main()) == 1\n"
+            "concurrent.futures.ThreadPoolExecutor\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+import docker
+from devdock.cache import (
+    CACHE_LABEL,
+    CacheVolumes,
+    cache_mounts,
+    compose_cache_mounts,
+)
+from devdock.config import ConfigManager
+from devdock.manager import DevContainerManager
+
+
+class TestCacheMounts(unittest.TestCase):
+    def test_well_known_and_custom_caches(self):
+        self.assertEqual(
+            cache_mounts(["pip", "assets:/app/.cache"]),
+            ["devdock-cache-pip:/root/.cache/pip", "devdock-cache-assets:/app/.cache"],
+        )
+
+    def test_unknown_cache(self):
+        with self.assertRaises(ValueError):
+            cache_mounts(["nope"])
+
+    def test_compose_caches_per_service(self):
+        mounts = compose_cache_mounts(["pip", "web:npm"], ["web", "db"])
+        self.assertEqual(
+            mounts,
+            {
+                "web": [
+                    "devdock-cache-pip:/root/.cache/pip",
+                    "devdock-cache-npm:/root/.npm",
+                ],
+                "db": ["devdock-cache-pip:/root/.cache/pip"],
+            },
+        )
+        with self.assertRaises(ValueError):
+            compose_cache_mounts(["api:npm"], ["web"])
+
+
+class TestCacheVolumes(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.client = MagicMock()
+        self.manager = DevContainerManager(client=self.client)
+        self.manager.config_manager = ConfigManager(base_dir=self.tmp, backend="yaml")
+        self.caches = CacheVolumes(self.manager)
+
+    def df(self, *volumes):
+        self.client.df.return_value = {
+            "Volumes": [
+                {
+                    "Name": f"devdock-cache-{kind}",
+                    "Labels": {CACHE_LABEL: kind},
+                    "UsageData": {"Size": size, "RefCount": refs},
+                }
+                for kind, size, refs in volumes
+            ]
+            + [{"Name": "other", "Labels": None, "UsageData": {"Size": 1}}]
+        }
+
+    def test_ensure_creates_missing_volumes_once(self):
+        self.client.volumes.get.side_effect = docker.errors.NotFound("missing")
+        self.caches.ensure(
+            ["devdock-cache-pip:/root/.cache/pip", "devdock-cache-pip:/root/.cache/pip"]
+        )
+        self.client.volumes.create.assert_called_once_with(
+            "devdock-cache-pip", labels={CACHE_LABEL: "pip"}
+        )
+        self.assertTrue(
+            os.path.exists(os.path.join(self.tmp, "caches", "devdock-cache-pip"))
+        )
+
+    def test_prune_removes_least_recently_used_unused_caches(self):
+        now = time.time()
+        self.caches.ensure(cache_mounts(["pip", "npm", "go"]))
+        for kind, age in (("pip", 300), ("npm", 200), ("go", 100)):
+            marker = os.path.join(self.tmp, "caches", f"devdock-cache-{kind}")
+            os.utime(marker, (now - age, now - age))
+        self.df(("pip", 600, 1), ("npm", 500, 0), ("go", 400, 0))
+
+        self.assertEqual(
+            [c["name"] for c in self.caches.list()],
+            ["devdock-cache-pip", "devdock-cache-npm", "devdock-cache-go"],
+        )
+        removed = self.caches.prune(max_bytes=1000)
+        # pip is mounted, so npm goes even though pip was used longer ago.
+        self.assertEqual([c["name"] for c in removed], ["devdock-cache-npm"])
+        self.client.volumes.get.return_value.remove.assert_called_once()
+
+    def test_prune_by_age(self):
+        self.caches.ensure(cache_mounts(["pip"]))
+        self.df(("pip", 10, 0))
+        self.assertEqual(self.caches.prune(max_age=60), [])
+        self.assertEqual(len(self.caches.prune(drain=True)), 1)
+
+    @patch("devdock.manager.DevContainerManager.create_container")
+    def test_create_dev_container_mounts_caches(self, mock_create):
+        self.manager.create_dev_container(
+            "dev", "python:3.11", ["/src:/src"], caches=["pip"]
+        )
+        mock_create.assert_called_once_with(
+            "python:3.11",
+            "dev",
+            ["/src:/src", "devdock-cache-pip:/root/.cache/pip"],
+            "if-not-present",
+        )
+        config = self.manager.config_manager.read_config("dev")
+        self.assertEqual(config["volumes"], ["/src:/src"])
+        self.assertEqual(config["cache"], ["pip"])
+
+    @patch("devdock.manager.DevContainerManager.start_compose_services")
+    def test_create_dev_compose_mounts_caches(self, mock_start):
+        compose_file = os.path.join(self.tmp, "docker-compose.yaml")
+        with open(compose_file, "w") as f:
+            f.write("services:\n  web:\n    image: node\n  db:\n    image: postgres\n")
+        self.manager.create_dev_compose("dev", compose_file, caches=["web:npm"])
+        data = self.manager.read_compose_file(
+            os.path.join(self.tmp, "docker-compose.dev.yaml")
+        )
+        self.assertEqual(
+            data["services"]["web"]["volumes"], ["devdock-cache-npm:/root/.npm"]
+        )
+        self.assertNotIn("volumes", data["services"]["db"])
+        self.assertEqual(data["volumes"], {"devdock-cache-npm": {"external": True}})
+
+
+if __name__ == "__main__":
+    unittest.main()
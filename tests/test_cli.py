@@ -1,7 +1,11 @@
+import json
+import subprocess
+import sys
 import unittest
 from unittest.mock import patch, MagicMock
 from click.testing import CliRunner
 from devdock.cli import cli
+from devdock.streams import STDOUT, CommandStream
 
 
 class TestCli(unittest.TestCase):
@@ -22,7 +26,63 @@ class TestCli(unittest.TestCase):
         self.assertIn(
             "Dev container test_container created with ID 12345.", result.output
         )
-        mock_create.assert_called_once_with("test_container", "python:3.9", [])
+        mock_create.assert_called_once_with(
+            "test_container",
+            "python:3.9",
+            [],
+            "if-not-present",
+            warm=False,
+            caches=[],
+            sync=False,
+        )
+
+    @patch("devdock.manager.DevContainerManager.create_dev_container")
+    @patch("devdock.manager.docker.from_env", return_value=MagicMock())
+    def test_mkdevcontainer_pull_policy(self, mock_docker, mock_create):
+        result = self.runner.invoke(
+            cli,
+            [
+                "mkdevcontainer",
+                "--image",
+                "python:3.9",
+                "--name",
+                "test_container",
+                "--pull",
+                "always",
+            ],
+        )
+        self.assertEqual(result.exit_code, 0)
+        mock_create.assert_called_once_with(
+            "test_container",
+            "python:3.9",
+            [],
+            "always",
+            warm=False,
+            caches=[],
+            sync=False,
+        )
+
+    @patch("devdock.manager.DevContainerManager.create_dev_containers")
+    @patch("devdock.manager.DevContainerManager.read_manifest")
+    @patch("devdock.manager.docker.from_env", return_value=MagicMock())
+    def test_mkdevcontainer_from_manifest(self, mock_docker, mock_read, mock_create):
+        specs = [{"name": "a", "image": "python:3.9"}]
+        mock_read.return_value = specs
+        container = MagicMock()
+        container.name = "a"
+        container.id = "1"
+        mock_create.return_value = [
+            {"name": "a", "container": container, "error": None},
+            {"name": "b", "container": None, "error": RuntimeError("boom")},
+        ]
+        result = self.runner.invoke(
+            cli, ["mkdevcontainer", "--from-manifest", "fleet.yaml"]
+        )
+        mock_read.assert_called_once_with("fleet.yaml")
+        mock_create.assert_called_once_with(specs, "if-not-present", 8)
+        self.assertIn("Dev container a created with ID 1.", result.output)
+        self.assertIn("Error: b: boom", result.output)
+        self.assertIn("Created 1 of 2 dev containers.", result.output)
 
     @patch("devdock.manager.DevContainerManager.create_dev_compose")
     @patch("devdock.manager.docker.from_env", return_value=MagicMock())
@@ -74,6 +134,162 @@ class TestCli(unittest.TestCase):
         self.assertIn("Activated dev configuration test_container.", result.output)
         mock_activate.assert_called_once_with("test_container")
 
+    @patch("devdock.exec_server.send_command", side_effect=ConnectionError)
+    @patch("devdock.manager.DevContainerManager.run_command", return_value="hi")
+    @patch("devdock.manager.docker.from_env", return_value=MagicMock())
+    def test_run_falls_back_without_exec_server(self, mock_docker, mock_run, mock_send):
+        result = self.runner.invoke(
+            cli, ["run", "--no-stream", "test_container", "echo hi"]
+        )
+        self.assertIn("hi", result.output)
+        mock_run.assert_called_once_with("test_container", "echo hi", None)
+
+    @patch("devdock.exec_server.send_command", return_value="from server")
+    @patch("devdock.manager.DevContainerManager.run_command")
+    def test_run_uses_exec_server(self, mock_run, mock_send):
+        result = self.runner.invoke(
+            cli, ["run", "--no-stream", "test_container", "echo hi"]
+        )
+        self.assertIn("from server", result.output)
+        mock_run.assert_not_called()
+
+    @patch("devdock.exec_server.stream_command", side_effect=ConnectionError)
+    @patch("devdock.manager.DevContainerManager.stream_command")
+    def test_run_streams_output(self, mock_stream, mock_send):
+        mock_stream.return_value = CommandStream(
+            iter([(STDOUT, b"building\n"), (STDOUT, b"done\n")]), lambda: 2
+        )
+        result = self.runner.invoke(cli, ["run", "test_container", "make"])
+        self.assertEqual(result.output, "building\ndone\n")
+        self.assertEqual(result.exit_code, 2)
+        mock_stream.assert_called_once_with("test_container", "make", None)
+
+    @patch("devdock.manager.DevContainerManager.select_containers")
+    @patch("devdock.manager.docker.from_env")
+    def test_run_many_prefixes_output(self, mock_docker, mock_select):
+        containers = {"web-1": MagicMock(id="1"), "worker-1": MagicMock(id="2")}
+        for container in containers.values():
+            container.status = "running"
+        mock_select.return_value = (containers, [])
+        client = mock_docker.return_value
+        client.api.exec_create.side_effect = lambda cid, cmd: {"Id": cid}
+        client.api.exec_start.side_effect = lambda eid, **kwargs: iter(
+            [(f"hello from {eid}\n".encode(), None)]
+        )
+        client.api.exec_inspect.side_effect = lambda eid: {"ExitCode": int(eid) - 1}
+
+        result = self.runner.invoke(
+            cli, ["run", "--match", "*-1", "--parallel", "2", "uptime"]
+        )
+        self.assertIn("web-1    | hello from 1\n", result.output)
+        self.assertIn("worker-1 | hello from 2\n", result.output)
+        self.assertIn("worker-1: exited with code 1.", result.output)
+        self.assertIn("Ran in 2 of 2 containers, 1 failed.", result.output)
+        self.assertEqual(result.exit_code, 1)
+        mock_select.assert_called_once_with((), "*-1", (), None)
+
+    @patch("devdock.manager.DevContainerManager.select_containers")
+    def test_run_many_rejects_service_without_all(self, mock_select):
+        result = self.runner.invoke(
+            cli, ["run", "--match", "*-1", "--service", "web", "uptime"]
+        )
+        self.assertEqual(result.exit_code, 2)
+        self.assertIn("--service with several targets needs --all", result.output)
+        mock_select.assert_not_called()
+
+    @patch("devdock.manager.DevContainerManager.stop_containers")
+    @patch("devdock.manager.DevContainerManager.select_containers")
+    def test_stop_bulk(self, mock_select, mock_stop):
+        containers = {"trainee-1": MagicMock(), "trainee-2": MagicMock()}
+        mock_select.return_value = (containers, [])
+        mock_stop.return_value = [
+            {"name": "trainee-1", "error": None},
+            {"name": "trainee-2", "error": RuntimeError("boom")},
+        ]
+        result = self.runner.invoke(
+            cli, ["stop", "--match", "trainee-*", "--timeout", "1"]
+        )
+        mock_select.assert_called_once_with((), "trainee-*", (), None)
+        mock_stop.assert_called_once_with(containers, 1, None, 8)
+        self.assertIn("Container trainee-1 stopped.", result.output)
+        self.assertIn("Error: trainee-2: boom", result.output)
+
+    @patch("devdock.manager.DevContainerManager.sample_stats")
+    def test_stats_once(self, mock_sample):
+        row = {
+            "name": "dev",
+            "cpu_percent": 12.5,
+            "memory_usage": 512 * 1024 * 1024,
+            "memory_limit": 2 * 1024**3,
+            "memory_percent": 25.0,
+            "net_rx": 1000,
+            "net_tx": 2000,
+            "block_read": 0,
+            "block_write": 4096,
+            "pids": 4,
+        }
+        mock_sample.return_value = [row]
+        result = self.runner.invoke(cli, ["stats", "dev", "--no-stream"])
+        mock_sample.assert_called_once_with("dev")
+        self.assertIn("MEM USAGE / LIMIT", result.output)
+        self.assertIn("12.50%", result.output)
+        self.assertIn("512.0MiB / 2.0GiB", result.output)
+
+        result = self.runner.invoke(cli, ["stats", "dev", "--no-stream", "--json"])
+        self.assertEqual(json.loads(result.output)["cpu_percent"], 12.5)
+
+    @patch("devdock.manager.DevContainerManager.status")
+    def test_ls(self, mock_status):
+        mock_status.return_value = [
+            {
+                "name": "shop",
+                "type": "compose",
+                "source": "docker-compose.dev.yaml",
+                "state": "partial",
+                "containers": [
+                    {
+                        "service": "web",
+                        "name": "shop-web-1",
+                        "state": "running",
+                        "status": "Up 5 minutes",
+                        "id": "2",
+                        "created": 1,
+                    },
+                    {
+                        "service": "db",
+                        "name": None,
+                        "state": "missing",
+                        "status": "",
+                        "id": None,
+                        "created": None,
+                    },
+                ],
+            }
+        ]
+        result = self.runner.invoke(cli, ["status", "--type", "compose"])
+        mock_status.assert_called_once_with(None, "compose")
+        lines = result.output.splitlines()
+        self.assertIn("shop-web-1", lines[1])
+        self.assertIn("partial", lines[1])
+        self.assertTrue(lines[2].rstrip().endswith("missing"))
+
+        result = self.runner.invoke(cli, ["ls", "--json"])
+        self.assertEqual(json.loads(result.output)[0]["state"], "partial")
+
+    def test_import_does_not_load_docker(self):
+        code = "import sys, devdock.cli; sys.exit('docker.api' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code])
+        self.assertEqual(result.returncode, 0)
+
+    def test_lazy_submodules_are_bound_on_their_package(self):
+        code = (
+            "import devdock._lazy as lazy, devdock; "
+            "module = lazy.lazy_import('xml.dom'); import xml; "
+            "assert xml.dom is module; from xml.dom import minidom"
+        )
+        result = subprocess.run([sys.executable, "-c", code])
+        self.assertEqual(result.returncode, 0)
+
 
 if __name__ == "__main__":
     unittest.main()
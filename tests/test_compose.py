@@ -0,0 +1,150 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from devdock.compose import ComposeCache, ServiceGraph, load_yaml, service_hashes
+
+
+class TestComposeCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.compose_file = os.path.join(self.tmp_dir, "docker-compose.yaml")
+        self.write("services:\n  web:\n    image: nginx\n")
+        self.cache = ComposeCache(maxsize=2)
+
+    def write(self, text, path=None):
+        with open(path or self.compose_file, "w") as f:
+            f.write(text)
+
+    @patch("devdock.compose.load_yaml", side_effect=load_yaml)
+    def test_reuses_parsed_document(self, mock_load):
+        first = self.cache.load(self.compose_file)
+        second = self.cache.load(self.compose_file)
+        self.assertEqual(first, {"services": {"web": {"image": "nginx"}}})
+        self.assertEqual(first, second)
+        mock_load.assert_called_once()
+
+    def test_returns_independent_copies(self):
+        data = self.cache.load(self.compose_file)
+        data["services"]["web"]["image"] = "changed"
+        self.assertEqual(
+            self.cache.load(self.compose_file)["services"]["web"]["image"], "nginx"
+        )
+
+    def test_reparses_modified_file(self):
+        self.cache.load(self.compose_file)
+        self.write("services:\n  web:\n    image: httpd:2\n")
+        os.utime(self.compose_file, ns=(1, 1))
+        self.assertEqual(
+            self.cache.load(self.compose_file)["services"]["web"]["image"], "httpd:2"
+        )
+
+    @patch("devdock.compose.load_yaml", side_effect=load_yaml)
+    def test_touched_file_with_same_content_is_not_reparsed(self, mock_load):
+        self.cache.load(self.compose_file)
+        os.utime(self.compose_file, ns=(1, 1))
+        self.cache.load(self.compose_file)
+        mock_load.assert_called_once()
+
+    @patch("devdock.compose.load_yaml", side_effect=load_yaml)
+    def test_dump_primes_cache(self, mock_load):
+        data = {"services": {"db": {"image": "postgres"}}}
+        self.cache.dump(self.compose_file, data)
+        self.assertEqual(self.cache.load(self.compose_file), data)
+        mock_load.assert_not_called()
+
+    def test_dump_skips_identical_content(self):
+        data = {"services": {"db": {"image": "postgres"}}}
+        self.assertTrue(self.cache.dump(self.compose_file, data))
+        os.utime(self.compose_file, ns=(1, 1))
+        self.assertFalse(self.cache.dump(self.compose_file, data))
+        self.assertEqual(os.stat(self.compose_file).st_mtime_ns, 1)
+
+    @patch("devdock.compose.load_yaml", side_effect=load_yaml)
+    def test_evicts_least_recently_used(self, mock_load):
+        paths = [os.path.join(self.tmp_dir, f"{i}.yaml") for i in range(3)]
+        for path in paths:
+            self.write("services: {}\n", path)
+            self.cache.load(path)
+        self.cache.load(paths[0])
+        self.assertEqual(mock_load.call_count, 4)
+
+    @patch("devdock.compose.ServiceGraph")
+    def test_service_graph_built_once_per_content(self, mock_graph):
+        self.cache.service_graph(self.compose_file)
+        os.utime(self.compose_file, ns=(1, 1))
+        self.cache.service_graph(self.compose_file)
+        mock_graph.assert_called_once()
+
+
+class TestServiceHashes(unittest.TestCase):
+    def test_only_affected_services_change(self):
+        compose_data = {
+            "services": {
+                "web": {"image": "nginx"},
+                "db": {"image": "postgres", "volumes": ["data:/var/lib/postgresql"]},
+            },
+            "volumes": {"data": None},
+        }
+        before = service_hashes(compose_data)
+        compose_data["volumes"]["data"] = {"driver": "nfs"}
+        after = service_hashes(compose_data)
+        self.assertEqual(before["web"], after["web"])
+        self.assertNotEqual(before["db"], after["db"])
+
+
+class TestServiceGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = ServiceGraph(
+            {
+                "services": {
+                    "web": {"depends_on": ["api", "cache"]},
+                    "api": {
+                        "depends_on": {
+                            "db": {"condition": "service_healthy"},
+                            "cache": {"condition": "service_started"},
+                        }
+                    },
+                    "cache": {},
+                    "db": {},
+                    "worker": {"depends_on": ["db"]},
+                }
+            }
+        )
+
+    def test_long_syntax_conditions(self):
+        self.assertEqual(
+            self.graph.depends_on["api"],
+            {"db": "service_healthy", "cache": "service_started"},
+        )
+
+    def test_dependencies(self):
+        self.assertEqual(self.graph.dependencies("web"), {"api", "cache", "db"})
+        self.assertEqual(self.graph.dependencies("db"), set())
+
+    def test_start_order(self):
+        self.assertEqual(self.graph.start_order(["web"]), ["cache", "db", "api", "web"])
+
+    def test_start_layers(self):
+        self.assertEqual(
+            self.graph.start_layers(),
+            [["cache", "db"], ["api", "worker"], ["web"]],
+        )
+        self.assertEqual(self.graph.start_layers(["worker"]), [["db"], ["worker"]])
+
+    def test_cycle(self):
+        with self.assertRaises(ValueError):
+            ServiceGraph(
+                {"services": {"a": {"depends_on": ["b"]}, "b": {"depends_on": ["a"]}}}
+            )
+
+    def test_deep_chain(self):
+        services = {f"s{i}": {"depends_on": [f"s{i + 1}"]} for i in range(1000)}
+        graph = ServiceGraph({"services": services})
+        self.assertEqual(len(graph.dependencies("s0")), 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
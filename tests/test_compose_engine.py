@@ -0,0 +1,208 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+import docker
+from devdock.compose_engine import ComposeEngine, UnsupportedComposeFile
+from devdock.manager import DevContainerManager
+
+COMPOSE_FILE = """
+services:
+  web:
+    image: nginx:latest
+    depends_on:
+      - api
+    ports:
+      - "8080:80"
+      - "127.0.0.1:9000:9000/udp"
+    environment:
+      - MODE=dev
+  api:
+    image: python:3.11
+    depends_on:
+      db:
+        condition: service_started
+    volumes:
+      - ./src:/app:ro
+      - api_data:/data
+  db:
+    image: postgres:16
+volumes:
+  api_data:
+"""
+
+
+class TestComposeEngine(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp(prefix="proj")
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.compose_file = os.path.join(self.tmp_dir, "docker-compose.yaml")
+        with open(self.compose_file, "w") as f:
+            f.write(COMPOSE_FILE)
+        self.project = os.path.basename(self.tmp_dir).lower()
+        self.client = MagicMock()
+        self.client.containers.get.side_effect = docker.errors.NotFound("missing")
+        self.client.networks.list.return_value = []
+        self.client.volumes.get.side_effect = docker.errors.NotFound("missing")
+        self.manager = DevContainerManager(client=self.client)
+        self.engine = ComposeEngine(self.manager, max_workers=1)
+        patcher = patch("devdock.compose_engine.subprocess.run")
+        self.compose_cli = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.compose_cli.return_value.stdout = "web abc\napi def\n"
+
+    def created(self):
+        return {
+            c.kwargs["labels"]["com.docker.compose.service"]: c.kwargs
+            for c in self.client.containers.create.call_args_list
+        }
+
+    def test_up_creates_project_resources(self):
+        self.engine.up(self.compose_file)
+
+        self.client.networks.create.assert_called_once()
+        self.assertEqual(
+            self.client.networks.create.call_args.args[0], f"{self.project}_default"
+        )
+        self.client.volumes.create.assert_called_once()
+        self.assertEqual(
+            self.client.volumes.create.call_args.args[0], f"{self.project}_api_data"
+        )
+        created = self.created()
+        self.assertEqual(
+            [
+                c.kwargs["labels"]["com.docker.compose.service"]
+                for c in self.client.containers.create.call_args_list
+            ],
+            ["db", "api", "web"],
+        )
+        web = created["web"]
+        self.assertEqual(web["name"], f"{self.project}-web-1")
+        self.assertEqual(web["labels"]["com.docker.compose.project"], self.project)
+        self.assertEqual(web["environment"], {"MODE": "dev"})
+        self.assertEqual(
+            web["ports"], {"80/tcp": 8080, "9000/udp": ("127.0.0.1", 9000)}
+        )
+        self.assertEqual(web["network"], f"{self.project}_default")
+        self.assertEqual(len(web["labels"]["com.docker.compose.config-hash"]), 64)
+        self.compose_cli.assert_not_called()
+        mounts = created["api"]["mounts"]
+        self.assertEqual(mounts[0]["Source"], os.path.join(self.tmp_dir, "src"))
+        self.assertTrue(mounts[0]["ReadOnly"])
+        self.assertEqual(mounts[1]["Source"], f"{self.project}_api_data")
+
+    def test_compose_hash_is_opt_in(self):
+        ComposeEngine(self.manager, max_workers=1, compose_hash=True).up(
+            self.compose_file
+        )
+        created = self.created()
+        self.assertEqual(
+            created["web"]["labels"]["com.docker.compose.config-hash"], "abc"
+        )
+        self.compose_cli.assert_called_once_with(
+            ["docker", "compose", "-f", self.compose_file, "config", "--hash", "*"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        # Without a hash from the CLI, devdock's own hash is used.
+        self.assertEqual(
+            len(created["db"]["labels"]["com.docker.compose.config-hash"]), 64
+        )
+
+    def test_port_ranges(self):
+        ports = self.engine._ports(
+            {
+                "ports": [
+                    "3000-3002:4000-4002",
+                    "127.0.0.1:5000-5001:5000-5001/udp",
+                    "6000-6001",
+                    {"target": 7000, "published": "8000"},
+                ]
+            }
+        )
+        self.assertEqual(
+            ports,
+            {
+                "4000/tcp": 3000,
+                "4001/tcp": 3001,
+                "4002/tcp": 3002,
+                "5000/udp": ("127.0.0.1", 5000),
+                "5001/udp": ("127.0.0.1", 5001),
+                "6000/tcp": None,
+                "6001/tcp": None,
+                "7000/tcp": 8000,
+            },
+        )
+        with self.assertRaises(UnsupportedComposeFile):
+            self.engine._ports({"ports": ["3000-3005:4000"]})
+
+    def test_up_only_requested_services(self):
+        self.engine.up(self.compose_file, ["api"])
+        self.assertEqual(sorted(self.created()), ["api", "db"])
+
+    def test_up_starts_existing_container(self):
+        existing = MagicMock(status="exited")
+        self.client.containers.get.side_effect = None
+        self.client.containers.get.return_value = existing
+
+        self.engine.up(self.compose_file, ["db"])
+        self.client.containers.create.assert_not_called()
+        existing.start.assert_called_once()
+        self.compose_cli.assert_not_called()
+
+    def test_up_recreates_requested_services(self):
+        existing = MagicMock(status="running")
+        self.client.containers.get.side_effect = None
+        self.client.containers.get.return_value = existing
+
+        self.engine.up(self.compose_file, ["api"], recreate=["api"])
+        existing.remove.assert_called_once_with(force=True)
+        self.assertEqual(list(self.created()), ["api"])
+
+    def test_up_rejects_build(self):
+        with open(self.compose_file, "w") as f:
+            f.write("services:\n  app:\n    build: .\n")
+        with self.assertRaises(UnsupportedComposeFile):
+            self.engine.up(self.compose_file)
+        self.client.networks.create.assert_not_called()
+
+    @patch("devdock.manager.subprocess.run")
+    def test_manager_falls_back_to_compose_cli(self, mock_run):
+        with open(self.compose_file, "w") as f:
+            f.write("services:\n  app:\n    build: .\n")
+        manager = DevContainerManager(client=self.client, compose_engine="sdk")
+        manager.start_compose_services(self.compose_file)
+        mock_run.assert_called_once_with(
+            ["docker", "compose", "-f", self.compose_file, "up", "-d"], check=True
+        )
+        self.client.containers.create.assert_not_called()
+
+    def test_down(self):
+        container = MagicMock()
+        network = MagicMock()
+        self.client.containers.list.return_value = [container]
+        self.client.networks.list.return_value = [network]
+
+        self.engine.down(self.compose_file)
+        container.stop.assert_called_once_with(timeout=10)
+        container.remove.assert_called_once()
+        network.remove.assert_called_once()
+        self.client.containers.list.assert_called_once_with(
+            all=True, filters={"label": f"com.docker.compose.project={self.project}"}
+        )
+
+    @patch("devdock.compose_engine.ComposeEngine")
+    def test_manager_uses_sdk_engine(self, mock_engine):
+        manager = DevContainerManager(client=self.client, compose_engine="sdk")
+        manager.start_compose_services(self.compose_file, ["web"])
+        mock_engine.return_value.up.assert_called_once_with(
+            self.compose_file, ["web"], None
+        )
+        manager.stop_compose_services(self.compose_file)
+        mock_engine.return_value.down.assert_called_once_with(self.compose_file)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,8 @@
 import unittest
 import os
 import shutil
-from devdock.config import ConfigManager
+import tempfile
+from devdock.config import ConfigManager, SqliteConfigBackend
 
 
 class TestConfigManager(unittest.TestCase):
@@ -39,5 +40,64 @@ class TestConfigManager(unittest.TestCase):
         self.assertIn(self.config_name, configs)
 
 
+class TestSqliteConfigBackend(unittest.TestCase):
+    def setUp(self):
+        self.base_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.base_dir)
+
+    def test_migrates_yaml_configs(self):
+        legacy = ConfigManager(self.base_dir, backend="yaml")
+        legacy.create_config("old", {"type": "container", "name": "old"})
+
+        config_manager = ConfigManager(self.base_dir, backend="sqlite")
+        self.assertEqual(config_manager.list_configs(), ["old"])
+        self.assertEqual(
+            config_manager.read_config("old"), {"type": "container", "name": "old"}
+        )
+        self.assertTrue(
+            os.path.exists(os.path.join(self.base_dir, "old.yaml.migrated"))
+        )
+        self.assertEqual(legacy.list_configs(), [])
+
+    def test_find_configs(self):
+        config_manager = ConfigManager(self.base_dir, backend="sqlite")
+        config_manager.create_config(
+            "a", {"type": "container", "name": "a", "image": "python:3.9"}
+        )
+        config_manager.create_config(
+            "b", {"type": "compose", "name": "b", "compose_file": "b.dev.yaml"}
+        )
+        self.assertEqual(
+            [c["name"] for c in config_manager.find_configs(type="container")], ["a"]
+        )
+        self.assertEqual(
+            [c["name"] for c in config_manager.find_configs(compose_file="b.dev.yaml")],
+            ["b"],
+        )
+
+    def test_find_by_name_uses_primary_key(self):
+        backend = SqliteConfigBackend(self.base_dir)
+        self.addCleanup(backend.close)
+        for name in ("a", "b"):
+            backend.save(name, {"type": "container", "name": name})
+        queries = []
+        backend._conn.set_trace_callback(queries.append)
+        self.assertEqual(backend.find(name="b", type="container"), [backend.load("b")])
+        self.assertIn("WHERE name = 'b'", queries[0])
+        self.assertEqual(backend.find(name="missing"), [])
+
+    def test_delete_missing_config(self):
+        config_manager = ConfigManager(self.base_dir, backend="sqlite")
+        with self.assertRaises(FileNotFoundError):
+            config_manager.delete_config("missing")
+
+    def test_backend_instance(self):
+        backend = SqliteConfigBackend(self.base_dir)
+        self.addCleanup(backend.close)
+        config_manager = ConfigManager(self.base_dir, backend=backend)
+        config_manager.create_config("a", {"name": "a"})
+        self.assertEqual(backend.load("a"), {"name": "a"})
+
+
 if __name__ == "__main__":
     unittest.main()
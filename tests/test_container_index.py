@@ -0,0 +1,78 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import docker
+from devdock.container_index import ContainerIndex
+from devdock.manager import DevContainerManager
+
+SUMMARIES = [
+    {"Id": "aaa111", "Names": ["/web"], "State": "running"},
+    {"Id": "aaa222", "Names": ["/web-2"], "State": "exited"},
+    {"Id": "bbb333", "Names": ["/db"], "State": "running"},
+]
+
+
+class TestContainerIndex(unittest.TestCase):
+    def setUp(self):
+        self.client = MagicMock()
+        self.client.api.containers.return_value = SUMMARIES
+        self.index = ContainerIndex(self.client, ttl=60)
+
+    def test_exact_name_match(self):
+        self.assertEqual(self.index.lookup("web")["Id"], "aaa111")
+        self.assertEqual(self.index.lookup("/web-2")["Id"], "aaa222")
+        self.assertIsNone(self.index.lookup("we"))
+
+    def test_id_prefix(self):
+        self.assertEqual(self.index.lookup("bbb")["Id"], "bbb333")
+        self.assertIsNone(self.index.lookup("aaa"))
+
+    def test_single_list_call_until_stale(self):
+        for name in ("web", "db", "missing"):
+            self.index.lookup(name)
+        self.client.api.containers.assert_called_once_with(all=True)
+        self.index.invalidate()
+        self.index.lookup("web")
+        self.assertEqual(self.client.api.containers.call_count, 2)
+
+
+class TestManagerContainerLookup(unittest.TestCase):
+    @patch("devdock.manager.docker.from_env")
+    def test_get_container_with_warm_index(self, mock_docker):
+        client = mock_docker.return_value
+        client.api.containers.return_value = SUMMARIES
+        manager = DevContainerManager()
+        manager.container_index.refresh()
+
+        manager.get_container("web")
+        client.containers.get.assert_called_once_with("aaa111")
+        client.containers.list.assert_not_called()
+
+    @patch("devdock.manager.docker.from_env")
+    def test_get_container_asks_daemon_on_index_miss(self, mock_docker):
+        client = mock_docker.return_value
+        client.api.containers.return_value = SUMMARIES
+        manager = DevContainerManager()
+        manager.container_index.refresh()
+
+        # Created by another process after the index was listed.
+        self.assertIs(
+            manager.get_container("cache"), client.containers.get.return_value
+        )
+        client.containers.get.assert_called_once_with("cache")
+        client.containers.get.side_effect = docker.errors.NotFound("missing")
+        with self.assertRaises(docker.errors.NotFound):
+            manager.get_container("we")
+
+    @patch("devdock.manager.docker.from_env")
+    def test_get_container_does_not_match_substrings(self, mock_docker):
+        client = mock_docker.return_value
+        client.containers.get.side_effect = docker.errors.NotFound("missing")
+        manager = DevContainerManager()
+
+        with self.assertRaises(docker.errors.NotFound):
+            manager.get_container("we")
+        client.containers.list.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock
+from devdock.exec_server import ExecServer, send_command, stream_command
+from devdock.streams import STDERR, STDOUT, CommandStream
+
+
+class TestExecServer(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.socket_path = os.path.join(self.tmp_dir, "exec.sock")
+        self.manager = MagicMock()
+        self.server = ExecServer(self.manager, self.socket_path)
+        thread = threading.Thread(target=self.server.serve, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(self.server.shutdown)
+
+    def test_send_command(self):
+        self.manager.run_command.return_value = "hello\n"
+        output = send_command("test_container", "echo hello", None, self.socket_path)
+        self.assertEqual(output, "hello\n")
+        self.manager.run_command.assert_called_once_with(
+            "test_container", "echo hello", None
+        )
+
+    def test_send_command_error(self):
+        self.manager.run_command.side_effect = RuntimeError("boom")
+        with self.assertRaisesRegex(RuntimeError, "boom"):
+            send_command("test_container", "false", None, self.socket_path)
+
+    def test_stream_command(self):
+        self.manager.stream_command.return_value = CommandStream(
+            iter([(STDOUT, b"a"), (STDERR, b"\xff")]), lambda: 2
+        )
+        stream = stream_command("test_container", "make", None, self.socket_path)
+        self.assertEqual(list(stream), [(STDOUT, b"a"), (STDERR, b"\xff")])
+        self.assertEqual(stream.exit_code, 2)
+
+    def test_no_server(self):
+        with self.assertRaises(ConnectionError):
+            send_command(
+                "test_container", "true", None, os.path.join(self.tmp_dir, "missing")
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import gzip
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+from click.testing import CliRunner
+from devdock.cli import cli
+from devdock.logs import LogStream, RotatingWriter, parse_since, sort_key
+from devdock.manager import DevContainerManager
+
+
+def logs(*lines):
+    return lambda: iter([line.encode() for line in lines])
+
+
+class TestLogStream(unittest.TestCase):
+    def test_merges_in_timestamp_order(self):
+        stream = LogStream(
+            {
+                "web": logs("2024-01-01T00:00:01.5Z b\n", "2024-01-01T00:00:03Z d\n"),
+                "db": logs("2024-01-01T00:00:01Z a\n2024-01-01T00:00:02Z c\n"),
+                "empty": logs(),
+            }
+        )
+        self.assertEqual(
+            [(name, line) for name, _, line in stream],
+            [("db", b"a\n"), ("web", b"b\n"), ("db", b"c\n"), ("web", b"d\n")],
+        )
+        self.assertEqual(stream.errors, {})
+
+    def test_sort_key_pads_fractions(self):
+        self.assertLess(
+            sort_key(b"2024-01-01T00:00:00.1234Z"),
+            sort_key(b"2024-01-01T00:00:00.12345Z"),
+        )
+
+    def test_failed_stream_is_reported(self):
+        def broken():
+            yield b"2024-01-01T00:00:01Z a\n"
+            raise RuntimeError("gone")
+
+        stream = LogStream({"web": broken, "db": logs("2024-01-01T00:00:02Z b\n")})
+        self.assertEqual([line for _, _, line in stream], [b"a\n", b"b\n"])
+        self.assertEqual(str(stream.errors["web"]), "gone")
+
+    def test_follow_does_not_wait_for_quiet_containers(self):
+        quiet = threading.Event()
+        self.addCleanup(quiet.set)
+
+        def idle():
+            quiet.wait(5)
+            return iter([])
+
+        stream = LogStream(
+            {"web": logs("2024-01-01T00:00:01Z a\n"), "db": idle}, lag=0.05
+        )
+        lines = iter(stream)
+        self.assertEqual(next(lines), ("web", b"2024-01-01T00:00:01Z", b"a\n"))
+        lines.close()
+
+    def test_parse_since(self):
+        self.assertEqual(parse_since("10m", now=1000), 400)
+        self.assertEqual(parse_since("1700000000"), 1700000000)
+        self.assertEqual(parse_since("2024-01-01T00:00:00Z"), 1704067200)
+        with self.assertRaises(ValueError):
+            parse_since("yesterday")
+
+
+class TestRotatingWriter(unittest.TestCase):
+    def test_rotates_compressed_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "shop.log.gz")
+            with RotatingWriter(path, max_bytes=10, backups=2) as writer:
+                for i in range(4):
+                    writer.write(f"line {i}\n".encode())
+            self.assertEqual(
+                sorted(os.listdir(tmp)),
+                ["shop.log.1.gz", "shop.log.2.gz", "shop.log.gz"],
+            )
+            with gzip.open(path) as f:
+                self.assertEqual(f.read(), b"line 3\n")
+            with gzip.open(os.path.join(tmp, "shop.log.2.gz")) as f:
+                self.assertEqual(f.read(), b"line 1\n")
+
+
+class TestLogs(unittest.TestCase):
+    def setUp(self):
+        self.client = MagicMock()
+        self.manager = DevContainerManager(client=self.client)
+        self.manager.status = MagicMock(
+            return_value=[
+                {
+                    "name": "shop",
+                    "containers": [
+                        {"service": "web", "name": "app-web-1", "id": "1"},
+                        {"service": "db", "name": "app-db-1", "id": "2"},
+                        {"service": "cache", "name": None, "id": None},
+                    ],
+                }
+            ]
+        )
+
+    def test_log_targets(self):
+        self.assertEqual(
+            self.manager.log_targets("shop"), {"app-web-1": "1", "app-db-1": "2"}
+        )
+        self.assertEqual(self.manager.log_targets("shop", ["db"]), {"app-db-1": "2"})
+        with self.assertRaises(RuntimeError):
+            self.manager.log_targets("shop", ["cache"])
+
+    def test_cli_prefixes_merged_lines(self):
+        self.client.api.logs.side_effect = lambda container_id, **kwargs: iter(
+            [f"2024-01-01T00:00:0{container_id}Z from {container_id}\n".encode()]
+        )
+        with patch("devdock.cli.DevContainerManager", return_value=self.manager):
+            result = CliRunner().invoke(cli, ["logs", "shop", "--tail", "5"])
+        self.assertEqual(result.output, "app-web-1 | from 1\napp-db-1  | from 2\n")
+        self.client.api.logs.assert_any_call(
+            "1", stream=True, follow=False, timestamps=True, since=None, tail=5
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,10 @@
+import os
+import shutil
+import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
+import docker
+from devdock.config import ConfigManager
 from devdock.manager import DevContainerManager
 
 
@@ -7,6 +12,14 @@ class TestDevContainerManager(unittest.TestCase):
     def setUp(self):
         self.manager = DevContainerManager()
 
+    @patch("devdock.manager.docker.from_env")
+    def test_client_is_created_lazily(self, mock_docker):
+        manager = DevContainerManager()
+        mock_docker.assert_not_called()
+        self.assertIs(manager.client, mock_docker.return_value)
+        self.assertIs(manager.client, mock_docker.return_value)
+        mock_docker.assert_called_once()
+
     @patch("devdock.manager.docker.from_env")
     def test_create_container(self, mock_docker):
         mock_client = MagicMock()
@@ -15,11 +28,66 @@ class TestDevContainerManager(unittest.TestCase):
         mock_client.containers.run.return_value = mock_container
 
         container = self.manager.create_container("python:3.9", "test_container")
-        mock_client.containers.run.assert_called_with(
-            "python:3.9", name="test_container", volumes={}, detach=True
+        mock_client.images.get.assert_called_once_with("python:3.9")
+        mock_client.images.pull.assert_not_called()
+        mock_client.containers.run.assert_called_once_with(
+            image="python:3.9",
+            name="test_container",
+            volumes={},
+            labels=None,
+            detach=True,
+            stdin_open=True,
+            tty=True,
+            command="/bin/sh",
         )
         self.assertEqual(container, mock_container)
 
+    @patch("devdock.manager.docker.from_env")
+    def test_create_container_skips_pull_for_local_image(self, mock_docker):
+        mock_client = MagicMock()
+        mock_docker.return_value = mock_client
+
+        self.manager.create_container("python:3.9", "test_container")
+        mock_client.images.get.assert_called_once_with("python:3.9")
+        mock_client.images.pull.assert_not_called()
+
+    @patch("devdock.manager.docker.from_env")
+    def test_create_container_pulls_missing_image(self, mock_docker):
+        mock_client = MagicMock()
+        mock_docker.return_value = mock_client
+        mock_client.images.get.side_effect = docker.errors.ImageNotFound("missing")
+
+        self.manager.create_container("python:3.9", "test_container")
+        self.assertEqual(
+            [name for name, _, _ in mock_client.mock_calls],
+            ["images.get", "images.pull", "containers.run"],
+        )
+        mock_client.images.pull.assert_called_once_with("python:3.9")
+
+    @patch("devdock.manager.docker.from_env")
+    def test_create_container_pull_always(self, mock_docker):
+        mock_client = MagicMock()
+        mock_docker.return_value = mock_client
+
+        self.manager.create_container(
+            "python:3.9", "test_container", pull_policy="always"
+        )
+        mock_client.images.get.assert_not_called()
+        mock_client.images.pull.assert_called_once_with("python:3.9")
+
+    @patch("devdock.manager.docker.from_env")
+    def test_create_container_pull_never(self, mock_docker):
+        mock_client = MagicMock()
+        mock_docker.return_value = mock_client
+        mock_client.images.get.side_effect = docker.errors.ImageNotFound("missing")
+
+        with self.assertRaises(docker.errors.ImageNotFound):
+            self.manager.create_container(
+                "python:3.9", "test_container", pull_policy="never"
+            )
+        mock_client.images.pull.assert_not_called()
+        mock_client.containers.run.assert_not_called()
+
     @patch("devdock.manager.docker.from_env")
     def test_start_container(self, mock_docker):
         mock_client = MagicMock()
@@ -50,6 +118,191 @@ class TestDevContainerManager(unittest.TestCase):
         self.manager.remove_container("test_container")
         mock_container.remove.assert_called_once()
 
+    @patch("devdock.manager.docker.from_env")
+    def test_run_command_reuses_container_handle(self, mock_docker):
+        mock_client = MagicMock()
+        mock_docker.return_value = mock_client
+        mock_container = mock_client.containers.get.return_value
+        mock_container.exec_run.return_value.output = b"ok"
+
+        self.assertEqual(self.manager.run_command("test_container", "true"), "ok")
+        self.assertEqual(self.manager.run_command("test_container", "true"), "ok")
+        mock_client.containers.get.assert_called_once_with("test_container")
+        self.assertEqual(mock_container.exec_run.call_count, 2)
+
+    @patch("devdock.manager.docker.from_env")
+    def test_run_command_refreshes_stale_handle(self, mock_docker):
+        mock_client = MagicMock()
+        mock_docker.return_value = mock_client
+        stale, fresh = MagicMock(), MagicMock()
+        stale.exec_run.side_effect = docker.errors.NotFound("gone")
+        fresh.exec_run.return_value.output = b"ok"
+        mock_client.containers.get.side_effect = [stale, fresh]
+
+        self.manager.run_command("test_container", "true")
+        self.assertEqual(self.manager.run_command("test_container", "true"), "ok")
+
+    @patch("devdock.manager.docker.from_env")
+    def test_run_command_refreshes_handle_on_conflict(self, mock_docker):
+        mock_client = MagicMock()
+        mock_docker.return_value = mock_client
+        stale, fresh = MagicMock(), MagicMock()
+        stale.exec_run.side_effect = docker.errors.APIError(
+            "is not running", MagicMock(status_code=409)
+        )
+        fresh.exec_run.return_value.output = b"ok"
+        mock_client.containers.get.side_effect = [stale, fresh]
+
+        self.assertEqual(self.manager.run_command("test_container", "true"), "ok")
+        fresh.exec_run.assert_called_once_with("true")
+
+    @patch("devdock.manager.docker.from_env")
+    def test_run_command_in_service_uses_compose_labels(self, mock_docker):
+        mock_client = MagicMock()
+        mock_docker.return_value = mock_client
+        replica_2, replica_1 = MagicMock(), MagicMock()
+        replica_2.labels = {"com.docker.compose.container-number": "2"}
+        replica_1.labels = {"com.docker.compose.container-number": "1"}
+        replica_1.exec_run.return_value.output = b"ok"
+        mock_client.containers.list.return_value = [replica_2, replica_1]
+
+        output = self.manager.run_command("/srv/My App/compose.yaml", "true", "web")
+        self.assertEqual(output, "ok")
+        mock_client.containers.list.assert_called_once_with(
+            filters={
+                "label": [
+                    "com.docker.compose.project=myapp",
+                    "com.docker.compose.service=web",
+                ]
+            }
+        )
+
+    @patch("devdock.manager.docker.from_env")
+    def test_stream_command(self, mock_docker):
+        mock_client = MagicMock()
+        mock_docker.return_value = mock_client
+        mock_client.containers.get.return_value.id = "abc"
+        mock_client.api.exec_create.return_value = {"Id": "exec1"}
+        mock_client.api.exec_start.return_value = iter([(b"ok", None)])
+        mock_client.api.exec_inspect.return_value = {"ExitCode": 1}
+
+        stream = self.manager.stream_command("test_container", "make")
+        self.assertEqual(stream.read(), (b"ok", b""))
+        self.assertEqual(stream.exit_code, 1)
+        mock_client.api.exec_create.assert_called_once_with("abc", "make")
+
+    @patch("devdock.manager.docker.from_env")
+    def test_stream_command_refreshes_stale_handle(self, mock_docker):
+        mock_client = MagicMock()
+        mock_docker.return_value = mock_client
+        stale, fresh = MagicMock(id="old"), MagicMock(id="new")
+        mock_client.containers.get.side_effect = [stale, fresh]
+        mock_client.api.exec_create.side_effect = [
+            docker.errors.APIError("is not running", MagicMock(status_code=409)),
+            {"Id": "exec1"},
+        ]
+        mock_client.api.exec_start.return_value = iter([(b"ok", None)])
+        mock_client.api.exec_inspect.return_value = {"ExitCode": 0}
+
+        stream = self.manager.stream_command("test_container", "make")
+        self.assertEqual(stream.read(), (b"ok", b""))
+        mock_client.api.exec_create.assert_called_with("new", "make")
+
+    @patch("devdock.manager.DevContainerManager.start_compose_services")
+    def test_create_dev_compose_is_incremental(self, mock_start):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        compose_file = os.path.join(tmp_dir, "docker-compose.yaml")
+        with open(compose_file, "w") as f:
+            f.write(
+                "services:\n"
+                "  web:\n    image: nginx\n    volumes: ['/a:/srv']\n"
+                "  db:\n    image: postgres\n"
+            )
+        dev_compose_file = os.path.join(tmp_dir, "docker-compose.dev.yaml")
+        client = MagicMock()
+        manager = DevContainerManager(client=client)
+        manager.config_manager = ConfigManager(os.path.join(tmp_dir, "configs"))
+
+        manager.create_dev_compose("dev", compose_file, ["web:/b:/srv", "web:/b:/srv"])
+        mock_start.assert_called_once_with(
+            dev_compose_file, ["web", "db"], recreate=["web", "db"]
+        )
+        self.assertEqual(
+            manager.read_compose_file(dev_compose_file)["services"]["web"]["volumes"],
+            ["/b:/srv"],
+        )
+
+        client.containers.list.return_value = [
+            MagicMock(labels={"com.docker.compose.service": service})
+            for service in ("web", "db")
+        ]
+        mtime = os.stat(dev_compose_file).st_mtime_ns
+        mock_start.reset_mock()
+        manager.create_dev_compose("dev", compose_file, ["web:/b:/srv"])
+        mock_start.assert_not_called()
+        self.assertEqual(os.stat(dev_compose_file).st_mtime_ns, mtime)
+
+        manager.create_dev_compose("dev", compose_file, ["web:/c:/srv"])
+        mock_start.assert_called_once_with(dev_compose_file, ["web"], recreate=["web"])
+
+    @patch("devdock.manager.docker.from_env")
+    def test_select_containers(self, mock_docker):
+        mock_client = MagicMock()
+        mock_docker.return_value = mock_client
+        mock_client.containers.prepare_model.side_effect = lambda summary: summary
+        mock_client.api.containers.return_value = [
+            {"Id": "1", "Names": ["/trainee-1"], "Labels": {"team": "a"}},
+            {"Id": "2", "Names": ["/trainee-2"], "Labels": {"team": "b"}},
+            {"Id": "3", "Names": ["/mentor"], "Labels": {"team": "a"}},
+            {"Id": "4", "Names": ["/app-web-1"], "Labels": {}},
+        ]
+
+        containers, missing = self.manager.select_containers(
+            ["mentor", "ghost"], pattern="trainee-*", labels=["team=a"]
+        )
+        self.assertEqual(sorted(containers), ["mentor", "trainee-1"])
+        self.assertEqual(missing, ["ghost"])
+        mock_client.api.containers.assert_called_once_with(all=True)
+
+    def test_select_containers_by_config_type_honours_project_name(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        compose_file = os.path.join(tmp, "x.dev.yaml")
+        with open(compose_file, "w") as f:
+            f.write("name: shop\nservices:\n  web:\n    image: nginx\n")
+        client = MagicMock()
+        client.containers.prepare_model.side_effect = lambda summary: summary
+        client.api.containers.return_value = [
+            {
+                "Id": "1",
+                "Names": ["/shop-web-1"],
+                "Labels": {"com.docker.compose.project": "shop"},
+            },
+            {"Id": "2", "Names": ["/other"], "Labels": {}},
+        ]
+        manager = DevContainerManager(client=client)
+        manager.config_manager = MagicMock()
+        manager.config_manager.find_configs.return_value = [
+            {"type": "compose", "name": "dev", "compose_file": compose_file}
+        ]
+        containers, _ = manager.select_containers(config_type="compose")
+        self.assertEqual(list(containers), ["shop-web-1"])
+
+    @patch("devdock.manager.docker.from_env")
+    def test_stop_containers(self, mock_docker):
+        ok, failing = MagicMock(), MagicMock()
+        failing.stop.side_effect = RuntimeError("boom")
+
+        results = self.manager.stop_containers(
+            {"a": ok, "b": failing}, timeout=2, signal="SIGINT"
+        )
+        ok.kill.assert_called_once_with(signal="SIGINT")
+        ok.stop.assert_called_once_with(timeout=2)
+        self.assertEqual([r["name"] for r in results], ["a", "b"])
+        self.assertIsNone(results[0]["error"])
+        self.assertIsInstance(results[1]["error"], RuntimeError)
+
     @patch("devdock.manager.docker.from_env")
     def test_create_volume(self, mock_docker):
         mock_client = MagicMock()
@@ -71,6 +324,139 @@ class TestDevContainerManager(unittest.TestCase):
         self.manager.remove_volume("test_volume")
         mock_volume.remove.assert_called_once()
 
+    def test_read_manifest_expands_counts(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".yaml", delete=False) as f:
+            f.write(
+                "defaults:\n"
+                "  image: python:3.9\n"
+                "containers:\n"
+                "  - name: trainee-{index}\n"
+                "    count: 3\n"
+                "  - name: mentor\n"
+                "    image: python:3.11\n"
+            )
+        self.addCleanup(os.remove, f.name)
+
+        specs = self.manager.read_manifest(f.name)
+        self.assertEqual(
+            [(spec["name"], spec["image"]) for spec in specs],
+            [
+                ("trainee-1", "python:3.9"),
+                ("trainee-2", "python:3.9"),
+                ("trainee-3", "python:3.9"),
+                ("mentor", "python:3.11"),
+            ],
+        )
+
+    def test_status_joins_configs_with_one_list(self):
+        client = MagicMock()
+        project = {"com.docker.compose.project": "app"}
+        client.api.containers.return_value = [
+            {"Id": "1", "Names": ["/dev"], "State": "running", "Status": "Up 1 hour"},
+            {
+                "Id": "2",
+                "Names": ["/app-web-1"],
+                "State": "running",
+                "Status": "Up 5 minutes",
+                "Labels": {**project, "com.docker.compose.service": "web"},
+            },
+            {
+                "Id": "3",
+                "Names": ["/app-web-run-1"],
+                "State": "running",
+                "Labels": {
+                    **project,
+                    "com.docker.compose.service": "web",
+                    "com.docker.compose.oneoff": "True",
+                },
+            },
+        ]
+        manager = DevContainerManager(client=client)
+        manager.config_manager = MagicMock()
+        manager.config_manager.find_configs.return_value = [
+            {"type": "container", "name": "dev", "image": "python:3.11"},
+            {"type": "container", "name": "gone", "image": "python:3.11"},
+            {
+                "type": "compose",
+                "name": "shop",
+                "compose_file": "/nonexistent/app/x.dev.yaml",
+                "service_hashes": {"web": "a", "db": "b"},
+            },
+        ]
+
+        rows = manager.status()
+        client.api.containers.assert_called_once_with(all=True)
+        self.assertEqual(
+            [(r["name"], r["state"]) for r in rows],
+            [("dev", "running"), ("gone", "missing"), ("shop", "partial")],
+        )
+        self.assertEqual(rows[0]["containers"][0]["status"], "Up 1 hour")
+        self.assertEqual(
+            [(c["service"], c["name"], c["state"]) for c in rows[2]["containers"]],
+            [("web", "app-web-1", "running"), ("db", None, "missing")],
+        )
+
+    def test_status_unknown_config(self):
+        manager = DevContainerManager(client=MagicMock())
+        manager.config_manager = MagicMock()
+        manager.config_manager.find_configs.return_value = []
+        with self.assertRaises(FileNotFoundError):
+            manager.status("nope")
+
+    def test_command_targets_expand_configs(self):
+        manager = DevContainerManager(client=MagicMock())
+        manager.status = MagicMock(
+            return_value=[
+                {
+                    "name": "shop",
+                    "containers": [
+                        {
+                            "service": "web",
+                            "name": "app-web-1",
+                            "id": "2",
+                            "state": "running",
+                        },
+                        {"service": "db", "name": None, "id": None, "state": "missing"},
+                    ],
+                }
+            ]
+        )
+        self.assertEqual(
+            manager.command_targets(["shop", "nope"]),
+            ({"app-web-1": "2", "shop/db": None}, ["nope"]),
+        )
+        self.assertEqual(
+            manager.command_targets(["shop"], service="web"), ({"app-web-1": "2"}, [])
+        )
+
+    @patch("devdock.manager.DevContainerManager.create_dev_container")
+    @patch("devdock.manager.docker.from_env")
+    def test_create_dev_containers_dedupes_pulls(self, mock_docker, mock_create):
+        mock_client = MagicMock()
+        mock_docker.return_value = mock_client
+        mock_create.side_effect = lambda name, *args, **kwargs: name
+        specs = [{"name": f"c{i}", "image": "python:3.9"} for i in range(5)]
+
+        results = self.manager.create_dev_containers(specs, max_workers=3)
+        mock_client.images.get.assert_called_once_with("python:3.9")
+        self.assertEqual(mock_create.call_count, 5)
+        self.assertEqual(
+            [(r["name"], r["container"], r["error"]) for r in results],
+            [(f"c{i}", f"c{i}", None) for i in range(5)],
+        )
+
+    @patch("devdock.manager.DevContainerManager.create_dev_container")
+    @patch("devdock.manager.docker.from_env")
+    def test_create_dev_containers_reports_errors(self, mock_docker, mock_create):
+        mock_client = MagicMock()
+        mock_docker.return_value = mock_client
+        mock_client.images.get.side_effect = docker.errors.ImageNotFound("missing")
+        specs = [{"name": "c0", "image": "missing:latest"}]
+
+        results = self.manager.create_dev_containers(specs, pull_policy="never")
+        mock_create.assert_not_called()
+        self.assertIsInstance(results[0]["error"], docker.errors.ImageNotFound)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,151 @@
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+import docker
+from devdock.manager import DevContainerManager
+from devdock.pool import (
+    POOL_LABEL,
+    POOL_MAX_IDLE_LABEL,
+    POOL_SIZE_LABEL,
+    ContainerPool,
+    profile,
+)
+
+
+def member(container_id, age, state="running", name=None, max_idle=None):
+    labels = {POOL_LABEL: profile("python:3.11")}
+    if max_idle is not None:
+        labels[POOL_MAX_IDLE_LABEL] = str(max_idle)
+    return {
+        "Id": container_id,
+        "Names": [f"/{name or 'devdock-pool-' + container_id}"],
+        "State": state,
+        "Created": int(time.time()) - age,
+        "Labels": labels,
+        "Image": "python:3.11",
+    }
+
+
+class TestContainerPool(unittest.TestCase):
+    def setUp(self):
+        self.client = MagicMock()
+        self.manager = DevContainerManager(client=self.client)
+        self.manager.config_manager = MagicMock()
+        self.pool = ContainerPool(self.manager, size=2, max_idle=600)
+        patcher = patch("devdock.pool.subprocess.Popen")
+        self.popen = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_profile_depends_on_image_and_volumes(self):
+        self.assertEqual(
+            profile("a", ["/x:/y", "/z:/w"]), profile("a", ["/z:/w", "/x:/y"])
+        )
+        self.assertNotEqual(profile("a"), profile("a", ["/x:/y"]))
+        self.assertNotEqual(profile("a"), profile("b"))
+
+    def test_claim_renames_oldest_idle_member(self):
+        self.client.api.containers.return_value = [
+            member("new", 10),
+            member("old", 100),
+            member("stopped", 200, state="exited"),
+            member("claimed", 300, name="someones-dev"),
+        ]
+        container = self.pool.claim("python:3.11", "dev")
+        self.client.api.rename.assert_called_once_with("devdock-pool-old", "dev")
+        self.client.containers.get.assert_called_once_with("old")
+        self.assertIs(container, self.client.containers.get.return_value)
+        self.assertEqual(
+            self.client.api.containers.call_args.kwargs["filters"],
+            {"label": f"{POOL_LABEL}={profile('python:3.11')}"},
+        )
+
+    def test_claim_skips_members_taken_concurrently(self):
+        self.client.api.containers.return_value = [member("a", 20), member("b", 10)]
+        self.client.api.rename.side_effect = [docker.errors.NotFound("gone"), None]
+        self.pool.claim("python:3.11", "dev")
+        self.client.containers.get.assert_called_once_with("b")
+
+    def test_claim_skips_members_being_renamed(self):
+        self.client.api.containers.return_value = [member("a", 20), member("b", 10)]
+        conflict = docker.errors.APIError("conflict", MagicMock(status_code=409))
+        self.client.api.rename.side_effect = [conflict, None]
+        self.pool.claim("python:3.11", "dev")
+        self.client.containers.get.assert_called_once_with("b")
+
+    def test_claim_from_empty_pool(self):
+        self.client.api.containers.return_value = [member("a", 1000)]
+        self.assertIsNone(self.pool.claim("python:3.11", "dev"))
+        self.client.api.rename.assert_not_called()
+
+    def test_evict_expired_and_surplus(self):
+        self.client.api.containers.return_value = [
+            member("a", 30),
+            member("b", 20),
+            member("c", 10),
+            member("expired", 90, max_idle=60),
+            member("stopped", 5, state="exited"),
+        ]
+        removed = self.pool.evict("python:3.11")
+        self.assertEqual(
+            sorted(removed),
+            ["devdock-pool-a", "devdock-pool-expired", "devdock-pool-stopped"],
+        )
+
+    def test_fill_creates_missing_members(self):
+        self.client.api.containers.return_value = [member("a", 10)]
+        self.manager.create_container = MagicMock()
+        created = self.pool.fill("python:3.11", ["/src:/src"])
+        self.assertEqual(len(created), 1)
+        image, name, volumes, pull_policy = self.manager.create_container.call_args.args
+        self.assertEqual(
+            (image, volumes, pull_policy), ("python:3.11", ["/src:/src"], "never")
+        )
+        self.assertTrue(
+            name.startswith(f"devdock-pool-{profile('python:3.11', ['/src:/src'])}-")
+        )
+        labels = self.manager.create_container.call_args.kwargs["labels"]
+        self.assertEqual(labels[POOL_SIZE_LABEL], "2")
+
+    def test_create_dev_container_claims_warm_container(self):
+        self.client.api.containers.return_value = [member("a", 10)]
+        self.manager.create_container = MagicMock()
+        self.client.containers.get.return_value.labels = {
+            POOL_SIZE_LABEL: "3",
+            POOL_MAX_IDLE_LABEL: "60.0",
+        }
+        self.manager.create_dev_container("dev", "python:3.11", warm=True)
+        self.client.api.rename.assert_called_once_with("devdock-pool-a", "dev")
+        self.manager.create_container.assert_not_called()
+        command = self.popen.call_args.args[0]
+        self.assertEqual(
+            command[1:],
+            [
+                "-m",
+                "devdock.cli",
+                "pool",
+                "fill",
+                "python:3.11",
+                "--size",
+                "3",
+                "--max-idle",
+                "60.0",
+            ],
+        )
+        self.assertTrue(self.popen.call_args.kwargs["start_new_session"])
+
+    def test_create_dev_container_falls_back_when_pool_empty(self):
+        self.client.api.containers.return_value = []
+        self.manager.create_container = MagicMock()
+        self.manager.create_dev_container("dev", "python:3.11", warm=True)
+        self.manager.create_container.assert_called_once_with(
+            "python:3.11", "dev", None, "if-not-present"
+        )
+        # The empty pool is primed for the next claim.
+        self.assertEqual(
+            self.popen.call_args.args[0][4:],
+            ["fill", "python:3.11", "--size", "2", "--max-idle", "3600"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from click.testing import CliRunner
+from devdock import profiling
+from devdock.cli import cli
+from devdock.manager import DevContainerManager
+
+ORIGINAL_CREATE = DevContainerManager.create_container
+
+
+class TestProfiling(unittest.TestCase):
+    def tearDown(self):
+        profiling.disable()
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(profiling.active())
+        self.assertIs(DevContainerManager.create_container, ORIGINAL_CREATE)
+        with profiling.span("anything") as span:
+            self.assertIsNone(span)
+
+    def test_records_nested_spans(self):
+        profiler = profiling.enable()
+        client = MagicMock()
+        client.images.get.return_value = MagicMock()
+        manager = DevContainerManager(client=client)
+        manager.create_container("python:3.11", "dev")
+        manager.create_container("python:3.11", "dev2")
+
+        rows = {row[0]: row for row in profiler.summary()}
+        self.assertEqual(rows["DevContainerManager.create_container"][1], 2)
+        self.assertEqual(rows["DevContainerManager.ensure_image"][1], 2)
+        self.assertEqual(rows["docker.run"][1], 2)
+        self.assertNotIn("docker.pull", rows)
+
+        spans = {span[0]: span for span in profiler.spans}
+        run, create = spans["docker.run"], spans["DevContainerManager.create_container"]
+        self.assertEqual(run[5], create[4])
+        self.assertGreaterEqual(run[1], create[1])
+        self.assertLessEqual(run[2], create[2])
+
+    def test_disable_restores_methods(self):
+        profiling.enable()
+        self.assertIsNot(DevContainerManager.create_container, ORIGINAL_CREATE)
+        profiler = profiling.disable()
+        self.assertIs(DevContainerManager.create_container, ORIGINAL_CREATE)
+        with profiling.span("after"):
+            pass
+        self.assertEqual(profiler.spans, [])
+
+    def test_export_formats(self):
+        profiler = profiling.enable()
+        with profiling.span("outer"):
+            with profiling.span("inner"):
+                pass
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.json")
+            profiler.export(path)
+            with open(path) as f:
+                events = json.load(f)["traceEvents"]
+            self.assertEqual({e["name"] for e in events}, {"outer", "inner"})
+            self.assertTrue(all(e["ph"] == "X" for e in events))
+
+            profiler.export(path, profiling.FORMAT_OTEL)
+            with open(path) as f:
+                trace = json.load(f)
+            spans = trace["resourceSpans"][0]["scopeSpans"][0]["spans"]
+            by_name = {s["name"]: s for s in spans}
+            self.assertEqual(
+                by_name["inner"]["parentSpanId"], by_name["outer"]["spanId"]
+            )
+            self.assertNotIn("parentSpanId", by_name["outer"])
+
+            with self.assertRaises(ValueError):
+                profiler.export(path, "xml")
+
+    def test_cli_profile_flag(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.json")
+            result = CliRunner().invoke(
+                cli, ["--profile-output", path, "exec-server", "--help"]
+            )
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn("SPAN", result.output)
+            self.assertTrue(os.path.exists(path))
+        self.assertIsNone(profiling.active())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import io
+import os
+import tarfile
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+import docker
+from click.testing import CliRunner
+from devdock.archive import read_tar
+from devdock.cli import cli
+from devdock.manager import DevContainerManager
+from devdock.seed import MANIFEST_NAME, VolumeSeeder
+
+
+class FakeVolume:
+    """Helper container whose archive API reads and writes a dict of files."""
+
+    def __init__(self):
+        self.files = {}
+        self.puts = []
+        self.remove = MagicMock()
+
+    def get_archive(self, path):
+        name = os.path.basename(path)
+        if name not in self.files:
+            raise docker.errors.NotFound("not found")
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w") as tar:
+            info = tarfile.TarInfo(name)
+            info.size = len(self.files[name])
+            tar.addfile(info, io.BytesIO(self.files[name]))
+        return iter([buffer.getvalue()]), {}
+
+    def put_archive(self, path, data):
+        written = []
+        for info, fileobj in read_tar(data):
+            if fileobj is not None:
+                self.files[info.name] = fileobj.read()
+                written.append(info.name)
+        self.puts.append(written)
+        return True
+
+
+class TestVolumeSeeder(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.src = self.tmp.name
+        os.makedirs(os.path.join(self.src, "pkg"))
+        self.write("a.txt", b"hello")
+        self.write("pkg/b.txt", b"x" * 100000)
+        self.client = MagicMock()
+        self.volume = FakeVolume()
+        self.client.containers.create.return_value = self.volume
+        self.manager = DevContainerManager(client=self.client)
+        self.seeder = VolumeSeeder(self.manager)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, data):
+        with open(os.path.join(self.src, path), "wb") as f:
+            f.write(data)
+
+    def test_seed_streams_tree_into_volume(self):
+        stats = self.seeder.seed("cache", self.src)
+        self.assertEqual(stats, {"files": 2, "bytes": 100005, "unchanged": 0})
+        self.client.volumes.create.assert_called_once_with("cache", labels=None)
+        self.client.containers.create.assert_called_once_with(
+            "busybox:latest", volumes={"cache": {"bind": "/seed", "mode": "rw"}}
+        )
+        self.assertEqual(self.volume.files["a.txt"], b"hello")
+        self.assertEqual(self.volume.files["pkg/b.txt"], b"x" * 100000)
+        self.assertIn(MANIFEST_NAME, self.volume.files)
+        self.volume.remove.assert_called_once_with(force=True)
+
+    def test_reseed_skips_unchanged_files(self):
+        self.seeder.seed("cache", self.src)
+        self.write("a.txt", b"world")
+        stats = self.seeder.seed("cache", self.src)
+        self.assertEqual(stats, {"files": 1, "bytes": 5, "unchanged": 1})
+        self.assertEqual(self.volume.puts[-1], ["a.txt", MANIFEST_NAME])
+        self.assertEqual(self.volume.files["a.txt"], b"world")
+
+    def test_touched_file_with_same_content_is_skipped(self):
+        self.seeder.seed("cache", self.src)
+        os.utime(os.path.join(self.src, "a.txt"), ns=(0, 0))
+        stats = self.seeder.seed("cache", self.src)
+        self.assertEqual(stats["files"], 0)
+        self.assertEqual(stats["unchanged"], 2)
+
+    def test_empty_file_is_recorded(self):
+        self.write("empty.txt", b"")
+        self.seeder.seed("cache", self.src)
+        self.assertEqual(self.volume.files["empty.txt"], b"")
+        stats = self.seeder.seed("cache", self.src)
+        self.assertEqual(stats, {"files": 0, "bytes": 0, "unchanged": 3})
+        self.assertEqual(self.volume.puts[-1], [MANIFEST_NAME])
+
+    def test_missing_directory(self):
+        with self.assertRaises(FileNotFoundError):
+            self.seeder.seed("cache", os.path.join(self.src, "nope"))
+        self.client.containers.create.assert_not_called()
+
+    def test_seed_many_reports_errors_per_volume(self):
+        results = self.seeder.seed_many(
+            {"cache": self.src, "other": os.path.join(self.src, "nope")}
+        )
+        self.assertEqual([r["name"] for r in results], ["cache", "other"])
+        self.assertEqual(results[0]["stats"]["files"], 2)
+        self.assertIsNone(results[0]["error"])
+        self.assertIsInstance(results[1]["error"], FileNotFoundError)
+
+    def test_cli_requires_pairs(self):
+        result = CliRunner().invoke(cli, ["volume", "seed", "cache"])
+        self.assertNotEqual(result.exit_code, 0)
+        self.assertIn("Expected VOLUME HOST_DIR pairs", result.output)
+
+
+if __name__ == "__main__":
+    unittest.main()
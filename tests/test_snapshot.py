@@ -0,0 +1,196 @@
+import io
+import os
+import tarfile
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from devdock.archive import read_tar, tar_chunks
+from devdock.config import ConfigManager
+from devdock.manager import DevContainerManager
+from devdock.snapshot import SnapshotStore, parse_ref
+
+
+def volume_archive(files, root="data"):
+    """What get_archive returns for a volume holding ``{path: bytes}``."""
+    members = []
+    directory = tarfile.TarInfo(root)
+    directory.type = tarfile.DIRTYPE
+    members.append((directory, None))
+    for path, (data, mtime) in files.items():
+        info = tarfile.TarInfo(f"{root}/{path}")
+        info.size = len(data)
+        info.mtime = mtime
+        members.append((info, lambda data=data: io.BytesIO(data)))
+    return tar_chunks(members)
+
+
+class TestSnapshotStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.client = MagicMock()
+        self.manager = DevContainerManager(client=self.client)
+        self.manager.config_manager = ConfigManager(
+            base_dir=self.tmp.name, backend="yaml"
+        )
+        self.store = SnapshotStore(self.manager)
+        self.files = {"a.txt": (b"hello", 100), "big.bin": (b"x" * 100000, 100)}
+        self.container = MagicMock()
+        self.container.attrs = {
+            "Mounts": [
+                {"Type": "volume", "Name": "dev-data", "Destination": "/data"},
+                {"Type": "bind", "Source": "/src", "Destination": "/src"},
+            ]
+        }
+        self.container.get_archive.side_effect = lambda path: (
+            volume_archive(self.files),
+            {},
+        )
+        self.layers = ["sha256:base", "sha256:change1"]
+        self.commits = 0
+
+        def commit():
+            self.commits += 1
+            image = MagicMock()
+            image.id = f"sha256:image{self.commits}"
+            image.attrs = {"RootFS": {"Layers": list(self.layers)}, "Size": 1000}
+            return image
+
+        self.container.commit.side_effect = commit
+        self.client.containers.get.return_value = self.container
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def blobs(self):
+        return sorted(f for _, _, files in os.walk(self.store.blob_dir) for f in files)
+
+    def test_parse_ref(self):
+        self.assertEqual(parse_ref("dev@v1"), ("dev", "v1"))
+        self.assertEqual(parse_ref("dev"), ("dev", None))
+
+    def test_snapshot_stores_volume_files_and_tags_image(self):
+        record, created = self.store.snapshot("dev", "v1")
+        self.assertTrue(created)
+        self.assertEqual(record["ref"], "devdock-snapshot:dev.v1")
+        self.assertEqual(len(record["volumes"]), 1)
+        self.assertEqual(record["size"], 1000 + 5 + 100000)
+        # Two file blobs plus the manifest.
+        self.assertEqual(len(self.blobs()), 3)
+
+    def test_identical_snapshot_is_deduplicated(self):
+        first, _ = self.store.snapshot("dev", "v1")
+        second, created = self.store.snapshot("dev", "v2")
+        self.assertFalse(created)
+        self.assertEqual(second["tag"], "v1")
+        self.client.images.remove.assert_called_once_with("sha256:image2")
+        self.assertEqual(len(self.store.list("dev")), 1)
+
+    def test_unchanged_files_are_not_read_again(self):
+        self.store.snapshot("dev", "v1")
+        stored = []
+        original = self.store._store_blob
+
+        def store_blob(fileobj):
+            result = original(fileobj)
+            stored.append(result[1])
+            return result
+
+        self.store._store_blob = store_blob
+        self.files["a.txt"] = (b"changed", 200)
+        self.layers.append("sha256:change2")
+        _, created = self.store.snapshot("dev", "v2")
+        self.assertTrue(created)
+        # Only the changed file and the new manifest were copied.
+        self.assertEqual(len(stored), 2)
+        self.assertEqual(stored[0], len(b"changed"))
+
+    def test_restore_refills_volumes(self):
+        self.store.snapshot("dev", "v1")
+        helper = MagicMock()
+        uploaded = {}
+        helper.put_archive.side_effect = lambda path, data: uploaded.update(
+            {path: {i.name: f.read() for i, f in read_tar(data) if f}}
+        )
+        self.client.containers.create.return_value = helper
+        self.manager.create_dev_container = MagicMock()
+
+        self.store.restore("dev", "v1")
+        self.container.remove.assert_called_once_with(force=True)
+        self.client.volumes.get.return_value.remove.assert_called_once()
+        self.client.volumes.create.assert_called_once_with("dev-data", labels=None)
+        self.assertEqual(
+            uploaded["/data"], {"a.txt": b"hello", "big.bin": b"x" * 100000}
+        )
+        helper.remove.assert_called_once_with(force=True)
+        self.manager.create_dev_container.assert_called_once_with(
+            "dev", "devdock-snapshot:dev.v1", ["dev-data:/data"], "never"
+        )
+
+    def test_restore_keeps_dev_config(self):
+        config = {
+            "type": "container",
+            "name": "dev",
+            "image": "python:3.11",
+            "volumes": ["/src:/src", "dev-data:/data"],
+            "cache": ["pip"],
+            "sync": {},
+        }
+        self.manager.config_manager.create_config("dev", config)
+        self.store.snapshot("dev", "v1")
+        self.client.containers.create.return_value = MagicMock()
+        self.manager.create_container = MagicMock()
+
+        self.store.restore("dev", "v1")
+        self.manager.create_container.assert_called_once_with(
+            "devdock-snapshot:dev.v1",
+            "dev",
+            ["/src:/src", "devdock-cache-pip:/root/.cache/pip", "dev-data:/data"],
+            "never",
+        )
+        self.assertEqual(self.manager.config_manager.read_config("dev"), config)
+
+    def test_shared_volumes_are_not_snapshotted(self):
+        self.container.attrs["Mounts"] += [
+            {
+                "Type": "volume",
+                "Name": "devdock-cache-pip",
+                "Destination": "/root/.cache/pip",
+            },
+            {"Type": "volume", "Name": "devdock-sync-dev-1234", "Destination": "/app"},
+        ]
+        cache = MagicMock(attrs={"Labels": {"devdock.cache": "pip"}})
+        self.client.volumes.get.side_effect = lambda name: (
+            cache if name == "devdock-cache-pip" else MagicMock(attrs={})
+        )
+        record, _ = self.store.snapshot("dev", "v1")
+        self.assertEqual([v["volume"] for v in record["volumes"]], ["dev-data"])
+        self.container.get_archive.assert_called_once_with("/data")
+
+    def test_restore_refuses_volume_in_use(self):
+        self.store.snapshot("dev", "v1")
+        self.client.containers.list.return_value = [MagicMock(), MagicMock()]
+        self.client.containers.list.return_value[0].name = "dev"
+        self.client.containers.list.return_value[1].name = "other"
+        with self.assertRaises(RuntimeError):
+            self.store.restore("dev", "v1")
+        self.container.remove.assert_not_called()
+        self.client.volumes.get.return_value.remove.assert_not_called()
+
+    def test_restore_unknown_snapshot(self):
+        with self.assertRaises(ValueError):
+            self.store.restore("dev", "nope")
+
+    def test_gc_drops_least_recently_used(self):
+        for i in range(3):
+            self.files["a.txt"] = (f"v{i}".encode(), 100 + i)
+            self.layers.append(f"sha256:layer{i}")
+            self.store.snapshot("dev", f"v{i}")
+        dropped = self.store.gc(keep=1)
+        self.assertEqual(sorted(r["tag"] for r in dropped), ["v0", "v1"])
+        self.assertEqual([r["tag"] for r in self.store.list()], ["v2"])
+        # big.bin, the current a.txt and one manifest remain.
+        self.assertEqual(len(self.blobs()), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+from unittest.mock import MagicMock
+from devdock.manager import DevContainerManager
+from devdock.stats import StatsSampler, parse_stats, sample_once
+
+RAW = {
+    "cpu_stats": {
+        "cpu_usage": {"total_usage": 300},
+        "system_cpu_usage": 2000,
+        "online_cpus": 4,
+    },
+    "precpu_stats": {"cpu_usage": {"total_usage": 100}, "system_cpu_usage": 1000},
+    "memory_stats": {
+        "usage": 600,
+        "limit": 1000,
+        "stats": {"inactive_file": 100},
+    },
+    "networks": {
+        "eth0": {"rx_bytes": 10, "tx_bytes": 20},
+        "eth1": {"rx_bytes": 1, "tx_bytes": 2},
+    },
+    "blkio_stats": {
+        "io_service_bytes_recursive": [
+            {"op": "read", "value": 5},
+            {"op": "write", "value": 7},
+            {"op": "Read", "value": 1},
+        ]
+    },
+    "pids_stats": {"current": 3},
+}
+
+
+class TestStats(unittest.TestCase):
+    def test_parse_stats(self):
+        stats = parse_stats(RAW)
+        self.assertEqual(stats["cpu_percent"], 80.0)
+        self.assertEqual(stats["memory_usage"], 500)
+        self.assertEqual(stats["memory_percent"], 50.0)
+        self.assertEqual((stats["net_rx"], stats["net_tx"]), (11, 22))
+        self.assertEqual((stats["block_read"], stats["block_write"]), (6, 7))
+        self.assertEqual(stats["pids"], 3)
+
+    def test_parse_first_sample_without_precpu(self):
+        stats = parse_stats({"cpu_stats": RAW["cpu_stats"], "blkio_stats": {}})
+        self.assertEqual(stats["cpu_percent"], 0.0)
+        self.assertEqual(stats["memory_percent"], 0.0)
+
+    def test_sample_once(self):
+        api = MagicMock()
+        api.stats.side_effect = lambda cid, stream: (
+            RAW if cid == "1" else (_ for _ in ()).throw(RuntimeError("gone"))
+        )
+        rows = sample_once(api, {"web": "1", "db": "2"})
+        self.assertEqual([row["name"] for row in rows], ["db", "web"])
+        self.assertEqual(rows[0], {"name": "db", "error": "gone"})
+        self.assertEqual(rows[1]["cpu_percent"], 80.0)
+
+    def test_sampler_follows_streams(self):
+        api = MagicMock()
+        api.stats.side_effect = lambda cid, stream, decode: iter([RAW, RAW])
+        with StatsSampler(api, {"web": "1", "db": "2"}) as sampler:
+            rows = next(sampler.samples(interval=5))
+        self.assertEqual([row["name"] for row in rows], ["db", "web"])
+        api.stats.assert_any_call("1", stream=True, decode=True)
+
+    def test_stats_targets(self):
+        client = MagicMock()
+        client.api.containers.return_value = [
+            {"Id": "1", "Names": ["/dev"], "State": "running", "Labels": {}},
+            {"Id": "2", "Names": ["/other"], "State": "running", "Labels": {}},
+            {
+                "Id": "3",
+                "Names": ["/app-web-1"],
+                "State": "running",
+                "Labels": {"com.docker.compose.project": "app"},
+            },
+            {"Id": "4", "Names": ["/stopped"], "State": "exited", "Labels": {}},
+        ]
+        manager = DevContainerManager(client=client)
+        manager.config_manager = MagicMock()
+        manager.config_manager.find_configs.return_value = [
+            {"type": "container", "name": "dev"},
+            {"type": "container", "name": "stopped"},
+            {"type": "compose", "name": "a", "compose_file": "/nonexistent/app/x.yml"},
+        ]
+        self.assertEqual(manager.stats_targets(), {"dev": "1", "app-web-1": "3"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import subprocess
+import sys
+import threading
+import unittest
+from unittest.mock import MagicMock
+from devdock.streams import (
+    STDERR,
+    STDOUT,
+    CommandStream,
+    FanOutStream,
+    exec_stream,
+    process_stream,
+)
+
+
+class TestStreams(unittest.TestCase):
+    def test_process_stream(self):
+        process = subprocess.Popen(
+            [
+                sys.executable,
+                "-c",
+                "import sys; print('out'); print('err', file=sys.stderr); sys.exit(3)",
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        stream = process_stream(process)
+        self.assertIsNone(stream.exit_code)
+        stdout, stderr = stream.read()
+        self.assertEqual(stdout.strip(), b"out")
+        self.assertEqual(stderr.strip(), b"err")
+        self.assertEqual(stream.exit_code, 3)
+
+    def test_exec_stream(self):
+        api = MagicMock()
+        api.exec_create.return_value = {"Id": "exec1"}
+        api.exec_start.return_value = iter([(b"a", None), (None, b"b"), (b"c", None)])
+        api.exec_inspect.return_value = {"ExitCode": 0}
+
+        stream = exec_stream(api, "container1", "make")
+        self.assertEqual(list(stream), [(STDOUT, b"a"), (STDERR, b"b"), (STDOUT, b"c")])
+        self.assertEqual(stream.exit_code, 0)
+        api.exec_create.assert_called_once_with("container1", "make")
+        api.exec_start.assert_called_once_with("exec1", stream=True, demux=True)
+
+
+def command(chunks, exit_code=0):
+    return CommandStream(iter(chunks), lambda: exit_code)
+
+
+class TestFanOutStream(unittest.TestCase):
+    def test_lines_are_split_per_target_and_exit_codes_aggregated(self):
+        commands = {
+            "a": command([(STDOUT, b"one\ntw"), (STDERR, b"oops\n"), (STDOUT, b"o")]),
+            "b": command([(STDOUT, b"done\n")], exit_code=3),
+        }
+        stream = FanOutStream(commands.get, {"a": "a", "b": "b", "c": None}, 2)
+        lines = list(stream)
+        self.assertEqual(
+            [line for line in lines if line[0] == "a"],
+            [("a", STDOUT, b"one\n"), ("a", STDERR, b"oops\n"), ("a", STDOUT, b"two")],
+        )
+        self.assertIn(("b", STDOUT, b"done\n"), lines)
+        self.assertEqual(
+            [(r["name"], r["exit_code"]) for r in stream.results],
+            [("a", 0), ("b", 3), ("c", None)],
+        )
+        self.assertIn("not running", str(stream.results[2]["error"]))
+        self.assertEqual(stream.exit_code, 3)
+
+    def test_runs_at_most_max_workers_at_once(self):
+        running, peak, lock = [0], [0], threading.Lock()
+
+        def start(target):
+            def chunks():
+                with lock:
+                    running[0] += 1
+                    peak[0] = max(peak[0], running[0])
+                yield STDOUT, target.encode()
+                with lock:
+                    running[0] -= 1
+
+            return CommandStream(chunks(), lambda: 0)
+
+        stream = FanOutStream(start, {str(i): str(i) for i in range(20)}, 3)
+        self.assertEqual(len(list(stream)), 20)
+        self.assertLessEqual(peak[0], 3)
+        self.assertEqual(stream.exit_code, 0)
+
+    def test_fail_fast_cancels_the_rest(self):
+        blocked = threading.Event()
+        self.addCleanup(blocked.set)
+
+        def start(target):
+            if target == "bad":
+                return command([], exit_code=1)
+
+            def chunks():
+                blocked.wait(5)
+                yield STDOUT, b"late\n"
+
+            return CommandStream(chunks(), lambda: 0)
+
+        targets = {"slow": "slow", "bad": "bad", "later": "later"}
+        stream = FanOutStream(start, targets, 2, fail_fast=True)
+        self.assertEqual(list(stream), [])
+        self.assertEqual(
+            [(r["name"], r["cancelled"]) for r in stream.results],
+            [("slow", True), ("bad", False), ("later", True)],
+        )
+        self.assertEqual(stream.exit_code, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
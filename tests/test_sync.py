@@ -0,0 +1,152 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+from devdock.archive import read_tar
+from devdock.config import ConfigManager
+from devdock.manager import DevContainerManager
+from devdock.sync import (
+    InotifyWatcher,
+    PollingWatcher,
+    Syncer,
+    is_sync_source,
+    load_ignore,
+    sync_volume,
+)
+
+
+class TestSyncHelpers(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def test_sources_and_volume_names(self):
+        self.assertTrue(is_sync_source(self.tmp))
+        self.assertFalse(is_sync_source("named-volume"))
+        self.assertFalse(is_sync_source(os.path.join(self.tmp, "missing")))
+        self.assertEqual(sync_volume("dev", self.tmp), sync_volume("dev", self.tmp))
+        self.assertNotEqual(sync_volume("dev", self.tmp), sync_volume("dev", "/"))
+
+    def test_load_ignore_reads_devdockignore(self):
+        with open(os.path.join(self.tmp, ".devdockignore"), "w") as f:
+            f.write("# comment\nnode_modules/\n\ndist\n")
+        patterns = load_ignore(self.tmp, ["*.log"])
+        self.assertIn(".git", patterns)
+        self.assertEqual(patterns[-3:], ["node_modules", "dist", "*.log"])
+
+
+class WatcherTests:
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        os.makedirs(os.path.join(self.tmp, "src"))
+        self.watcher = self.make_watcher({"v": self.tmp}, {"v": load_ignore(self.tmp)})
+        self.addCleanup(self.watcher.close)
+
+    def write(self, path, data="x"):
+        with open(os.path.join(self.tmp, path), "w") as f:
+            f.write(data)
+
+    def read(self):
+        changes = {}
+        deadline = time.monotonic() + 2
+        while time.monotonic() < deadline:
+            for key, paths in self.watcher.read(0.1).items():
+                changes.setdefault(key, set()).update(paths)
+            if changes:
+                time.sleep(0.05)
+                for key, paths in self.watcher.read(0.1).items():
+                    changes[key].update(paths)
+                return changes
+        return changes
+
+    def test_reports_changed_and_deleted_paths(self):
+        self.write("src/a.py")
+        os.makedirs(os.path.join(self.tmp, "pkg", "sub"))
+        self.write("pkg/sub/b.py")
+        self.write("src/c.pyc")
+        changes = self.read()
+        self.assertTrue(
+            {"src/a.py", "pkg", "pkg/sub", "pkg/sub/b.py"} <= changes["v"], changes
+        )
+        self.assertNotIn("src/c.pyc", changes["v"])
+
+        os.remove(os.path.join(self.tmp, "src", "a.py"))
+        self.assertIn("src/a.py", self.read()["v"])
+
+    def test_ignored_directories_are_not_watched(self):
+        os.makedirs(os.path.join(self.tmp, ".git"))
+        self.write(".git/HEAD")
+        self.write("src/a.py")
+        changes = self.read()
+        self.assertEqual({p for p in changes["v"] if p.startswith(".git")}, set())
+
+
+class TestPollingWatcher(WatcherTests, unittest.TestCase):
+    def make_watcher(self, roots, ignore):
+        return PollingWatcher(roots, ignore, interval=0.05)
+
+
+@unittest.skipUnless(sys.platform.startswith("linux"), "inotify is Linux-only")
+class TestInotifyWatcher(WatcherTests, unittest.TestCase):
+    def make_watcher(self, roots, ignore):
+        return InotifyWatcher(roots, ignore)
+
+
+class TestSyncer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.client = MagicMock()
+        self.manager = DevContainerManager(client=self.client)
+        self.manager.config_manager = ConfigManager(
+            base_dir=os.path.join(self.tmp, "config"), backend="yaml"
+        )
+        self.src = os.path.join(self.tmp, "src")
+        os.makedirs(os.path.join(self.src, "pkg"))
+        with open(os.path.join(self.src, "pkg", "a.py"), "w") as f:
+            f.write("print(1)\n")
+
+    def test_push_copies_existing_and_deletes_missing_paths(self):
+        syncer = Syncer(self.manager, {"vol": self.src})
+        helper = MagicMock()
+        uploaded = {}
+        helper.put_archive.side_effect = lambda path, data: uploaded.update(
+            {path: [(i.name, f.read() if f else None) for i, f in read_tar(data)]}
+        )
+        syncer._helper = helper
+
+        result = syncer.push("vol", {"pkg/a.py", "pkg", "gone.txt"})
+        self.assertEqual(
+            result,
+            {"volume": "vol", "files": 1, "bytes": 9, "deleted": 1, "error": None},
+        )
+        self.assertEqual(
+            uploaded["/sync/0"], [("pkg", None), ("pkg/a.py", b"print(1)\n")]
+        )
+        helper.exec_run.assert_called_once_with(["rm", "-rf", "--", "/sync/0/gone.txt"])
+
+    @patch("devdock.sync.Syncer.seed", return_value=[])
+    @patch("devdock.manager.DevContainerManager.create_container")
+    def test_create_dev_container_with_sync(self, mock_create, mock_seed):
+        volume = sync_volume("dev", self.src)
+        self.manager.create_dev_container(
+            "dev", "node:20", [f"{self.src}:/app", "data:/data"], sync=True
+        )
+        mock_seed.assert_called_once()
+        mock_create.assert_called_once_with(
+            "node:20", "dev", [f"{volume}:/app", "data:/data"], "if-not-present"
+        )
+        config = self.manager.config_manager.read_config("dev")
+        self.assertEqual(config["sync"], {volume: self.src})
+
+        self.manager.remove_dev_container("dev")
+        self.client.volumes.get.assert_called_with(volume)
+        self.client.volumes.get.return_value.remove.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
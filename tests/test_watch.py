@@ -0,0 +1,136 @@
+import threading
+import unittest
+from unittest.mock import MagicMock
+from devdock.manager import DevContainerManager
+from devdock.watch import ACTION_CREATE, ACTION_START, ACTION_START_SERVICES, Watcher
+
+PROJECT = {"com.docker.compose.project": "app"}
+
+
+def event(action, **attributes):
+    return {"Type": "container", "Action": action, "Actor": {"Attributes": attributes}}
+
+
+class TestWatcher(unittest.TestCase):
+    def setUp(self):
+        self.client = MagicMock()
+        self.summaries = [
+            {"Id": "1", "Names": ["/dev"], "State": "exited", "Labels": {}},
+            {
+                "Id": "2",
+                "Names": ["/app-web-1"],
+                "State": "exited",
+                "Labels": {**PROJECT, "com.docker.compose.service": "web"},
+            },
+            {
+                "Id": "3",
+                "Names": ["/app-db-1"],
+                "State": "running",
+                "Labels": {**PROJECT, "com.docker.compose.service": "db"},
+            },
+        ]
+        self.client.api.containers.side_effect = lambda all: self.summaries
+        self.manager = DevContainerManager(client=self.client)
+        self.configs = [
+            {"type": "container", "name": "dev", "image": "python:3.11"},
+            {
+                "type": "compose",
+                "name": "shop",
+                "compose_file": "/nonexistent/app/x.dev.yaml",
+                "service_hashes": {"web": "a", "db": "b"},
+            },
+        ]
+        self.manager.config_manager = MagicMock()
+        self.manager.config_manager.find_configs.return_value = self.configs
+        self.manager.config_manager.read_config.side_effect = lambda name: next(
+            c for c in self.configs if c["name"] == name
+        )
+        self.manager.start_container = MagicMock()
+        self.manager.create_container = MagicMock()
+        self.manager.start_compose_services = MagicMock()
+        self.watcher = Watcher(self.manager, debounce=1, backoff=1, max_backoff=60)
+        self.watcher.refresh_targets()
+
+    def test_reconcile_starts_what_is_down(self):
+        results = self.watcher.reconcile()
+        self.assertEqual(
+            [(r["name"], r["action"], r["services"]) for r in results],
+            [("dev", ACTION_START, []), ("shop", ACTION_START_SERVICES, ["web"])],
+        )
+        self.manager.start_container.assert_called_once_with("dev")
+        self.manager.start_compose_services.assert_called_once_with(
+            "/nonexistent/app/x.dev.yaml", ["web"]
+        )
+
+    def test_reconcile_recreates_missing_container(self):
+        self.summaries = self.summaries[1:]
+        self.configs[0]["volumes"] = ["/src:/src"]
+        self.configs[0]["cache"] = ["pip"]
+        results = self.watcher.reconcile(["dev"])
+        self.assertEqual(results[0]["action"], ACTION_CREATE)
+        self.manager.create_container.assert_called_once_with(
+            "python:3.11", "dev", ["/src:/src", "devdock-cache-pip:/root/.cache/pip"]
+        )
+
+    def test_events_are_debounced_and_filtered(self):
+        self.watcher.handle_event(event("die", name="dev"), now=0)
+        self.watcher.handle_event(event("die", name="dev"), now=0.5)
+        self.watcher.handle_event(event("die", name="unrelated"), now=0.5)
+        self.assertEqual(self.watcher.due(now=0.9), [])
+        self.assertEqual(self.watcher.due(now=1.0), ["dev"])
+        self.assertEqual(self.watcher.due(now=5), [])
+
+    def test_stopped_on_purpose_is_left_alone(self):
+        web = {**PROJECT, "com.docker.compose.service": "web", "name": "app-web-1"}
+        self.watcher.handle_event(event("kill", **web), now=0)
+        self.watcher.handle_event(event("die", **web), now=0)
+        self.watcher.handle_event(event("stop", name="dev"), now=0)
+        self.assertEqual(self.watcher.due(now=10), [])
+        self.assertEqual(self.watcher.reconcile(), [])
+
+        self.watcher.handle_event(event("start", name="dev"), now=11)
+        self.watcher.handle_event(event("die", name="dev"), now=12)
+        self.assertEqual(self.watcher.due(now=13), ["dev"])
+
+    def test_crash_loop_backs_off(self):
+        delays = []
+        for _ in range(4):
+            self.watcher.reconcile(["dev"])
+            now = self.watcher._restarts["dev"][1]
+            self.watcher.handle_event(event("die", name="dev"), now=now)
+            delays.append(self.watcher._due.pop("dev") - now)
+        self.assertEqual(delays, [1, 2, 4, 8])
+        # Up for longer than max_backoff: back to the debounce alone.
+        self.watcher.schedule("dev", now=now + 61)
+        self.assertEqual(self.watcher._due["dev"] - (now + 61), 1)
+
+    def test_run_reconciles_then_follows_events(self):
+        closed = threading.Event()
+
+        def events():
+            yield event("die", name="dev")
+            closed.wait(5)
+
+        stream = MagicMock()
+        stream.__iter__.side_effect = events
+        stream.close.side_effect = closed.set
+        self.client.events.return_value = stream
+        self.watcher.debounce = self.watcher.backoff = 0.01
+        results = []
+        for result in self.watcher.run():
+            results.append(result)
+            if len(results) == 3:
+                self.watcher.close()
+        self.assertEqual([r["name"] for r in results], ["dev", "shop", "dev"])
+        self.assertEqual(results[2]["attempt"], 2)
+        self.client.events.assert_called_once_with(
+            decode=True,
+            filters={
+                "type": "container",
+                "event": ["start", "kill", "stop", "die", "oom", "destroy"],
+            },
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()